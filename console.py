@@ -7,9 +7,10 @@ read, update, and delete instances using intuitive commands.
 '''
 import cmd
 import re
+from ast import literal_eval
 from shlex import split
 from models import storage
-from models.base_model import BaseModel
+from models.base_model import BaseModel, Field, parse_timestamp
 from models.user import User
 from models.state import State
 from models.city import City
@@ -44,6 +45,69 @@ def parser(line):
         return retl
 
 
+def parse_conditions(line):
+    """Parses query conditions such as `price_by_night<100, name=="Loft"`.
+
+    Conditions are separated by commas or spaces. Operators are ==, =, !=,
+    <, <=, >, >=, in and contains. Values are read as Python literals where
+    possible and as plain strings otherwise.
+
+    Args:
+      line (str): The conditions retrieved from user input
+
+    Returns:
+      list: (attribute, operator, value) tuples, or None if the line holds
+        anything that is not a condition.
+    """
+    condition = re.compile(r"(\w+)(\s*(?:==|!=|<=|>=|<|>|=)\s*|"
+                           r"\s+(?:in|contains)\s+)"
+                           r"(\"[^\"]*\"|'[^']*'|\[[^\]]*\]|[^,\s]+)[\s,]*")
+    conditions = []
+    pos = re.match(r"[\s,]*", line).end()
+    while pos < len(line):
+        match = condition.match(line, pos)
+        if match is None:
+            return None
+        attr, op, value = match.groups()
+        op = op.strip()
+        try:
+            value = literal_eval(value)
+        except (ValueError, SyntaxError):
+            pass
+        conditions.append((attr, "==" if op == "=" else op, value))
+        pos = match.end()
+    return conditions
+
+
+def convert_value(obj, name, value):
+    """Converts a value given to `update` to the type of the attribute.
+
+    Timestamps are parsed, and values of schema attributes with a str, int
+    or float default are converted to that type. Other values are kept.
+
+    Args:
+      obj: The instance being updated.
+      name (str): The attribute name.
+      value: The value retrieved from user input.
+
+    Returns:
+      The converted value.
+
+    Raises:
+      ValueError: If the value cannot be converted.
+    """
+    if name in ("created_at", "updated_at"):
+        return parse_timestamp(str(value))
+    for cls in type(obj).__mro__:
+        if name in cls.__dict__:
+            field = cls.__dict__[name]
+            if isinstance(field, Field) and \
+                    type(field.default) in {str, int, float}:
+                return type(field.default)(value)
+            break
+    return value
+
+
 class HBNBCommand(cmd.Cmd):
     '''**HBNBCommand class**
     Inherits from `cmd.Cmd` to provide an interactive shell for
@@ -78,6 +142,11 @@ class HBNBCommand(cmd.Cmd):
         <class name>.destroy(<id>)
         <class name>.update(<id>, <attribute name>, <attribute value>)
         <class name>.update(<id>, <dictionary representation)
+        <class name>.where(<conditions>).order_by(<attribute>).limit(<n>)
+        <class name>.having(<attribute>, [any, ]<value>, ...)
+        <class name>.search(<keywords>)
+        <class name>.near(<latitude>, <longitude>, <radius in km>)
+        <class name>.within(<min lat>, <min lon>, <max lat>, <max lon>)
 
         Description:
             Creates a list representations of functional models
@@ -89,11 +158,17 @@ class HBNBCommand(cmd.Cmd):
             "show": self.do_show,
             "destroy": self.do_destroy,
             "count": self.do_count,
-            "update": self.do_update
+            "update": self.do_update,
+            "having": self.do_having,
+            "search": self.do_search,
+            "near": self.do_near,
+            "within": self.do_within
         }
         match = re.search(r"\.", line)
         if match is not None:
             arg_line = [line[:match.span()[0]], line[match.span()[1]:]]
+            if arg_line[1].startswith("where("):
+                return self.do_where("{} {}".format(arg_line[0], arg_line[1]))
             match = re.search(r"\((.*?)\)", arg_line[1])
             if match is not None:
                 command = [arg_line[1][:match.span()[0]], match.group()[1:-1]]
@@ -105,6 +180,9 @@ class HBNBCommand(cmd.Cmd):
 
     def do_quit(self, line):
         """Quit command to exit the program."""
+        if storage.in_transaction():
+            storage.rollback()
+        storage.flush()
         return True
 
     def do_EOF(self, line):
@@ -114,8 +192,52 @@ class HBNBCommand(cmd.Cmd):
             line(args): user input from the terminal
         """
         print("")
+        if storage.in_transaction():
+            storage.rollback()
+        storage.flush()
         return True
 
+    def do_flush(self, line):
+        """Saves the changes a group commit is holding back.
+            "usage: flush"
+        Args:
+            line(args): unused
+        """
+        storage.flush()
+
+    def do_begin(self, line):
+        """Opens a transaction: changes are only saved by `commit`.
+            "usage: begin"
+        Args:
+            line(args): unused
+        """
+        if storage.in_transaction():
+            print("** transaction already open **")
+        else:
+            storage.begin()
+
+    def do_commit(self, line):
+        """Saves the changes of the open transaction in one write.
+            "usage: commit"
+        Args:
+            line(args): unused
+        """
+        if not storage.in_transaction():
+            print("** no transaction open **")
+        else:
+            storage.commit()
+
+    def do_rollback(self, line):
+        """Discards the changes of the open transaction.
+            "usage: rollback"
+        Args:
+            line(args): unused
+        """
+        if not storage.in_transaction():
+            print("** no transaction open **")
+        else:
+            storage.rollback()
+
     def do_create(self, line):
         """Creates a new instance of a class and prints its ID.
             "usage: <command name> <class name>"
@@ -132,7 +254,7 @@ class HBNBCommand(cmd.Cmd):
             print("** class doesn't exist **")
         else:
             print(eval(arg_line[0])().id)
-            storage.save()
+            storage.request_save()
 
     def do_show(self, line):
         """Prints the string representation of an instance.
@@ -144,17 +266,16 @@ class HBNBCommand(cmd.Cmd):
             None
         """
         arg_line = parser(line)
-        obj_dict = storage.all()
         if len(arg_line) == 0:
             print("** class name missing **")
         elif arg_line[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         elif len(arg_line) == 1:
             print("** instance id missing **")
-        elif "{}.{}".format(arg_line[0], arg_line[1]) not in obj_dict:
+        elif storage.get(arg_line[0], arg_line[1]) is None:
             print("** no instance found **")
         else:
-            print(obj_dict["{}.{}".format(arg_line[0], arg_line[1])])
+            print(storage.get(arg_line[0], arg_line[1]))
 
     def do_destroy(self, line):
         """Deletes an instance of a certain class.
@@ -165,18 +286,17 @@ class HBNBCommand(cmd.Cmd):
 
         """
         arg_line = parser(line)
-        obj_dict = storage.all()
         if len(arg_line) == 0:
             print("** class name missing **")
         elif arg_line[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         elif len(arg_line) == 1:
             print("** instance id missing **")
-        elif "{}.{}".format(arg_line[0], arg_line[1]) not in obj_dict.keys():
+        elif storage.get(arg_line[0], arg_line[1]) is None:
             print("** no instance found **")
         else:
-            del obj_dict["{}.{}".format(arg_line[0], arg_line[1])]
-            storage.save()
+            storage.delete(storage.get(arg_line[0], arg_line[1]))
+            storage.request_save()
 
     def do_all(self, line):
         """Shows all instances, or instances of a certain class
@@ -190,13 +310,8 @@ class HBNBCommand(cmd.Cmd):
         if len(arg_line) > 0 and arg_line[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         else:
-            obj_list = []
-            for obj in storage.all().values():
-                if len(arg_line) > 0 and arg_line[0] == obj.__class__.__name__:
-                    obj_list.append(obj.__str__())
-                elif len(arg_line) == 0:
-                    obj_list.append(obj.__str__())
-            print(obj_list)
+            cls = arg_line[0] if len(arg_line) > 0 else None
+            print([obj.__str__() for obj in storage.all(cls).values()])
 
     def do_count(self, line):
         """This function counts the number of instances of a specific class
@@ -211,11 +326,7 @@ class HBNBCommand(cmd.Cmd):
             storage.
         """
         arg_line = parser(line)
-        count = 0
-        for obj in storage.all().values():
-            if arg_line[0] == obj.__class__.__name__:
-                count += 1
-        print(count)
+        print(storage.count(arg_line[0] if len(arg_line) > 0 else None))
 
     def do_update(self, line):
         """Updates an instance based on the class name
@@ -228,7 +339,6 @@ class HBNBCommand(cmd.Cmd):
 
         """
         arg_line = parser(line)
-        obj_dict = storage.all()
 
         if len(arg_line) == 0:
             print("** class name missing **")
@@ -239,7 +349,8 @@ class HBNBCommand(cmd.Cmd):
         if len(arg_line) == 1:
             print("** instance id missing **")
             return False
-        if "{}.{}".format(arg_line[0], arg_line[1]) not in obj_dict.keys():
+        obj = storage.get(arg_line[0], arg_line[1])
+        if obj is None:
             print("** no instance found **")
             return False
         if len(arg_line) == 2:
@@ -253,23 +364,168 @@ class HBNBCommand(cmd.Cmd):
                 return False
 
         if len(arg_line) == 4:
-            obj = obj_dict["{}.{}".format(arg_line[0], arg_line[1])]
-            if arg_line[2] in obj.__class__.__dict__.keys():
-                val_type = type(obj.__class__.__dict__[arg_line[2]])
-                obj.__dict__[arg_line[2]] = val_type(arg_line[3])
-            else:
-                obj.__dict__[arg_line[2]] = arg_line[3]
+            updates = {arg_line[2]: arg_line[3]}
         elif type(eval(arg_line[2])) == dict:
-            obj = obj_dict["{}.{}".format(arg_line[0], arg_line[1])]
-            for key, value in eval(arg_line[2]).items():
-                if (key in obj.__class__.__dict__.keys() and
-                        type(obj.__class__.__dict__[key])
-                        in {str, int, float}):
-                    val_type = type(obj.__class__.__dict__[key])
-                    obj.__dict__[key] = val_type(value)
+            updates = eval(arg_line[2])
+        else:
+            updates = {}
+        try:
+            updates = {key: convert_value(obj, key, value)
+                       for key, value in updates.items()}
+        except (ValueError, TypeError):
+            print("** invalid value **")
+            return False
+        for key, value in updates.items():
+            setattr(obj, key, value)
+        storage.request_save()
+
+    def do_where(self, line):
+        """Prints the instances of a class that meet conditions.
+            "usage: where <class name> <attribute><operator><value> ..."
+            "or <class name>.where(<conditions>)[.order_by(<attribute>)]"
+            "    [.limit(<n>)][.offset(<n>)][.only(<attribute>, ...)]"
+            "operators: == != < <= > >= in contains"
+            "EX. Place.where(price_by_night<100).order_by(-max_guest)"
+        Args:
+            line (str): User input containing the class name and query.
+        """
+        cls, _, query_line = line.strip().partition(" ")
+        query_line = query_line.strip()
+        if len(cls) == 0:
+            print("** class name missing **")
+            return False
+        if cls not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+            return False
+        if query_line.startswith("where("):
+            calls = re.findall(r"\.?(\w+)\((.*?)\)", query_line)
+            if re.sub(r"\.?(\w+)\((.*?)\)", "", query_line).strip():
+                calls = None
+        else:
+            calls = [("where", query_line)]
+        query = storage.query(cls)
+        try:
+            for name, args in calls:
+                if name == "where":
+                    for condition in parse_conditions(args):
+                        query.where(*condition)
+                elif name == "order_by":
+                    query.order_by(args.strip())
+                elif name in ("limit", "offset"):
+                    getattr(query, name)(int(args))
+                elif name == "only":
+                    query.only(*[attr.strip() for attr in args.split(",")
+                                 if attr.strip()])
                 else:
-                    obj.__dict__[key] = value
-        storage.save()
+                    raise ValueError(name)
+            results = [result if type(result) == dict else result.__str__()
+                       for result in query]
+        except (TypeError, ValueError):
+            print("** invalid query **")
+            return False
+        print(results)
+
+    def do_having(self, line):
+        """Prints the instances of a class whose list attribute holds all of
+            some values, or any of them after the keyword `any`.
+            "usage: having <class name> <attribute> [any] <value> ..."
+            "EX. having Place amenity_ids 1234-1234 5678-5678"
+        Args:
+            line (str): User input containing the class name, the attribute
+                and the values.
+        """
+        arg_line = parser(line)
+        if len(arg_line) == 0:
+            print("** class name missing **")
+            return False
+        if arg_line[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+            return False
+        if len(arg_line) == 1:
+            print("** attribute name missing **")
+            return False
+        values = arg_line[2:]
+        match_any = len(values) > 0 and values[0] == "any"
+        if match_any:
+            values = values[1:]
+        if len(values) == 0:
+            print("** value missing **")
+            return False
+        print([obj.__str__() for obj in storage.having(
+            arg_line[0], arg_line[1], values, match_any)])
+
+    def do_search(self, line):
+        """Prints the instances of a class matching keywords, most relevant
+            first.
+            "usage: search <class name> <keyword> ..."
+            "EX. search Place cozy loft"
+        Args:
+            line (str): User input containing the class name and keywords.
+        """
+        arg_line = parser(line)
+        if len(arg_line) == 0:
+            print("** class name missing **")
+            return False
+        if arg_line[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+            return False
+        if len(arg_line) == 1:
+            print("** keywords missing **")
+            return False
+        print([obj.__str__() for _, obj in storage.search(
+            arg_line[0], " ".join(arg_line[1:]))])
+
+    def do_near(self, line):
+        """Prints the instances of a class within a distance of a point,
+            nearest first.
+            "usage: near <class name> <latitude> <longitude> <radius in km>"
+            "EX. near Place 37.77 -122.42 5"
+        Args:
+            line (str): User input containing the class name, the point and
+                the radius.
+        """
+        arg_line = parser(line)
+        if len(arg_line) == 0:
+            print("** class name missing **")
+            return False
+        if arg_line[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+            return False
+        if len(arg_line) < 4:
+            print("** coordinates missing **")
+            return False
+        try:
+            lat, lon, radius = (float(arg) for arg in arg_line[1:4])
+        except ValueError:
+            print("** invalid coordinates **")
+            return False
+        print([obj.__str__()
+               for _, obj in storage.near(arg_line[0], lat, lon, radius)])
+
+    def do_within(self, line):
+        """Prints the instances of a class inside a bounding box.
+            "usage: within <class name> <min lat> <min lon>
+                <max lat> <max lon>"
+            "EX. within Place 37.70 -122.52 37.82 -122.35"
+        Args:
+            line (str): User input containing the class name and the box.
+        """
+        arg_line = parser(line)
+        if len(arg_line) == 0:
+            print("** class name missing **")
+            return False
+        if arg_line[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+            return False
+        if len(arg_line) < 5:
+            print("** coordinates missing **")
+            return False
+        try:
+            box = [float(arg) for arg in arg_line[1:5]]
+        except ValueError:
+            print("** invalid coordinates **")
+            return False
+        print([obj.__str__() for obj in storage.within(arg_line[0], *box)])
 
 
 if __name__ == "__main__":
@@ -1,7 +1,14 @@
-
 """initializes the module"""
+import atexit
+from os import getenv
+from models.engine import create
 
-from models.engine.file_storage import FileStorage
-
-storage = FileStorage()
+storage = create(getenv("HBNB_TYPE_STORAGE") or "file")
+storage.lazy = getenv("HBNB_RELOAD") == "lazy"
+storage.fsync = getenv("HBNB_FSYNC") or "none"
+if getenv("HBNB_GROUP_OPS"):
+    storage.group_ops = int(getenv("HBNB_GROUP_OPS"))
+if getenv("HBNB_GROUP_WINDOW"):
+    storage.group_window = float(getenv("HBNB_GROUP_WINDOW"))
 storage.reload()
+atexit.register(storage.flush)
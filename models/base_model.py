@@ -3,12 +3,141 @@ functionality for all models in the application. It handles automatic
 generation of IDs,timestamps, serialization, and basic string
 representation.
 '''
+from sys import intern
 from uuid import uuid4
 from datetime import datetime
 import models
 
+d_time_format = "%Y-%m-%dT%H:%M:%S.%f"
 
-class BaseModel:
+
+def parse_timestamp(value):
+    '''Parses a timestamp written by `datetime.isoformat()`.
+
+    Timestamps in the "YYYY-MM-DDTHH:MM:SS[.ffffff]" layout are checked
+    by position and parsed with `datetime.fromisoformat`, which is many
+    times faster than `strptime`. Any other value, or one carrying a UTC
+    offset, goes through `strptime` with `d_time_format`, so it is
+    rejected exactly as before.
+
+    Args:
+        value (str): The timestamp to parse.
+
+    Returns:
+        datetime: The naive datetime the timestamp represents.
+
+    Raises:
+        ValueError: If the value is not a valid timestamp.
+    '''
+    if (len(value) == 26 and value[19] == "." or len(value) == 19) and \
+            value[4] == value[7] == "-" and value[10] == "T" and \
+            value[13] == value[16] == ":":
+        timestamp = datetime.fromisoformat(value)
+        if timestamp.tzinfo is None:
+            return timestamp
+    return datetime.strptime(value, d_time_format)
+
+
+def intern_ids(name, value):
+    '''Interns the strings of an id-like attribute value, so every object
+    referring to the same object shares one string for its id.
+
+    Attributes named "id" or ending in "_id" hold an id, and those ending
+    in "_ids" a list of ids, whose strings are replaced in place.
+
+    Args:
+        name (str): The attribute name.
+        value: The attribute value.
+
+    Returns:
+        The value, with its id strings interned.
+    '''
+    if name == "id" or name.endswith("_id"):
+        if type(value) is str:
+            return intern(value)
+    elif name.endswith("_ids") and type(value) is list:
+        for i, item in enumerate(value):
+            if type(item) is str:
+                value[i] = intern(item)
+    return value
+
+
+class Field:
+    '''A schema attribute of a model, stored in a slot of each instance.
+
+    Reading the attribute from the class, or from an instance it was never
+    set on, returns the default, exactly like the plain class attribute the
+    field replaces.
+
+    Attributes:
+        default: The value of the attribute until it is set.
+        slot: The member descriptor of the instance slot holding the value.
+    '''
+    __slots__ = ("default", "slot")
+
+    def __init__(self, default, slot):
+        '''Initializes the field.
+
+        Args:
+            default: The value of the attribute until it is set.
+            slot: The member descriptor of the slot holding the value.
+        '''
+        self.default = default
+        self.slot = slot
+
+    def __get__(self, obj, cls=None):
+        '''Returns the value of the attribute, or the default if unset.'''
+        if obj is None:
+            return self.default
+        try:
+            return self.slot.__get__(obj, cls)
+        except AttributeError:
+            return self.default
+
+    def __set__(self, obj, value):
+        '''Stores a value in the slot of an instance.'''
+        self.slot.__set__(obj, value)
+
+    def __delete__(self, obj):
+        '''Clears the slot of an instance, restoring the default.'''
+        self.slot.__delete__(obj)
+
+
+class ModelMeta(type):
+    '''The metaclass of the models, which gives each schema attribute an
+    instance slot instead of an entry in a per-instance `__dict__`.
+
+    Every public, non-callable class attribute of a model is a schema
+    attribute: its value is kept as the default, a slot is added under
+    the attribute's private name and the attribute itself becomes a
+    `Field`. Instances keep a `__dict__` for attributes outside the
+    schema, which is only allocated once one is set.
+
+    `__schema__` lists the (name, slot) pairs of every slot of a model,
+    its bases' included, for `BaseModel.attributes()`.
+    '''
+    def __new__(mcs, name, bases, namespace):
+        '''Creates a model class with slots for its schema attributes.'''
+        defaults = {key: value for key, value in namespace.items()
+                    if not key.startswith("_") and not callable(value) and
+                    not isinstance(value, (classmethod, staticmethod,
+                                           property))}
+        slots = tuple(namespace.get("__slots__", ()))
+        namespace["__slots__"] = slots + tuple("__" + key for key in defaults)
+        cls = super().__new__(mcs, name, bases, namespace)
+        schema = list(getattr(cls, "__schema__", ()))
+        for key in slots:
+            if key not in ("__dict__", "__weakref__"):
+                schema.append((key, cls.__dict__[key]))
+        for key, default in defaults.items():
+            slot = cls.__dict__["_{}__{}".format(name.lstrip("_"), key)]
+            setattr(cls, key, Field(default, slot))
+            schema.append((key, slot))
+        cls.__schema__ = tuple(schema)
+        return cls
+
+
+class BaseModel(metaclass=ModelMeta):
     '''Base class for all models in the application.
     Provides common functionality for managing object creation, updates,
     serialization, and string representation.
@@ -17,6 +146,8 @@ class BaseModel:
         created_at (datetime): The datetime when the object was created.
         updated_at (datetime): The datetime when the object was last updated.
     '''
+    __slots__ = ("id", "created_at", "updated_at", "__dict__", "__weakref__")
+
     def __init__(self, *args, **kwargs):
         '''Initializes the base model object.
 
@@ -24,29 +155,78 @@ class BaseModel:
             *args: Optional arguments (not used).
             **kwargs: Keyword arguments for object initialization.
         '''
-
-        d_time_format = "%Y-%m-%dT%H:%M:%S.%f"
         if kwargs:
+            set_attribute = object.__setattr__
             for key, value in kwargs.items():
                 if key in ("created_at", "updated_at"):
-                    self.__dict__[key] = datetime.strptime(
-                            value, d_time_format)
+                    if not isinstance(value, datetime):
+                        value = parse_timestamp(value)
+                    set_attribute(self, key, value)
                 elif key[0] == "id":
-                    self.__dict__[key] = str(value)
-                else:
-                    self.__dict__[key] = value
+                    set_attribute(self, key, str(value))
+                elif key != "__class__":
+                    set_attribute(self, key, intern_ids(key, value))
         else:
             self.id = str(uuid4())
             self.created_at = datetime.utcnow()
             self.updated_at = datetime.utcnow()
             models.storage.new(self)
 
+    def __setattr__(self, name, value):
+        '''Sets an attribute and flags the object as changed so the storage
+            engine re-serializes it on the next save, after reporting it to
+            the transaction, if any. Id strings are interned, see
+            `intern_ids()`. The engine's `lock` is held meanwhile, so a save
+            on another thread never sees the change half made.
+
+        Args:
+            name (str): The attribute name.
+            value: The new attribute value.
+        '''
+        with models.storage.lock:
+            models.storage.mark_changing(self)
+            super().__setattr__(name, intern_ids(name, value))
+            models.storage.mark_dirty(self)
+
+    def __delattr__(self, name):
+        '''Deletes an attribute and flags the object as changed.
+
+        Args:
+            name (str): The attribute name.
+        '''
+        with models.storage.lock:
+            models.storage.mark_changing(self)
+            super().__delattr__(name)
+            models.storage.mark_dirty(self)
+
     def save(self):
         '''Updates the `updated_at` attribute with the current datetime
             and saves the object to the storage engine.
         '''
         self.updated_at = datetime.utcnow()
-        models.storage.save()
+        models.storage.request_save()
+
+    def attributes(self):
+        '''Returns the attributes set on the object, schema and extra ones.
+
+        Returns:
+            dict: The attribute values keyed by name, schema attributes
+                first.
+        '''
+        values = {}
+        for key, slot in self.__schema__:
+            try:
+                values[key] = slot.__get__(self)
+            except AttributeError:
+                pass
+        extra = self.__dict__
+        if extra:
+            values.update(extra)
+        else:
+            # Reading __dict__ allocated it; drop it again so objects
+            # without extra attributes stay compact.
+            object.__delattr__(self, "__dict__")
+        return values
 
     def to_dict(self):
         '''Returns a dictionary representation of the object.
@@ -58,7 +238,7 @@ class BaseModel:
             dict: A dictionary representation of the object.
         '''
         map_objects = {}
-        for key, value in self.__dict__.items():
+        for key, value in self.attributes().items():
             if key in ("created_at", "updated_at"):
                 map_objects[key] = value.isoformat()
             else:
@@ -76,4 +256,4 @@ class BaseModel:
             str: String representation of the object.
         '''
         class_name = self.__class__.__name__
-        return "[{}] ({}) {}".format(class_name, self.id, self.__dict__)
+        return "[{}] ({}) {}".format(class_name, self.id, self.attributes())
@@ -14,7 +14,9 @@ class City(BaseModel):
     Attributes:
       state_id (str): The unique identifier of the state the city belongs to.
       name (str): The name of the city.
+      __indexed__ (tuple): Attributes the storage engine keeps an index on.
     """
 
     state_id = ""
     name = ""
+    __indexed__ = ("state_id",)
@@ -0,0 +1,60 @@
+'''This package holds the storage engines and the registry that picks one
+    by name, e.g. from the HBNB_TYPE_STORAGE environment variable.
+
+    Engines are registered as "<module>.<class>" paths so an engine's module
+    (and its dependencies) is only imported when that engine is chosen.
+'''
+from importlib import import_module
+
+engines = {
+    "file": "models.engine.file_storage.FileStorage",
+    "journal": "models.engine.journal_storage.JournalStorage",
+    "mmap": "models.engine.mmap_storage.MmapStorage",
+    "db": "models.engine.db_storage.DBStorage",
+    "memory": "models.engine.memory_storage.MemoryStorage",
+    "binary": "models.engine.binary_storage.BinaryStorage"
+}
+
+
+def register(name, engine):
+    '''Registers a storage engine under a name.
+
+    Args:
+        name (str): The name to choose the engine by.
+        engine: The engine class, or its "<module>.<class>" path.
+    '''
+    engines[name] = engine
+
+
+def get_engine(name):
+    '''Returns the storage engine class registered under a name.
+
+    Args:
+        name (str): The name of the engine.
+
+    Returns:
+        type: The engine class.
+
+    Raises:
+        ValueError: If no engine is registered under `name`.
+    '''
+    if name not in engines:
+        raise ValueError("unknown storage engine: {}".format(name))
+    engine = engines[name]
+    if isinstance(engine, str):
+        module, _, cls = engine.rpartition(".")
+        engine = getattr(import_module(module), cls)
+        engines[name] = engine
+    return engine
+
+
+def create(name):
+    '''Creates an instance of the storage engine registered under a name.
+
+    Args:
+        name (str): The name of the engine.
+
+    Returns:
+        The new, not yet reloaded, engine.
+    '''
+    return get_engine(name)()
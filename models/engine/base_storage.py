@@ -0,0 +1,273 @@
+'''This module provides the BaseStorage class, the interface every storage
+    engine implements so engines can be swapped by configuration.
+'''
+import threading
+from abc import ABC, abstractmethod
+from copy import deepcopy
+from functools import wraps
+from time import monotonic
+
+
+def synchronized(method):
+    '''Decorates a storage engine method to run under the engine's `lock`.
+
+        Args:
+            method: The method to decorate.
+
+        Returns:
+            The decorated method.
+    '''
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return locked
+
+
+class BaseStorage(ABC):
+    '''The abstract interface of a storage engine.
+
+        Models talk to the configured engine through `models.storage`: they
+        register themselves with `new()` and report attribute changes with
+        `mark_dirty()`. Everything else is used by the console and callers.
+
+        Callers that persist after each change use `request_save()`, which
+        implements group commit on top of `save()`: with `group_ops` or
+        `group_window` set, requests are coalesced and one save covers them
+        all. The first pending request arms a timer that flushes once
+        `group_window` has passed, on the timer's own thread, so the last
+        requests of a burst are saved even if no request follows; changes
+        pending at a crash are lost. Engines hold `lock` while they change
+        or save objects, and models while they change an attribute, so the
+        timer's save never sees an object half changed.
+
+        `begin()` opens a transaction, which holds back every save request
+        (and `flush()`) until `commit()` saves once, or `rollback()` brings
+        the objects back to their state at `begin()`. Models report each
+        object before changing it with `mark_changing()`, so the undo log
+        only copies the objects the transaction touches. Calling `save()`
+        directly still saves right away.
+
+        Attributes:
+            lock (threading.RLock): Held while objects are changed or saved.
+            group_ops (int): The number of requests that triggers a save,
+                or None for no limit.
+            group_window (float): The number of seconds after the first
+                pending request at which the pending requests are saved, or
+                None for no limit. With neither limit, every request saves.
+    '''
+    group_ops = None
+    group_window = None
+    __requests = 0
+    __first_request = 0.0
+    __undo = None
+
+    def __init__(self):
+        '''Initializes the engine with no save request pending.'''
+        self.lock = threading.RLock()
+        self.__timer = None
+
+    def request_save(self):
+        '''Asks for the stored objects to be persisted, right away or as
+            part of a group commit.
+        '''
+        with self.lock:
+            now = monotonic()
+            if not self.__requests:
+                self.__first_request = now
+            self.__requests += 1
+            if self.__undo is not None:
+                return
+            if self.group_ops is None and self.group_window is None or \
+                    self.group_ops is not None and \
+                    self.__requests >= self.group_ops or \
+                    self.group_window is not None and \
+                    now - self.__first_request >= self.group_window:
+                self.flush()
+            elif self.group_window is not None and self.__timer is None:
+                self.__timer = threading.Timer(
+                    self.group_window - (now - self.__first_request),
+                    self.__expire)
+                self.__timer.daemon = True
+                self.__timer.start()
+
+    def flush(self):
+        '''Saves now if any save request is pending, unless a transaction
+            is open. The requests stay pending if the save fails.
+        '''
+        with self.lock:
+            if self.__requests and self.__undo is None:
+                self.save()
+                self.__clear_requests()
+
+    def __expire(self):
+        '''Flushes the pending requests when the group window timer fires,
+            unless a flush has disarmed the timer meanwhile. If the save
+            fails, the next request saves again.
+        '''
+        with self.lock:
+            if self.__timer is not threading.current_thread():
+                return
+            self.__timer = None
+            self.flush()
+
+    def __clear_requests(self):
+        '''Drops the pending save requests and disarms the group window
+            timer.
+        '''
+        self.__requests = 0
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+
+    def pending_saves(self):
+        '''Returns the number of save requests not saved yet.
+
+            Returns:
+                int: The number of pending requests.
+        '''
+        with self.lock:
+            return self.__requests
+
+    def begin(self):
+        '''Opens a transaction, saving any pending request first so it
+            does not depend on the outcome of the transaction.
+
+            Raises:
+                ValueError: If a transaction is already open.
+        '''
+        with self.lock:
+            if self.__undo is not None:
+                raise ValueError("a transaction is already open")
+            self.flush()
+            self.__undo = {}
+
+    def commit(self):
+        '''Saves the changes of the transaction in one write, then closes
+            it. If the save fails, the transaction stays open, so it can be
+            committed again or rolled back.
+
+            Raises:
+                ValueError: If no transaction is open.
+        '''
+        with self.lock:
+            if self.__undo is None:
+                raise ValueError("no transaction is open")
+            if self.__undo or self.__requests:
+                self.save()
+            self.__undo = None
+            self.__clear_requests()
+
+    def rollback(self):
+        '''Closes the transaction and brings every object it added, changed
+            or removed back to its state at `begin()`. Nothing is saved.
+
+            Raises:
+                ValueError: If no transaction is open.
+        '''
+        with self.lock:
+            if self.__undo is None:
+                raise ValueError("no transaction is open")
+            undo, self.__undo = self.__undo, None
+            for obj, values in undo.items():
+                if values is None:
+                    self.delete(obj)
+                    continue
+                for key in obj.attributes():
+                    if key not in values:
+                        delattr(obj, key)
+                for key, value in values.items():
+                    setattr(obj, key, value)
+                if self.get(obj.__class__, obj.id) is not obj:
+                    self.new(obj)
+            self.__clear_requests()
+
+    def in_transaction(self):
+        '''Tells whether a transaction is open.
+
+            Returns:
+                bool: True between `begin()` and `commit()` or `rollback()`.
+        '''
+        return self.__undo is not None
+
+    def mark_changing(self, obj):
+        '''Records the state of an object about to be changed or removed,
+            the first time it happens in a transaction.
+
+            Args:
+                obj: The object about to change. Objects that are not
+                    stored yet are recorded as added by the transaction.
+        '''
+        if self.__undo is None or obj in self.__undo:
+            return
+        if self.get(obj.__class__, getattr(obj, "id", None)) is obj:
+            self.__undo[obj] = deepcopy(obj.attributes())
+        else:
+            self.__undo[obj] = None
+
+    @abstractmethod
+    def all(self, cls=None):
+        '''Returns the stored objects, or those of a given class.
+
+            Args:
+                cls: The class, or class name, to restrict the result to.
+
+            Returns:
+                dict: The objects keyed by "<class name>.<id>".
+        '''
+
+    @abstractmethod
+    def count(self, cls=None):
+        '''Returns the number of stored objects, or of a given class.
+
+            Args:
+                cls: The class, or class name, to count.
+
+            Returns:
+                int: The number of matching objects.
+        '''
+
+    @abstractmethod
+    def get(self, cls, id):
+        '''Returns the object of a given class and id.
+
+            Args:
+                cls: The class of the object, or its name.
+                id (str): The id of the object.
+
+            Returns:
+                The stored object, or None if there is no such object.
+        '''
+
+    @abstractmethod
+    def new(self, obj):
+        '''Adds an object to the storage.
+
+            Args:
+                obj: The object to be stored.
+        '''
+
+    @abstractmethod
+    def mark_dirty(self, obj):
+        '''Flags an object as changed since the last save.
+
+            Args:
+                obj: The object that was modified.
+        '''
+
+    @abstractmethod
+    def delete(self, obj=None):
+        '''Removes an object from the storage.
+
+            Args:
+                obj: The object to remove. Nothing happens if it is None or
+                    not stored.
+        '''
+
+    @abstractmethod
+    def save(self):
+        '''Persists the stored objects.'''
+
+    @abstractmethod
+    def reload(self):
+        '''Loads the persisted objects.'''
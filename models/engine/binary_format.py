@@ -0,0 +1,334 @@
+'''This module implements the compact binary format of BinaryStorage and a
+    converter between it and the JSON file format of FileStorage.
+
+    A file starts with `MAGIC`, followed by one record per object: a 4-byte
+    little-endian length, then the object's attributes encoded as a map.
+    Every value starts with a one-byte type tag:
+
+        NONE, FALSE, TRUE        no payload
+        INT                      8-byte signed integer
+        BIGINT                   a STR payload holding the decimal digits
+        FLOAT                    8-byte IEEE 754 double
+        STR                      4-byte length, then UTF-8 bytes
+        UUID                     16 bytes, for canonical lowercase UUIDs
+        TIME                     8-byte signed microseconds since the epoch
+        LIST                     4-byte count, then the values
+        MAP                      4-byte count, then STR payload keys and
+                                 their values
+
+    Usage:
+        python3 -m models.engine.binary_format to-binary file.json file.bin
+        python3 -m models.engine.binary_format to-json file.bin file.json
+'''
+import json
+import re
+import struct
+import sys
+from datetime import datetime, timedelta
+from models.engine.file_storage import atomic_write
+
+MAGIC = b"HBNB\x00\x01"
+NONE, FALSE, TRUE, INT, BIGINT, FLOAT, STR, UUID, TIME, LIST, MAP = \
+    (bytes([tag]) for tag in range(11))
+EPOCH = datetime(1970, 1, 1)
+TIMESTAMPS = ("created_at", "updated_at")
+
+uuid_pattern = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+size = struct.Struct("<I")
+int64 = struct.Struct("<q")
+float64 = struct.Struct("<d")
+# Decoded map keys, shared by the records of a file since they mostly hold
+# the same attribute names.
+keys = {}
+
+
+def encode(value, out):
+    '''Appends the encoding of a value to a list of byte strings.
+
+    Args:
+        value: None, a bool, int, float, str, naive datetime, or a list,
+            tuple or dict (with str keys) of those.
+        out (list): The byte strings to append to.
+
+    Raises:
+        TypeError: If the value, or a value it holds, cannot be encoded.
+    '''
+    if isinstance(value, str):
+        if len(value) == 36 and uuid_pattern.fullmatch(value):
+            out.append(UUID + bytes.fromhex(value.replace("-", "")))
+        else:
+            data = value.encode()
+            out.append(STR + size.pack(len(data)) + data)
+    elif isinstance(value, datetime):
+        if value.tzinfo is not None:
+            raise TypeError("aware datetimes are not supported")
+        out.append(TIME + int64.pack((value - EPOCH) //
+                                     timedelta(microseconds=1)))
+    elif value is None:
+        out.append(NONE)
+    elif value is True or value is False:
+        out.append(TRUE if value else FALSE)
+    elif isinstance(value, int):
+        if -(1 << 63) <= value < 1 << 63:
+            out.append(INT + int64.pack(value))
+        else:
+            data = str(value).encode()
+            out.append(BIGINT + size.pack(len(data)) + data)
+    elif isinstance(value, float):
+        out.append(FLOAT + float64.pack(value))
+    elif isinstance(value, (list, tuple)):
+        out.append(LIST + size.pack(len(value)))
+        for item in value:
+            encode(item, out)
+    elif isinstance(value, dict):
+        out.append(MAP + size.pack(len(value)))
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise TypeError("map keys must be strings")
+            data = key.encode()
+            out.append(size.pack(len(data)) + data)
+            encode(item, out)
+    else:
+        raise TypeError("cannot encode {}".format(type(value).__name__))
+
+
+def decode(data, pos):
+    '''Decodes the value starting at an offset.
+
+    Args:
+        data (bytes): The encoded bytes.
+        pos (int): The offset of the value's type tag.
+
+    Returns:
+        tuple: The value and the offset just past it.
+
+    Raises:
+        ValueError: If the bytes are not a valid encoding.
+    '''
+    tag = data[pos]
+    pos += 1
+    if tag == MAP[0]:
+        unpack = size.unpack_from
+        count = unpack(data, pos)[0]
+        pos += 4
+        value = {}
+        for _ in range(count):
+            length = unpack(data, pos)[0]
+            pos += 4
+            raw = data[pos:pos + length]
+            key = keys.get(raw)
+            if key is None:
+                key = raw.decode()
+                if len(keys) < 4096:
+                    keys[raw] = key
+            pos += length
+            # Strings, ids and timestamps are decoded inline: records are
+            # flat maps of them, and a call per attribute would dominate the
+            # decoding time.
+            tag = data[pos]
+            if tag == STR[0]:
+                length = unpack(data, pos + 1)[0]
+                pos += 5 + length
+                value[key] = data[pos - length:pos].decode()
+            elif tag == UUID[0]:
+                digits = data[pos + 1:pos + 17].hex()
+                value[key] = "-".join((digits[:8], digits[8:12],
+                                       digits[12:16], digits[16:20],
+                                       digits[20:]))
+                pos += 17
+            elif tag == TIME[0]:
+                value[key] = EPOCH + timedelta(
+                    microseconds=int64.unpack_from(data, pos + 1)[0])
+                pos += 9
+            else:
+                value[key], pos = decode(data, pos)
+        return value, pos
+    if tag == STR[0]:
+        length = size.unpack_from(data, pos)[0]
+        pos += 4
+        return data[pos:pos + length].decode(), pos + length
+    if tag == UUID[0]:
+        return uuid_text(data[pos:pos + 16].hex()), pos + 16
+    if tag == TIME[0]:
+        micros = int64.unpack_from(data, pos)[0]
+        return EPOCH + timedelta(microseconds=micros), pos + 8
+    if tag == INT[0]:
+        return int64.unpack_from(data, pos)[0], pos + 8
+    if tag == FLOAT[0]:
+        return float64.unpack_from(data, pos)[0], pos + 8
+    if tag == LIST[0]:
+        count = size.unpack_from(data, pos)[0]
+        pos += 4
+        value = []
+        for _ in range(count):
+            item, pos = decode(data, pos)
+            value.append(item)
+        return value, pos
+    if tag == NONE[0]:
+        return None, pos
+    if tag == TRUE[0]:
+        return True, pos
+    if tag == FALSE[0]:
+        return False, pos
+    if tag == BIGINT[0]:
+        length = size.unpack_from(data, pos)[0]
+        pos += 4
+        return int(data[pos:pos + length]), pos + length
+    raise ValueError("unknown type tag {} at offset {}".format(tag, pos - 1))
+
+
+def uuid_text(digits):
+    '''Returns the canonical form of a UUID.
+
+    Args:
+        digits (str): The 32 hexadecimal digits of the UUID.
+
+    Returns:
+        str: The digits grouped 8-4-4-4-12 by hyphens.
+    '''
+    return "-".join((digits[:8], digits[8:12], digits[12:16], digits[16:20],
+                     digits[20:]))
+
+
+def dumps(value):
+    '''Returns the encoding of a value.
+
+    Args:
+        value: The value to encode.
+
+    Returns:
+        bytes: The encoded value.
+    '''
+    out = []
+    encode(value, out)
+    return b"".join(out)
+
+
+def loads(data):
+    '''Returns the value encoded in a byte string.
+
+    Args:
+        data (bytes): The encoded value.
+
+    Returns:
+        The decoded value.
+    '''
+    return decode(data, 0)[0]
+
+
+def pack_records(records):
+    '''Returns the contents of a binary file holding encoded records.
+
+    Args:
+        records (iterable): The records, each already encoded with `dumps`.
+
+    Returns:
+        bytes: The file contents.
+    '''
+    return MAGIC + b"".join(size.pack(len(record)) + record
+                            for record in records)
+
+
+def write_records(records, path):
+    '''Replaces a binary file with encoded records, atomically.
+
+    Args:
+        records (iterable): The records, each already encoded with `dumps`.
+        path (str): The path of the file to write.
+    '''
+    atomic_write(path, pack_records(records))
+
+
+def read_records(data):
+    '''Decodes the records of a binary file.
+
+    Args:
+        data (bytes): The contents of the file.
+
+    Yields:
+        tuple: The attributes of each object, including "__class__", and
+            the record's encoded bytes.
+
+    Raises:
+        ValueError: If the data is not in the binary format, or is
+            truncated.
+    '''
+    if not data.startswith(MAGIC):
+        raise ValueError("not an HBNB binary file")
+    pos = len(MAGIC)
+    while pos < len(data):
+        if pos + 4 > len(data):
+            raise ValueError("truncated record at offset {}".format(pos))
+        length = size.unpack_from(data, pos)[0]
+        pos += 4
+        if pos + length > len(data):
+            raise ValueError("truncated record at offset {}".format(pos))
+        try:
+            record, end = decode(data, pos)
+        except (struct.error, IndexError) as error:
+            raise ValueError("corrupt record at offset {}: {}".format(
+                pos, error)) from error
+        if end != pos + length:
+            raise ValueError("corrupt record at offset {}".format(pos))
+        yield record, data[pos:end]
+        pos = end
+
+
+def json_to_binary(json_path, binary_path):
+    '''Converts a FileStorage JSON file to the binary format.
+
+    Args:
+        json_path (str): The path of the JSON file to read.
+        binary_path (str): The path of the binary file to write.
+    '''
+    with open(json_path, 'r') as json_file:
+        objects = json.load(json_file)
+    records = []
+    for value in objects.values():
+        for key in TIMESTAMPS:
+            if isinstance(value.get(key), str):
+                value[key] = datetime.fromisoformat(value[key])
+        records.append(dumps(value))
+    write_records(records, binary_path)
+
+
+def binary_to_json(binary_path, json_path):
+    '''Converts a binary file to the FileStorage JSON format.
+
+    Args:
+        binary_path (str): The path of the binary file to read.
+        json_path (str): The path of the JSON file to write.
+    '''
+    with open(binary_path, 'rb') as binary_file:
+        data = binary_file.read()
+    objects = {}
+    for record, _ in read_records(data):
+        for key, value in record.items():
+            if isinstance(value, datetime):
+                record[key] = value.isoformat()
+        objects["{}.{}".format(record["__class__"], record["id"])] = record
+    atomic_write(json_path, json.dumps(objects))
+
+
+def main(argv):
+    '''Runs the converter from the command line.
+
+    Args:
+        argv (list): The arguments: "to-binary" or "to-json", the source
+            path and the destination path.
+
+    Returns:
+        int: The exit status.
+    '''
+    commands = {"to-binary": json_to_binary, "to-json": binary_to_json}
+    if len(argv) != 3 or argv[0] not in commands:
+        print("usage: python3 -m models.engine.binary_format "
+              "to-binary|to-json <source> <destination>")
+        return 2
+    commands[argv[0]](argv[1], argv[2])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,103 @@
+'''This module provides the DBStorage class, a FileStorage variant that
+    persists objects in a SQLite database through the standard library's
+    sqlite3 module.
+'''
+import json
+import sqlite3
+from models.engine.base_storage import synchronized
+from models.engine.file_storage import classes
+from models.engine.incremental_storage import IncrementalStorage
+
+
+class DBStorage(IncrementalStorage):
+    '''A storage engine that keeps one SQLite table per model class.
+
+        Each table holds one row per object:
+
+            id TEXT PRIMARY KEY, created_at TEXT, updated_at TEXT, data TEXT
+
+        where `data` is the JSON object of every other attribute. Objects
+        are held in memory and indexed exactly as with `FileStorage`;
+        `save()` writes only the rows of the objects added, changed or
+        removed since the last save or reload, in a single transaction.
+
+        Attributes:
+            __db_path (str): The path to the SQLite database file.
+    '''
+    __db_path = "file.sqlite"
+    __columns = ("id", "created_at", "updated_at")
+
+    def __init__(self):
+        '''Initializes the engine without opening the database.'''
+        super().__init__()
+        self.__connection = None
+
+    def write_changes(self, changed, deleted):
+        '''Deletes the rows of the objects removed and writes those of the
+            objects added or changed, in a single transaction.
+
+            Args:
+                changed (list): The stored objects added or changed.
+                deleted (set): The (class name, id) pairs removed.
+        '''
+        rows = {}
+        for obj in changed:
+            fields = obj.to_dict()
+            del fields["__class__"]
+            row = [fields.pop(column, None) for column in self.__columns]
+            row.append(json.dumps(fields))
+            rows.setdefault(obj.__class__.__name__, []).append(row)
+        connection = self.__connect()
+        with connection:
+            for cls, obj_id in deleted:
+                connection.execute('DELETE FROM "{}" WHERE id = ?'
+                                   .format(cls), (obj_id,))
+            for cls, cls_rows in rows.items():
+                connection.executemany(
+                    'INSERT OR REPLACE INTO "{}" VALUES (?, ?, ?, ?)'
+                    .format(cls), cls_rows)
+
+    @synchronized
+    def reload(self):
+        '''Loads every row of every model table as an object.'''
+        connection = self.__connect()
+        for name, cls in classes.items():
+            cursor = connection.execute(
+                'SELECT id, created_at, updated_at, data FROM "{}"'
+                .format(name))
+            for row in cursor:
+                fields = json.loads(row[3])
+                for column, value in zip(self.__columns, row):
+                    if value is not None:
+                        fields[column] = value
+                obj = cls(**fields)
+                self.new(obj)
+                self.mark_clean(obj, None)
+        self.clear_changes()
+
+    def close(self):
+        '''Closes the database connection; the next access reopens it.'''
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+
+    def __connect(self):
+        '''Returns the database connection, opening it and creating the
+            model tables on first use.
+
+            The connection may be used from the group window timer's
+            thread, which saves under the engine's request lock.
+
+            Returns:
+                sqlite3.Connection: The open connection.
+        '''
+        if self.__connection is None:
+            self.__connection = sqlite3.connect(self.__db_path,
+                                                check_same_thread=False)
+            with self.__connection:
+                for name in classes:
+                    self.__connection.execute(
+                        'CREATE TABLE IF NOT EXISTS "{}" ('
+                        'id TEXT PRIMARY KEY, created_at TEXT, '
+                        'updated_at TEXT, data TEXT NOT NULL)'.format(name))
+        return self.__connection
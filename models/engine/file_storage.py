@@ -3,53 +3,823 @@
     basic object management.
 '''
 import json
+import os
+import re
 from models.base_model import BaseModel
 from models.user import User
+from models.state import State
+from models.city import City
+from models.place import Place
+from models.amenity import Amenity
+from models.review import Review
+from models.engine.base_storage import BaseStorage, synchronized
+from models.engine.index import ColumnTable, GridIndex, HashIndex, \
+    InvertedIndex, SortedIndex, TextIndex
+from models.engine.query import Query
 
+classes = {
+    "BaseModel": BaseModel,
+    "User": User,
+    "State": State,
+    "City": City,
+    "Place": Place,
+    "Amenity": Amenity,
+    "Review": Review
+}
+fsync_policies = ("none", "file", "dir")
 
-class FileStorage:
+
+def atomic_write(path, data, fsync="none"):
+    '''Replaces a file with new contents, so that a crash leaves either
+        the old or the new contents, never a truncated file.
+
+        The data is written to a temporary file next to `path`, which is
+        then renamed over it.
+
+        Args:
+            path (str): The path of the file to replace.
+            data (str or bytes): The new contents, or an iterable of
+                bytes holding them in chunks, written as they are produced.
+            fsync (str): The durability policy: "none" leaves flushing to
+                the operating system, "file" syncs the file before the
+                rename, and "dir" also syncs the directory after it, so
+                the rename itself survives a power loss.
+
+        Raises:
+            ValueError: If `fsync` is not one of `fsync_policies`.
+    '''
+    if fsync not in fsync_policies:
+        raise ValueError("unknown fsync policy: {}".format(fsync))
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, 'w' if isinstance(data, str) else 'wb') as tmp:
+            if isinstance(data, (str, bytes)):
+                tmp.write(data)
+            else:
+                tmp.writelines(data)
+            if fsync != "none":
+                tmp.flush()
+                os.fsync(tmp.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if fsync == "dir":
+        sync_directory(path)
+
+
+def append_write(path, data, fsync="none"):
+    '''Appends to a file, creating it if needed, under an fsync policy.
+
+        Args:
+            path (str): The path of the file to append to.
+            data (str or bytes): The contents to append.
+            fsync (str): The durability policy, as for `atomic_write()`:
+                "file" syncs the file after the write, and "dir" also syncs
+                the directory when the file is created.
+
+        Raises:
+            ValueError: If `fsync` is not one of `fsync_policies`.
+    '''
+    if fsync not in fsync_policies:
+        raise ValueError("unknown fsync policy: {}".format(fsync))
+    created = fsync == "dir" and not os.path.exists(path)
+    with open(path, 'ab' if isinstance(data, bytes) else 'a') as out:
+        out.write(data)
+        if fsync != "none":
+            out.flush()
+            os.fsync(out.fileno())
+    if created:
+        sync_directory(path)
+
+
+def sync_directory(path):
+    '''Syncs the directory holding a file, so that a rename or creation of
+        the file survives a power loss.
+
+        Args:
+            path (str): The path of the file.
+    '''
+    directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+class FileStorage(BaseStorage):
     '''A class that handles serialization and deserialization of objects
         to/from a JSON file.
 
+        Each stored object's JSON text is cached between saves. Objects
+        report attribute changes through `mark_dirty()`, which drops their
+        cache entry; `save()` only calls `to_dict()` on objects without one
+        and writes every other object straight from the cache.
+
+        The term counts of the `__searchable__` text indexes are logged
+        next to the JSON file, at `__file_path` + ".text", and reused by
+        `reload()` for every object whose text has not changed. Each save
+        appends only the counts that changed, one JSON line per object;
+        the log is rewritten once it holds twice as many lines as live
+        entries.
+
+        In lazy mode, `reload()` only records where each object's JSON text
+        sits in the file. An object is built the first time it is looked up
+        with `get()`, and the objects of a class the first time the class
+        is listed, queried or searched; `count()` and `save()` never build
+        objects.
+
+        Saves replace the JSON file atomically, see `atomic_write()`;
+        `fsync` picks how durable each save is, at the cost of its latency.
+
         Attributes:
+            lazy (bool): Whether `reload()` defers building objects.
+            fsync (str): The durability policy of saves, one of
+                `fsync_policies`.
             __file_path (str): The path to the JSON file for storage.
-            __objects (dict): An internal dictionary storing objects in memory.
+            __objects (dict): An internal dictionary storing objects in memory,
+                keyed by "<class name>.<id>".
+            __partitions (dict): The objects of `__objects` split per class
+                name, so class-scoped listing and counting never visit
+                objects of other classes.
+            __indexes (dict): Maps each class name to the attribute indexes
+                declared in the class's `__indexed__`, `__sorted__` and
+                `__inverted__` tuples, and to its `__spatial__` and
+                `__searchable__` indexes and `__columnar__` table keyed by
+                the tuple of their attribute names.
+            __pending (dict): Maps each class name to the keys of the
+                objects a lazy reload has not built yet, and those to the
+                (start, end) offsets of their JSON text in `__source`.
+            __source (str): The file contents read by the last lazy reload.
     '''
+    lazy = False
+    __fsync = "none"
     __file_path = "file.json"
     __objects = {}
+    __partitions = {}
+    __indexes = {}
+    __pending = {}
+    __source = ""
+    __synced = None
+
+    def __init__(self):
+        '''Initializes the engine with an empty serialization cache.'''
+        super().__init__()
+        self.__serialized = {}
+        self.__text_lines = None
+        self.__cache_hits = 0
+        self.__cache_misses = 0
+
+    @property
+    def fsync(self):
+        '''str: The durability policy of saves, one of `fsync_policies`.
+
+            Raises:
+                ValueError: On assigning a policy that is not one of
+                    `fsync_policies`.
+        '''
+        return self.__fsync
+
+    @fsync.setter
+    def fsync(self, policy):
+        if policy not in fsync_policies:
+            raise ValueError("unknown fsync policy: {}".format(policy))
+        self.__fsync = policy
+
+    @fsync.deleter
+    def fsync(self):
+        self.__fsync = FileStorage.__fsync
+
+    def all(self, cls=None):
+        '''Returns the dictionary containing all stored objects, or only
+            those of a given class.
+
+            The returned dictionary is the storage's own; use `new()` and
+            `delete()` rather than modifying it.
+
+            Args:
+                cls: The class, or class name, to restrict the result to.
+
+            Returns:
+                dict: A dictionary of the stored objects, where keys are
+                    "<class name>.<id>".
+        '''
+        if not isinstance(cls, str) and cls is not None:
+            cls = cls.__name__
+        self.__load(cls)
+        if cls is None:
+            return self.__objects
+        return self.__partitions.get(cls, {})
+
+    def count(self, cls=None):
+        '''Returns the number of stored objects, or of objects of a given
+            class.
+
+            Args:
+                cls: The class, or class name, to count.
+
+            Returns:
+                int: The number of matching objects.
+        '''
+        self.__sync()
+        if cls is None:
+            return len(self.__objects) + sum(
+                len(keys) for keys in self.__pending.values())
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        return len(self.__partitions.get(cls, {})) + \
+            len(self.__pending.get(cls, {}))
+
+    def get(self, cls, id):
+        '''Returns the object of a given class and id.
+
+            Args:
+                cls: The class of the object, or its name.
+                id (str): The id of the object.
+
+            Returns:
+                The stored object, or None if there is no such object.
+        '''
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        key = "{}.{}".format(cls, id)
+        self.__sync()
+        if key in self.__pending.get(cls, {}):
+            self.__build(cls, key)
+        return self.__objects.get(key)
+
+    def find(self, cls, **kwargs):
+        '''Returns the objects of a class whose attributes equal the given
+            values.
+
+            Args:
+                cls: The class of the objects, or its name.
+                **kwargs: Attribute names and the values they must equal.
+
+            Returns:
+                list: The matching objects.
+        '''
+        query = self.query(cls)
+        for attr, value in kwargs.items():
+            query.where(attr, "==", value)
+        return query.all()
+
+    def query(self, cls):
+        '''Starts a query over the objects of a class.
+
+            Args:
+                cls: The class of the objects, or its name.
+
+            Returns:
+                Query: A query matching every object of the class.
+        '''
+        return Query(self, cls)
+
+    def index(self, cls, attr):
+        '''Returns the index kept on an attribute of a class.
+
+            Args:
+                cls: The class, or its name.
+                attr (str): The attribute name, or the tuple of attribute
+                    names of a `__spatial__` index.
+
+            Returns:
+                The index, or None if the attribute is not indexed.
+        '''
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__load(cls)
+        return self.__indexes.get(cls, {}).get(attr)
+
+    def having(self, cls, attr, values, match_any=False):
+        '''Returns the objects of a class whose list attribute holds all (or
+            any) of some values.
+
+            Args:
+                cls: The class of the objects, or its name.
+                attr (str): The list attribute, e.g. "amenity_ids".
+                values (iterable): The values to look for.
+                match_any (bool): Match objects holding at least one of the
+                    values instead of all of them.
+
+            Returns:
+                list: The matching objects.
+        '''
+        index = self.index(cls, attr)
+        if not isinstance(index, InvertedIndex):
+            index = InvertedIndex(attr)
+            for key, obj in self.all(cls).items():
+                index.add(key, obj)
+        if match_any:
+            return list(index.any_of(values).values())
+        return list(index.all_of(values).values())
+
+    def search(self, cls, text, limit=None):
+        '''Returns the objects of a class whose `__searchable__` attributes
+            match keywords, most relevant first.
+
+            Args:
+                cls: The class of the objects, or its name.
+                text (str): The keywords to look for.
+                limit (int): The maximum number of results, or None for all.
+
+            Returns:
+                list: (score, object) tuples sorted by decreasing BM25
+                    score; empty if the class declares no searchable
+                    attributes.
+        '''
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__load(cls)
+        index = self.__text_indexes().get(cls)
+        if index is None:
+            return []
+        return index.rank(text, limit)
+
+    def __text_indexes(self):
+        '''Returns the text index of every class declaring one.
+
+            Returns:
+                dict: Maps class names to their TextIndex.
+        '''
+        self.__sync()
+        return {name: index for name, indexes in self.__indexes.items()
+                for index in indexes.values()
+                if isinstance(index, TextIndex)}
+
+    def within(self, cls, min_lat, min_lon, max_lat, max_lon):
+        '''Returns the objects of a class inside a bounding box.
+
+            Args:
+                cls: The class of the objects, or its name.
+                min_lat (float): The southern edge, in degrees.
+                min_lon (float): The western edge, in degrees.
+                max_lat (float): The northern edge, in degrees.
+                max_lon (float): The eastern edge, in degrees; a box whose
+                    `min_lon` is greater crosses the 180th meridian.
+
+            Returns:
+                list: The matching objects.
+        '''
+        index = self.__spatial(cls)
+        return list(index.within(min_lat, min_lon, max_lat, max_lon).values())
 
-    def all(self):
-        '''Returns the dictionary containing all stored objects.
+    def near(self, cls, lat, lon, radius):
+        '''Returns the objects of a class within a distance of a point.
+
+            Args:
+                cls: The class of the objects, or its name.
+                lat (float): The latitude of the point, in degrees.
+                lon (float): The longitude of the point, in degrees.
+                radius (float): The distance, in kilometers.
+
+            Returns:
+                list: (distance in kilometers, object) tuples, nearest first.
+        '''
+        return self.__spatial(cls).near(lat, lon, radius)
+
+    def table(self, cls, attrs=()):
+        '''Returns the column table of a class, or a throwaway one built
+            over its objects if the class declares none holding some
+            attributes.
+
+            Args:
+                cls: The class, or its name.
+                attrs (iterable): The attributes the table must hold.
+
+            Returns:
+                ColumnTable: A table holding the objects of the class.
+        '''
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        model = classes.get(cls)
+        columns = tuple(getattr(model, "__columnar__", ()))
+        attrs = tuple(attrs)
+        if columns and set(attrs) <= set(columns):
+            return self.index(cls, columns)
+        table = ColumnTable(attrs, [attr for attr in attrs if isinstance(
+            getattr(model, attr, None), (int, float))])
+        for key, obj in self.all(cls).items():
+            table.add(key, obj)
+        return table
+
+    def aggregate(self, cls, func, attr=None, by=None):
+        '''Computes an aggregate over an attribute of the objects of a
+            class, e.g. the mean `price_by_night` of places by `city_id`.
+
+            Args:
+                cls: The class of the objects, or its name.
+                func (str): One of "count", "sum", "mean", "min" and "max".
+                attr (str): The attribute to aggregate; only "count" may
+                    omit it, to count objects.
+                by (str): The attribute whose values group the objects, or
+                    None to aggregate them all.
 
             Returns:
-                dict: A dictionary of all stored objects, where keys are
-                    object type and ID.
+                The aggregate or, with `by`, a dict mapping each group
+                    value to its aggregate; see `ColumnTable.aggregate()`.
         '''
-        return self.__objects
+        attrs = [name for name in (attr, by) if name is not None]
+        return self.table(cls, attrs).aggregate(func, attr, by)
+
+    def __spatial(self, cls):
+        '''Returns the spatial index of a class, or a throwaway one built
+            over its objects if the class declares none.
+
+            Args:
+                cls: The class, or its name.
 
+            Returns:
+                GridIndex: An index holding the objects of the class.
+        '''
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        attrs = tuple(getattr(classes.get(cls), "__spatial__", ()))
+        index = self.index(cls, attrs) if attrs else None
+        if index is None:
+            index = GridIndex()
+            for key, obj in self.all(cls).items():
+                index.add(key, obj)
+        return index
+
+    @synchronized
     def new(self, obj):
         '''Adds a new object to the internal storage.
 
+            In a transaction, the object and any object it replaces are
+            reported with `mark_changing()`, so a rollback removes the one
+            and restores the other.
+
             Args:
                 obj: The object to be stored.
         '''
-        self.__objects[obj.__class__.__name__ + '.' + str(obj)] = obj
+        cls = obj.__class__.__name__
+        key = "{}.{}".format(cls, obj.id)
+        self.__sync()
+        if self.in_transaction():
+            if key in self.__pending.get(cls, {}):
+                self.__build(cls, key)
+            stored = self.__objects.get(key)
+            if stored is not obj:
+                if stored is not None:
+                    self.mark_changing(stored)
+                self.mark_changing(obj)
+        self.__pending.get(cls, {}).pop(key, None)
+        self.__store(cls, key, obj)
+        self.mark_dirty(obj)
+
+    def __store(self, cls, key, obj):
+        '''Adds an object to the objects dictionary, its class partition
+            and the indexes of its class.
+
+            Args:
+                cls (str): The class name of the object.
+                key (str): The storage key of the object.
+                obj: The object to be stored.
+        '''
+        self.__objects[key] = obj
+        self.__partitions.setdefault(cls, {})[key] = obj
+        for index in self.__indexes.get(cls, {}).values():
+            index.add(key, obj)
+
+    @synchronized
+    def mark_dirty(self, obj):
+        '''Flags an object as changed since the last save by dropping its
+            cached JSON text, and re-indexes it if it is stored.
+
+            Args:
+                obj: The object that was created or modified.
+        '''
+        self.__serialized.pop(obj, None)
+        cls = obj.__class__.__name__
+        self.__sync()
+        if self.__indexes.get(cls):
+            key = "{}.{}".format(cls, getattr(obj, "id", None))
+            if self.__objects.get(key) is obj:
+                for index in self.__indexes[cls].values():
+                    index.update(key, obj)
+
+    def mark_clean(self, obj, text):
+        '''Flags a stored object as matching its saved JSON text, which is
+            cached so the next save can write it without re-encoding.
+
+            Args:
+                obj: The object that was loaded or saved.
+                text (str): The JSON text of the object.
+        '''
+        self.__serialized[obj] = text
+
+    def defer(self, source, offsets):
+        '''Registers objects to be built from their JSON text on first
+            access instead of now.
+
+            Objects deferred by an earlier call and missing from `offsets`
+            are built first, from their own source. Objects of `offsets`
+            already stored are built right away, replacing them.
+
+            Args:
+                source: The text holding the objects; any str, bytes or
+                    buffer (such as a memory map) that can be sliced.
+                offsets (dict): Maps each class name to the keys of its
+                    objects, and those to the (start, end) offsets of their
+                    JSON text in `source`.
+        '''
+        self.__sync()
+        for keys in self.__pending.values():
+            for key in list(keys):
+                cls = key.partition(".")[0]
+                if key not in offsets.get(cls, {}):
+                    self.__build(cls, key)
+        FileStorage.__pending = {cls: dict(keys)
+                                 for cls, keys in offsets.items()}
+        FileStorage.__source = source
+        for cls, keys in offsets.items():
+            for key in keys:
+                if key in self.__objects:
+                    self.__build(cls, key)
+
+    def cache_stats(self):
+        '''Returns the serialization cache counters.
+
+            Returns:
+                dict: `hits` and `misses` counted by `save()` since the
+                    engine was created, and the current cache `size`.
+        '''
+        return {"hits": self.__cache_hits,
+                "misses": self.__cache_misses,
+                "size": len(self.__serialized)}
 
+    @synchronized
+    def delete(self, obj=None):
+        '''Removes an object from the internal storage.
+
+            Args:
+                obj: The object to remove. Nothing happens if it is None or
+                    not stored.
+        '''
+        if obj is None:
+            return
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        self.__sync()
+        if self.__objects.get(key) is obj:
+            self.mark_changing(obj)
+            del self.__objects[key]
+            del self.__partitions[obj.__class__.__name__][key]
+            for index in self.__indexes.get(obj.__class__.__name__,
+                                            {}).values():
+                index.remove(key)
+        self.__serialized.pop(obj, None)
+
+    def __sync(self):
+        '''Rebuilds the per-class partitions and attribute indexes if
+            `__objects` has been replaced by another dictionary.
+        '''
+        if FileStorage.__synced is FileStorage.__objects:
+            return
+        partitions = {}
+        indexes = {}
+        for name, cls in classes.items():
+            indexes[name] = {}
+            for attr in getattr(cls, "__indexed__", ()):
+                indexes[name][attr] = HashIndex(attr)
+            for attr in getattr(cls, "__sorted__", ()):
+                indexes[name][attr] = SortedIndex(attr)
+            for attr in getattr(cls, "__inverted__", ()):
+                indexes[name][attr] = InvertedIndex(attr)
+            attrs = tuple(getattr(cls, "__spatial__", ()))
+            if attrs:
+                indexes[name][attrs] = GridIndex(attrs)
+            attrs = tuple(getattr(cls, "__searchable__", ()))
+            if attrs:
+                indexes[name][attrs] = TextIndex(attrs)
+            attrs = tuple(getattr(cls, "__columnar__", ()))
+            if attrs:
+                indexes[name][attrs] = ColumnTable(attrs, [
+                    attr for attr in attrs
+                    if isinstance(getattr(cls, attr, None), (int, float))])
+        for key, obj in FileStorage.__objects.items():
+            cls = obj.__class__.__name__
+            partitions.setdefault(cls, {})[key] = obj
+            for index in indexes.get(cls, {}).values():
+                index.add(key, obj)
+        FileStorage.__partitions = partitions
+        FileStorage.__indexes = indexes
+        FileStorage.__pending = {}
+        FileStorage.__source = ""
+        FileStorage.__synced = FileStorage.__objects
+
+    def __load(self, cls=None):
+        '''Builds the objects a lazy reload left pending.
+
+            Args:
+                cls (str): The class name to build the objects of, or None
+                    for every class.
+        '''
+        self.__sync()
+        names = list(self.__pending) if cls is None else [cls]
+        for name in names:
+            for key in list(self.__pending.get(name, ())):
+                self.__build(name, key)
+
+    @synchronized
+    def __build(self, cls, key):
+        '''Builds one pending object from its JSON text and stores it.
+
+            Args:
+                cls (str): The class name of the object.
+                key (str): The storage key of the object.
+        '''
+        start, end = self.__pending[cls].pop(key)
+        text = self.__source[start:end]
+        if isinstance(text, bytes):
+            text = text.decode()
+        obj = classes[cls](**json.loads(text))
+        self.__store(cls, key, obj)
+        self.mark_clean(obj, text)
+
+    @synchronized
     def save(self):
-        '''Serializes the internal objects dictionary to a JSON file.'''
-        with open(self.__file_path, 'w+') as json_file:
-            json.dump({key: value.to_dict() for key, value in
-                      self.__objects.items()}, json_file)
+        '''Serializes the internal objects dictionary to a JSON file.
+
+            Objects with cached JSON text are written from the cache; only
+            objects flagged by `mark_dirty()` go through `to_dict()`.
+        '''
+        self.__sync()
+        serialized = {}
+        entries = []
+        for keys in self.__pending.values():
+            for key, (start, end) in keys.items():
+                entries.append("{}: {}".format(json.dumps(key),
+                                               self.__source[start:end]))
+        for key, value in self.__objects.items():
+            text = self.__serialized.get(value)
+            if text is None:
+                text = json.dumps(value.to_dict())
+                self.__cache_misses += 1
+            else:
+                self.__cache_hits += 1
+            serialized[value] = text
+            entries.append("{}: {}".format(json.dumps(key), text))
+        self.__serialized = serialized
+        atomic_write(self.__file_path, "{" + ", ".join(entries) + "}",
+                     self.fsync)
+        self.__save_terms()
+
+    def __save_terms(self):
+        '''Appends the term counts the text indexes changed since the last
+            save to the ".text" log, or rewrites the log with every count
+            once it has grown to twice the live entries (or was never read).
+
+            The term counts are only a cache, checked against each object's
+            text on reload, so they are not synced, and a torn last line is
+            skipped by `__load_terms()`.
+        '''
+        text_indexes = self.__text_indexes()
+        lines = []
+        for name, index in text_indexes.items():
+            for key, entry in index.changes().items():
+                lines.append(json.dumps([name, key, entry]) + "\n")
+        path = self.__file_path + ".text"
+        size = sum(index.dump_size() for index in text_indexes.values())
+        if self.__text_lines is None or \
+                self.__text_lines + len(lines) > 2 * size + 64:
+            lines = [json.dumps([name, key, entry]) + "\n"
+                     for name, index in text_indexes.items()
+                     for key, entry in index.dump().items()]
+            atomic_write(path, "".join(lines))
+            self.__text_lines = len(lines)
+        elif lines:
+            with open(path, 'a') as text_file:
+                text_file.write("".join(lines))
+            self.__text_lines += len(lines)
+
+    def __load_terms(self):
+        '''Replays the ".text" log.
+
+            Returns:
+                dict: Maps each class name to the term counts of its text
+                    index, in the form `TextIndex.preload()` accepts.
+        '''
+        saved_terms = {}
+        self.__text_lines = 0
+        try:
+            with open(self.__file_path + ".text", 'r') as text_file:
+                for line in text_file:
+                    self.__text_lines += 1
+                    try:
+                        name, key, entry = json.loads(line)
+                        terms = saved_terms.setdefault(name, {})
+                        if entry is None:
+                            terms.pop(key, None)
+                        else:
+                            checksum, counts = entry
+                            terms[key] = [int(checksum), dict(counts)]
+                    except (ValueError, TypeError):
+                        continue
+        except OSError:
+            pass
+        return saved_terms
 
+    @synchronized
     def reload(self):
         '''Deserializes the JSON file to the internal objects dictionary
             (if it exists).
+
+            The JSON text of every loaded object is kept in the cache so an
+            unchanged store is written back without re-encoding, and the
+            saved term counts of the text indexes are reused for objects
+            whose text is unchanged.
+
+            In lazy mode, objects are only located in the file and left to
+            be built on first access; any already stored object of the same
+            key is built over right away.
+
+            Raises:
+                ValueError: If the JSON file exists but cannot be loaded;
+                    starting empty would lose it on the next save.
         '''
+        text_indexes = self.__text_indexes()
+        saved_terms = self.__load_terms()
+        for name, index in text_indexes.items():
+            index.preload(saved_terms.get(name, {}))
         try:
             with open(self.__file_path, 'r') as json_file:
-                json_str_dict = json.loads(json_file.read())
-                for value in json_str_dict.values():
-                    cls = value["__class__"]
-                    self.new(eval(cls)(**value))
-        except Exception:
-            pass
+                source = json_file.read()
+        except FileNotFoundError:
+            source = "{}"
+        try:
+            if self.lazy:
+                self.__locate(source)
+            else:
+                for key, value, start, end in self.__entries(source):
+                    obj = classes[value["__class__"]](**value)
+                    self.new(obj)
+                    self.mark_clean(obj, source[start:end])
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            raise ValueError("cannot reload {}: {!r}".format(
+                self.__file_path, error)) from error
+        for name, index in text_indexes.items():
+            pending = self.__pending.get(name, {})
+            index.preload({key: terms for key, terms
+                           in saved_terms.get(name, {}).items()
+                           if key in pending})
+
+    def __locate(self, source):
+        '''Records the offsets of the objects in the file contents for a
+            lazy reload.
+
+            Objects are keyed by their class and id, as `new()` keys them,
+            whatever key the file holds them under.
+
+            Args:
+                source (str): The contents of the JSON file.
+
+            Raises:
+                KeyError: If an object's class is unknown.
+        '''
+        offsets = {}
+        for key, value, start, end in self.__entries(source):
+            cls = value["__class__"]
+            if cls not in classes:
+                raise KeyError(cls)
+            key = "{}.{}".format(cls, value["id"])
+            offsets.setdefault(cls, {})[key] = (start, end)
+        self.defer(source, offsets)
+
+    @staticmethod
+    def __entries(text):
+        '''Decodes a JSON object one member at a time.
+
+            Args:
+                text (str): The JSON text of an object of objects.
+
+            Yields:
+                tuple: Each member's key, decoded value, and the start and
+                    end offsets of its JSON text.
+
+            Raises:
+                ValueError: If `text` is not a JSON object.
+        '''
+        decoder = json.JSONDecoder()
+        space = re.compile(r"[ \t\n\r]*")
+        idx = space.match(text).end()
+        if text[idx:idx + 1] != "{":
+            raise ValueError("expected a JSON object")
+        idx = space.match(text, idx + 1).end()
+        if text[idx:idx + 1] == "}":
+            return
+        while True:
+            key, idx = decoder.raw_decode(text, idx)
+            idx = space.match(text, idx).end()
+            if text[idx:idx + 1] != ":":
+                raise ValueError("expected ':' after {!r}".format(key))
+            start = space.match(text, idx + 1).end()
+            value, idx = decoder.raw_decode(text, start)
+            yield key, value, start, idx
+            idx = space.match(text, idx).end()
+            if text[idx:idx + 1] == "}":
+                return
+            if text[idx:idx + 1] != ",":
+                raise ValueError("expected ',' after {!r}".format(key))
+            idx = space.match(text, idx + 1).end()
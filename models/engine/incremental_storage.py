@@ -0,0 +1,109 @@
+'''This module provides the IncrementalStorage class, the base of the
+    FileStorage variants that persist only what changed since the last save
+    instead of rewriting every object.
+'''
+from abc import abstractmethod
+from models.engine.base_storage import synchronized
+from models.engine.file_storage import FileStorage
+
+
+class IncrementalStorage(FileStorage):
+    '''A storage engine that tracks the objects added, changed or removed
+        since the last save or reload, and hands them to `write_changes()`
+        on `save()`.
+
+        Objects are queued by `new()` and `mark_dirty()`, and removals by
+        `delete()`; objects loaded by `reload()` are not changes, which
+        engines ensure with `mark_clean()` or `clear_changes()`.
+    '''
+
+    def __init__(self):
+        '''Initializes the engine with nothing queued for saving.'''
+        super().__init__()
+        self.__changed = set()
+        self.__deleted = set()
+
+    @synchronized
+    def new(self, obj):
+        '''Adds a new object to the internal storage and queues it for the
+            next save.
+
+            Args:
+                obj: The object to be stored.
+        '''
+        super().new(obj)
+        self.__changed.add(obj)
+
+    @synchronized
+    def mark_dirty(self, obj):
+        '''Queues a stored object for the next save.
+
+            Args:
+                obj: The object that was modified.
+        '''
+        super().mark_dirty(obj)
+        if self.get(obj.__class__, getattr(obj, "id", None)) is obj:
+            self.__changed.add(obj)
+
+    def mark_clean(self, obj, text):
+        '''Flags an object loaded by `reload()` as already saved.
+
+            Args:
+                obj: The object that was loaded.
+                text (str): Unused; engines keep their own saved form.
+        '''
+        self.__changed.discard(obj)
+
+    @synchronized
+    def delete(self, obj=None):
+        '''Removes an object and queues its removal for the next save.
+
+            Args:
+                obj: The object to remove. Nothing happens if it is None or
+                    not stored.
+        '''
+        if obj is None:
+            return
+        if self.get(obj.__class__, obj.id) is not obj:
+            return
+        super().delete(obj)
+        self.__changed.discard(obj)
+        self.__deleted.add((obj.__class__.__name__, obj.id))
+
+    @synchronized
+    def clear_changes(self):
+        '''Forgets every queued change, once the stored objects match what
+            is persisted.
+        '''
+        self.__changed = set()
+        self.__deleted = set()
+
+    @synchronized
+    def save(self):
+        '''Persists the objects added, changed or removed since the last
+            save or reload through `write_changes()`.
+
+            If the write fails, the changes stay queued for the next save.
+        '''
+        changed, self.__changed = self.__changed, set()
+        deleted, self.__deleted = self.__deleted, set()
+        try:
+            self.write_changes([obj for obj in changed
+                                if self.get(obj.__class__, obj.id) is obj],
+                               deleted)
+        except BaseException:
+            self.__changed |= changed
+            self.__deleted |= deleted
+            raise
+
+    @abstractmethod
+    def write_changes(self, changed, deleted):
+        '''Persists a set of changes. Removals come first: an object can be
+            removed and stored again under the same key since the last
+            save.
+
+            Args:
+                changed (list): The stored objects added or changed.
+                deleted (set): The (class name, id) pairs of the objects
+                    removed. Some may never have been persisted.
+        '''
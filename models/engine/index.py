@@ -0,0 +1,1177 @@
+'''This module provides the index structures the storage engines keep over
+    model attributes, so lookups by attribute value do not have to scan
+    every stored object.
+
+    Indexes are declared on a model class with tuples of attribute names:
+    `__indexed__` for equality lookups (HashIndex), `__sorted__` for range
+    lookups and ordering on numbers (SortedIndex), `__inverted__` for
+    membership lookups on list attributes (InvertedIndex), `__spatial__`
+    for a (latitude, longitude) pair (GridIndex), `__searchable__` for
+    ranked keyword search over string attributes (TextIndex) and
+    `__columnar__` for aggregates over whole columns (ColumnTable). The
+    storage engine keeps them up to date as objects are added, changed and
+    deleted.
+'''
+import math
+import re
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def distance(lat1, lon1, lat2, lon2):
+    '''Returns the great-circle distance between two points.
+
+    Args:
+        lat1 (float): The latitude of the first point, in degrees.
+        lon1 (float): The longitude of the first point, in degrees.
+        lat2 (float): The latitude of the second point, in degrees.
+        lon2 (float): The longitude of the second point, in degrees.
+
+    Returns:
+        float: The distance in kilometers.
+    '''
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    hav = (math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) *
+           math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(hav)))
+
+
+class HashIndex:
+    '''An equality index mapping attribute values to the stored objects
+        that hold them.
+
+        Objects whose value is unhashable (a list set through the console,
+        for instance) are kept aside and compared one by one on lookup.
+
+        Attributes:
+            attr (str): The name of the indexed attribute.
+    '''
+
+    def __init__(self, attr):
+        '''Initializes an empty index.
+
+        Args:
+            attr (str): The name of the attribute to index.
+        '''
+        self.attr = attr
+        self.__buckets = {}
+        self.__values = {}
+        self.__unhashable = {}
+
+    def add(self, key, obj):
+        '''Indexes an object, replacing any entry already held for its key.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to index.
+        '''
+        self.remove(key)
+        value = getattr(obj, self.attr, None)
+        try:
+            self.__buckets.setdefault(value, {})[key] = obj
+        except TypeError:
+            self.__unhashable[key] = obj
+        else:
+            self.__values[key] = value
+
+    def update(self, key, obj):
+        '''Re-indexes an object whose attributes may have changed.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to re-index.
+        '''
+        if key in self.__values and \
+                self.__values[key] == getattr(obj, self.attr, None):
+            return
+        self.add(key, obj)
+
+    def remove(self, key):
+        '''Drops the entry held for a key, if any.
+
+        Args:
+            key (str): The storage key of the object.
+        '''
+        if key in self.__values:
+            value = self.__values.pop(key)
+            bucket = self.__buckets[value]
+            del bucket[key]
+            if not bucket:
+                del self.__buckets[value]
+        else:
+            self.__unhashable.pop(key, None)
+
+    def lookup(self, value):
+        '''Returns the objects whose attribute equals a value.
+
+        Args:
+            value: The value to look for.
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        '''
+        try:
+            matches = dict(self.__buckets.get(value, {}))
+        except TypeError:
+            matches = {}
+        for key, obj in self.__unhashable.items():
+            if getattr(obj, self.attr, None) == value:
+                matches[key] = obj
+        return matches
+
+    def search(self, op, value):
+        '''Answers a query condition from the index.
+
+        Args:
+            op (str): The query operator.
+            value: The value the condition compares against.
+
+        Returns:
+            dict: The matching objects keyed by storage key, or None if the
+                index cannot answer `op`.
+        '''
+        if op == "==":
+            return self.lookup(value)
+        if op == "in":
+            matches = {}
+            for item in value:
+                matches.update(self.lookup(item))
+            return matches
+        return None
+
+    def __len__(self):
+        '''Returns the number of indexed objects.'''
+        return len(self.__values) + len(self.__unhashable)
+
+
+class SortedIndex:
+    '''A range index keeping numeric attribute values in sorted order.
+
+        Entries live in two parallel lists sorted by (value, key): `bisect`
+        finds range boundaries in O(log N), so a range or top-k lookup costs
+        O(log N + k). Objects whose value is not a number are kept aside;
+        they never match a range and come last in an ordered walk.
+
+        Attributes:
+            attr (str): The name of the indexed attribute.
+    '''
+
+    def __init__(self, attr):
+        '''Initializes an empty index.
+
+        Args:
+            attr (str): The name of the attribute to index.
+        '''
+        self.attr = attr
+        self.__entries = []
+        self.__sorted_values = []
+        self.__values = {}
+        self.__objects = {}
+        self.__unordered = {}
+
+    @staticmethod
+    def is_number(value):
+        '''Checks whether a value can be placed in the index.
+
+        Args:
+            value: The value to check.
+
+        Returns:
+            bool: True for ints and floats other than NaN.
+        '''
+        return isinstance(value, (int, float)) and value == value
+
+    def add(self, key, obj):
+        '''Indexes an object, replacing any entry already held for its key.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to index.
+        '''
+        self.remove(key)
+        value = getattr(obj, self.attr, None)
+        if not self.is_number(value):
+            self.__unordered[key] = obj
+            return
+        pos = bisect_right(self.__entries, (value, key))
+        self.__entries.insert(pos, (value, key))
+        self.__sorted_values.insert(pos, value)
+        self.__values[key] = value
+        self.__objects[key] = obj
+
+    def update(self, key, obj):
+        '''Re-indexes an object whose attributes may have changed.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to re-index.
+        '''
+        value = getattr(obj, self.attr, None)
+        if key in self.__values and self.__values[key] == value:
+            return
+        self.add(key, obj)
+
+    def remove(self, key):
+        '''Drops the entry held for a key, if any.
+
+        Args:
+            key (str): The storage key of the object.
+        '''
+        if key in self.__values:
+            pos = bisect_left(self.__entries, (self.__values.pop(key), key))
+            del self.__entries[pos]
+            del self.__sorted_values[pos]
+            del self.__objects[key]
+        else:
+            self.__unordered.pop(key, None)
+
+    def range(self, low=None, high=None, low_inclusive=True,
+              high_inclusive=True, reverse=False):
+        '''Yields the objects whose value lies in a range, in value order.
+
+        Without bounds, every indexed object is yielded, followed by the
+        objects whose value is not a number.
+
+        Args:
+            low: The lower bound, or None for no lower bound.
+            high: The upper bound, or None for no upper bound.
+            low_inclusive (bool): Whether `low` itself is in the range.
+            high_inclusive (bool): Whether `high` itself is in the range.
+            reverse (bool): Yield the highest values first.
+
+        Yields:
+            The matching objects.
+        '''
+        start, stop = self.__bounds(low, high, low_inclusive, high_inclusive)
+        positions = range(start, stop)
+        if reverse:
+            positions = reversed(positions)
+        for pos in positions:
+            yield self.__objects[self.__entries[pos][1]]
+        if low is None and high is None:
+            for obj in list(self.__unordered.values()):
+                yield obj
+
+    def count_range(self, low=None, high=None, low_inclusive=True,
+                    high_inclusive=True):
+        '''Returns how many objects `range()` would yield, in O(log N).
+
+        Args:
+            low: The lower bound, or None for no lower bound.
+            high: The upper bound, or None for no upper bound.
+            low_inclusive (bool): Whether `low` itself is in the range.
+            high_inclusive (bool): Whether `high` itself is in the range.
+
+        Returns:
+            int: The number of objects in the range.
+        '''
+        start, stop = self.__bounds(low, high, low_inclusive, high_inclusive)
+        if low is None and high is None:
+            return stop - start + len(self.__unordered)
+        return stop - start
+
+    def search(self, op, value):
+        '''Answers a query condition from the index.
+
+        Args:
+            op (str): The query operator.
+            value: The value the condition compares against.
+
+        Returns:
+            dict: The matching objects keyed by storage key, or None if the
+                index cannot answer `op` for `value`.
+        '''
+        bounds = {"==": (value, value, True, True),
+                  "<": (None, value, True, False),
+                  "<=": (None, value, True, True),
+                  ">": (value, None, False, True),
+                  ">=": (value, None, True, True)}
+        if op == "in":
+            if not all(self.is_number(item) for item in value):
+                return None
+            matches = {}
+            for item in value:
+                matches.update(self.search("==", item))
+            return matches
+        if op not in bounds or not self.is_number(value):
+            return None
+        start, stop = self.__bounds(*bounds[op])
+        return {key: self.__objects[key]
+                for _, key in self.__entries[start:stop]}
+
+    def __bounds(self, low, high, low_inclusive, high_inclusive):
+        '''Returns the slice of the sorted entries lying in a range.
+
+        Args:
+            low: The lower bound, or None for no lower bound.
+            high: The upper bound, or None for no upper bound.
+            low_inclusive (bool): Whether `low` itself is in the range.
+            high_inclusive (bool): Whether `high` itself is in the range.
+
+        Returns:
+            tuple: The start and stop positions of the slice.
+        '''
+        start, stop = 0, len(self.__sorted_values)
+        if low is not None:
+            find = bisect_left if low_inclusive else bisect_right
+            start = find(self.__sorted_values, low)
+        if high is not None:
+            find = bisect_right if high_inclusive else bisect_left
+            stop = find(self.__sorted_values, high)
+        return start, max(start, stop)
+
+    def __len__(self):
+        '''Returns the number of indexed objects.'''
+        return len(self.__values) + len(self.__unordered)
+
+
+class GridIndex:
+    '''A spatial index bucketing objects into a grid of latitude and
+        longitude cells.
+
+        A bounding-box or radius lookup only visits the cells overlapping the
+        area (or only the occupied cells, when there are fewer of those), and
+        checks the exact position of the objects found there. Objects
+        without a valid position are kept aside and never match.
+
+        Attributes:
+            attrs (tuple): The names of the latitude and longitude
+                attributes.
+            cell_size (float): The side of a grid cell, in degrees.
+    '''
+
+    def __init__(self, attrs=("latitude", "longitude"), cell_size=0.1):
+        '''Initializes an empty index.
+
+        Args:
+            attrs (tuple): The names of the latitude and longitude attributes.
+            cell_size (float): The side of a grid cell, in degrees.
+        '''
+        self.attrs = tuple(attrs)
+        self.cell_size = cell_size
+        self.__columns = int(math.ceil(360 / cell_size))
+        self.__cells = {}
+        self.__points = {}
+        self.__unplaced = {}
+
+    def position(self, obj):
+        '''Returns the position of an object.
+
+        Args:
+            obj: The object to locate.
+
+        Returns:
+            tuple: The (latitude, longitude) of the object, or None if it has
+                no valid position.
+        '''
+        lat, lon = (getattr(obj, attr, None) for attr in self.attrs)
+        if not SortedIndex.is_number(lat) or not SortedIndex.is_number(lon) \
+                or not -90 <= lat <= 90 or not -180 <= lon <= 180:
+            return None
+        return lat, lon
+
+    def add(self, key, obj):
+        '''Indexes an object, replacing any entry already held for its key.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to index.
+        '''
+        self.remove(key)
+        point = self.position(obj)
+        if point is None:
+            self.__unplaced[key] = obj
+            return
+        self.__cells.setdefault(self.__cell(*point), {})[key] = obj
+        self.__points[key] = point
+
+    def update(self, key, obj):
+        '''Re-indexes an object whose attributes may have changed.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to re-index.
+        '''
+        if key in self.__points and self.__points[key] == self.position(obj):
+            return
+        self.add(key, obj)
+
+    def remove(self, key):
+        '''Drops the entry held for a key, if any.
+
+        Args:
+            key (str): The storage key of the object.
+        '''
+        if key in self.__points:
+            cell = self.__cell(*self.__points.pop(key))
+            del self.__cells[cell][key]
+            if not self.__cells[cell]:
+                del self.__cells[cell]
+        else:
+            self.__unplaced.pop(key, None)
+
+    def search(self, op, value):
+        '''Declines single-attribute query conditions.
+
+        Returns:
+            None: A grid cannot answer conditions on one coordinate.
+        '''
+        return None
+
+    def within(self, min_lat, min_lon, max_lat, max_lon):
+        '''Returns the objects inside a bounding box.
+
+        A box whose `min_lon` is greater than its `max_lon` crosses the
+        180th meridian.
+
+        Args:
+            min_lat (float): The southern edge, in degrees.
+            min_lon (float): The western edge, in degrees.
+            max_lat (float): The northern edge, in degrees.
+            max_lon (float): The eastern edge, in degrees.
+
+        Returns:
+            dict: The matching objects keyed by storage key.
+        '''
+        if min_lon <= max_lon:
+            spans = [(min_lon, max_lon)]
+        else:
+            spans = [(min_lon, 180.0), (-180.0, max_lon)]
+        matches = {}
+        for low, high in spans:
+            for key, obj in self.__candidates(min_lat, low, max_lat, high):
+                lat, lon = self.__points[key]
+                if min_lat <= lat <= max_lat and low <= lon <= high:
+                    matches[key] = obj
+        return matches
+
+    def near(self, lat, lon, radius):
+        '''Returns the objects within a distance of a point, nearest first.
+
+        Args:
+            lat (float): The latitude of the point, in degrees.
+            lon (float): The longitude of the point, in degrees.
+            radius (float): The distance, in kilometers.
+
+        Returns:
+            list: (distance, object) tuples sorted by distance.
+        '''
+        lat_span = math.degrees(radius / EARTH_RADIUS_KM)
+        min_lat, max_lat = lat - lat_span, lat + lat_span
+        cos_lat = math.cos(math.radians(min(90.0, max(abs(min_lat),
+                                                      abs(max_lat)))))
+        if min_lat <= -90 or max_lat >= 90 or cos_lat <= 0 or \
+                lat_span / cos_lat >= 180:
+            spans = [(-180.0, 180.0)]
+        else:
+            lon_span = lat_span / cos_lat
+            min_lon, max_lon = lon - lon_span, lon + lon_span
+            spans = [(max(min_lon, -180.0), min(max_lon, 180.0))]
+            if min_lon < -180:
+                spans.append((min_lon + 360, 180.0))
+            if max_lon > 180:
+                spans.append((-180.0, max_lon - 360))
+        found = {}
+        for low, high in spans:
+            found.update(self.__candidates(min_lat, low, max_lat, high))
+        matches = []
+        for key, obj in found.items():
+            dist = distance(lat, lon, *self.__points[key])
+            if dist <= radius:
+                matches.append((dist, key, obj))
+        matches.sort(key=lambda match: (match[0], match[1]))
+        return [(dist, obj) for dist, key, obj in matches]
+
+    def __cell(self, lat, lon):
+        '''Returns the grid cell holding a position.
+
+        Args:
+            lat (float): The latitude, in degrees.
+            lon (float): The longitude, in degrees.
+
+        Returns:
+            tuple: The (row, column) of the cell.
+        '''
+        return (int(math.floor(lat / self.cell_size)),
+                int(math.floor(lon / self.cell_size)))
+
+    def __candidates(self, min_lat, min_lon, max_lat, max_lon):
+        '''Yields the objects of the cells overlapping a box.
+
+        Args:
+            min_lat (float): The southern edge, in degrees.
+            min_lon (float): The western edge, in degrees.
+            max_lat (float): The northern edge, in degrees.
+            max_lon (float): The eastern edge, in degrees.
+
+        Yields:
+            tuple: (key, object) pairs.
+        '''
+        min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+        if min_lat > max_lat or min_lon > max_lon:
+            return
+        first_row, first_col = self.__cell(min_lat, min_lon)
+        last_row, last_col = self.__cell(max_lat, max_lon)
+        area = (last_row - first_row + 1) * (last_col - first_col + 1)
+        if area > len(self.__cells):
+            cells = [cell for cell in self.__cells
+                     if first_row <= cell[0] <= last_row and
+                     first_col <= cell[1] <= last_col]
+        else:
+            cells = [(row, col) for row in range(first_row, last_row + 1)
+                     for col in range(first_col, last_col + 1)]
+        for cell in cells:
+            for key, obj in self.__cells.get(cell, {}).items():
+                yield key, obj
+
+    def __len__(self):
+        '''Returns the number of indexed objects.'''
+        return len(self.__points) + len(self.__unplaced)
+
+
+class InvertedIndex:
+    '''A membership index mapping each element of a list attribute to the
+        stored objects whose list holds it.
+
+        Lookups for objects holding all of several elements intersect the
+        posting sets smallest first, so their cost is bounded by the rarest
+        element rather than by the number of objects. Lists must be
+        reassigned, not modified in place, for the index to see the change.
+
+        Attributes:
+            attr (str): The name of the indexed attribute.
+    '''
+
+    def __init__(self, attr):
+        '''Initializes an empty index.
+
+        Args:
+            attr (str): The name of the list attribute to index.
+        '''
+        self.attr = attr
+        self.__postings = {}
+        self.__elements = {}
+        self.__objects = {}
+
+    def elements(self, obj):
+        '''Returns the hashable elements of an object's list attribute.
+
+        Args:
+            obj: The object to read.
+
+        Returns:
+            frozenset: The elements, empty if the attribute is not a list.
+        '''
+        value = getattr(obj, self.attr, None)
+        if not isinstance(value, (list, tuple, set, frozenset)):
+            return frozenset()
+        elements = set()
+        for element in value:
+            try:
+                elements.add(element)
+            except TypeError:
+                pass
+        return frozenset(elements)
+
+    def add(self, key, obj):
+        '''Indexes an object, replacing any entry already held for its key.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to index.
+        '''
+        self.remove(key)
+        elements = self.elements(obj)
+        for element in elements:
+            self.__postings.setdefault(element, {})[key] = obj
+        self.__elements[key] = elements
+        self.__objects[key] = obj
+
+    def update(self, key, obj):
+        '''Re-indexes an object whose attributes may have changed.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to re-index.
+        '''
+        if self.__elements.get(key) == self.elements(obj):
+            return
+        self.add(key, obj)
+
+    def remove(self, key):
+        '''Drops the entry held for a key, if any.
+
+        Args:
+            key (str): The storage key of the object.
+        '''
+        for element in self.__elements.pop(key, ()):
+            posting = self.__postings[element]
+            del posting[key]
+            if not posting:
+                del self.__postings[element]
+        self.__objects.pop(key, None)
+
+    def lookup(self, element):
+        '''Returns the objects whose list holds an element.
+
+        Args:
+            element: The element to look for.
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        '''
+        try:
+            return dict(self.__postings.get(element, {}))
+        except TypeError:
+            return {}
+
+    def all_of(self, elements):
+        '''Returns the objects whose list holds every given element.
+
+        Args:
+            elements (iterable): The elements to look for.
+
+        Returns:
+            dict: The matching objects, keyed by storage key. Every indexed
+                object matches an empty `elements`.
+        '''
+        postings = []
+        for element in set(elements):
+            try:
+                postings.append(self.__postings.get(element, {}))
+            except TypeError:
+                return {}
+        if not postings:
+            return dict(self.__objects)
+        postings.sort(key=len)
+        matches = dict(postings[0])
+        for posting in postings[1:]:
+            if not matches:
+                break
+            matches = {key: obj for key, obj in matches.items()
+                       if key in posting}
+        return matches
+
+    def any_of(self, elements):
+        '''Returns the objects whose list holds at least one given element.
+
+        Args:
+            elements (iterable): The elements to look for.
+
+        Returns:
+            dict: The matching objects, keyed by storage key.
+        '''
+        matches = {}
+        for element in elements:
+            matches.update(self.lookup(element))
+        return matches
+
+    def search(self, op, value):
+        '''Answers a query condition from the index.
+
+        Args:
+            op (str): The query operator.
+            value: The value the condition compares against.
+
+        Returns:
+            dict: The objects whose list contains `value` for the
+                "contains" operator, or None for any other operator.
+        '''
+        if op == "contains":
+            return self.lookup(value)
+        return None
+
+    def __len__(self):
+        '''Returns the number of indexed objects.'''
+        return len(self.__objects)
+
+
+class TextIndex:
+    '''A full-text index ranking objects by the BM25 relevance of their
+        string attributes to a keyword query.
+
+        Text is lowercased and split into words. Each object's term counts
+        are kept so changes and deletes only touch the postings of the terms
+        it held. `dump()` and `preload()` let the engine persist the term
+        counts and reuse them on reload instead of tokenizing every object
+        again, and `changes()` lets it persist only the counts computed or
+        dropped since the last call.
+
+        Attributes:
+            attrs (tuple): The names of the indexed string attributes.
+            k1 (float): The BM25 term frequency saturation.
+            b (float): The BM25 document length normalization.
+    '''
+    token = re.compile(r"\w+")
+
+    def __init__(self, attrs, k1=1.2, b=0.75):
+        '''Initializes an empty index.
+
+        Args:
+            attrs (tuple): The names of the string attributes to index.
+            k1 (float): The BM25 term frequency saturation.
+            b (float): The BM25 document length normalization.
+        '''
+        self.attrs = tuple(attrs)
+        self.k1 = k1
+        self.b = b
+        self.__postings = {}
+        self.__terms = {}
+        self.__texts = {}
+        self.__lengths = {}
+        self.__objects = {}
+        self.__total_length = 0
+        self.__pending = {}
+        self.__changed = set()
+
+    def texts(self, obj):
+        '''Returns the indexed strings of an object.
+
+        Args:
+            obj: The object to read.
+
+        Returns:
+            tuple: One string per indexed attribute; empty for an attribute
+                that is missing or not a string.
+        '''
+        texts = (getattr(obj, attr, None) for attr in self.attrs)
+        return tuple(text if isinstance(text, str) else "" for text in texts)
+
+    @classmethod
+    def tokenize(cls, text):
+        '''Splits text into lowercase words.
+
+        Args:
+            text (str): The text to split.
+
+        Returns:
+            list: The words, in order.
+        '''
+        return cls.token.findall(text.lower())
+
+    @staticmethod
+    def fingerprint(texts):
+        '''Returns a checksum of an object's indexed strings.
+
+        Args:
+            texts (tuple): The strings returned by `texts()`.
+
+        Returns:
+            int: The checksum.
+        '''
+        return zlib.crc32("\0".join(texts).encode())
+
+    def add(self, key, obj):
+        '''Indexes an object, replacing any entry already held for its key.
+
+        Term counts preloaded for the key are used instead of tokenizing
+        when they were computed from the same strings.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to index.
+        '''
+        self.remove(key)
+        texts = self.texts(obj)
+        terms = None
+        if key in self.__pending:
+            checksum, terms = self.__pending.pop(key)
+            if checksum != self.fingerprint(texts):
+                terms = None
+        if terms is None:
+            terms = Counter()
+            for text in texts:
+                terms.update(self.tokenize(text))
+            self.__changed.add(key)
+        for term, count in terms.items():
+            self.__postings.setdefault(term, {})[key] = count
+        self.__terms[key] = terms
+        self.__texts[key] = texts
+        self.__lengths[key] = sum(terms.values())
+        self.__objects[key] = obj
+        self.__total_length += self.__lengths[key]
+
+    def update(self, key, obj):
+        '''Re-indexes an object whose attributes may have changed.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to re-index.
+        '''
+        if key in self.__texts and self.__texts[key] == self.texts(obj):
+            return
+        self.add(key, obj)
+
+    def remove(self, key):
+        '''Drops the entry held for a key, if any.
+
+        Args:
+            key (str): The storage key of the object.
+        '''
+        terms = self.__terms.pop(key, None)
+        if terms is None:
+            return
+        self.__changed.add(key)
+        for term in terms:
+            posting = self.__postings[term]
+            del posting[key]
+            if not posting:
+                del self.__postings[term]
+        self.__total_length -= self.__lengths.pop(key)
+        del self.__texts[key]
+        del self.__objects[key]
+
+    def search(self, op, value):
+        '''Declines query conditions.
+
+        Returns:
+            None: Keyword search goes through `rank()`.
+        '''
+        return None
+
+    def rank(self, query, limit=None):
+        '''Returns the objects matching any word of a query, most relevant
+            first.
+
+        Args:
+            query (str): The keywords to look for.
+            limit (int): The maximum number of results, or None for all.
+
+        Returns:
+            list: (score, object) tuples sorted by decreasing score.
+        '''
+        count = len(self.__objects)
+        if count == 0:
+            return []
+        average = self.__total_length / count or 1
+        scores = {}
+        for term in set(self.tokenize(query)):
+            posting = self.__postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (count - len(posting) + 0.5) /
+                           (len(posting) + 0.5))
+            for key, freq in posting.items():
+                norm = self.k1 * (1 - self.b + self.b *
+                                  self.__lengths[key] / average)
+                scores[key] = scores.get(key, 0.0) + \
+                    idf * freq * (self.k1 + 1) / (freq + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(score, self.__objects[key]) for key, score in ranked]
+
+    def dump(self):
+        '''Returns the term counts of every indexed object.
+
+        Preloaded counts not used yet are included, so objects a lazy
+        reload has not built keep theirs.
+
+        Returns:
+            dict: Maps each storage key to a [checksum, {term: count}] pair
+                that `preload()` accepts.
+        '''
+        entries = {key: [checksum, dict(terms)]
+                   for key, (checksum, terms) in self.__pending.items()}
+        for key, terms in self.__terms.items():
+            entries[key] = [self.fingerprint(self.__texts[key]), dict(terms)]
+        return entries
+
+    def changes(self):
+        '''Returns the term counts computed or dropped since the last call.
+
+        Counts reused from `preload()` are not changes, so an index
+        reloaded from a dump reports none until objects change.
+
+        Returns:
+            dict: Maps each changed storage key to a [checksum,
+                {term: count}] pair, or to None if the key was removed.
+        '''
+        entries = {}
+        for key in self.__changed:
+            terms = self.__terms.get(key)
+            if terms is None:
+                entries[key] = None
+            else:
+                entries[key] = [self.fingerprint(self.__texts[key]),
+                                dict(terms)]
+        self.__changed = set()
+        return entries
+
+    def dump_size(self):
+        '''Returns the number of entries `dump()` returns.
+
+        Returns:
+            int: The number of indexed objects plus preloaded counts not
+                used yet.
+        '''
+        return len(self.__terms) + len(self.__pending)
+
+    def preload(self, entries):
+        '''Sets term counts to reuse when the objects they were computed
+            from are added. Any counts left from an earlier call are
+            dropped.
+
+        Args:
+            entries (dict): The result of an earlier `dump()`.
+        '''
+        self.__pending = {key: (checksum, Counter(terms))
+                          for key, (checksum, terms) in entries.items()}
+
+    def __len__(self):
+        '''Returns the number of indexed objects.'''
+        return len(self.__objects)
+
+
+class ColumnTable:
+    '''A columnar copy of some attributes of the objects of a class, for
+        aggregates that would otherwise visit every object.
+
+        Each attribute is a column holding one value per row: numeric
+        attributes in an `array` of doubles, where NaN marks a value that
+        is not a number, and other attributes in a list. `__rows` maps each
+        storage key to its row; removing a row moves the last row into its
+        place, so every change costs O(number of columns).
+
+        Aggregates run over whole columns with builtins such as `sum()`,
+        `min()` and `Counter()`, and can be grouped by another column, e.g.
+        the mean `price_by_night` by `city_id`.
+
+        Attributes:
+            attrs (tuple): The names of the attributes held as columns.
+            numeric (frozenset): The names of the numeric columns.
+    '''
+    functions = ("count", "sum", "mean", "min", "max")
+
+    def __init__(self, attrs, numeric=()):
+        '''Initializes an empty table.
+
+        Args:
+            attrs (tuple): The names of the attributes to hold as columns.
+            numeric (iterable): The names of the attributes among `attrs`
+                to hold as numbers.
+        '''
+        self.attrs = tuple(attrs)
+        self.numeric = frozenset(numeric) & frozenset(self.attrs)
+        self.__columns = {attr: array("d") if attr in self.numeric else []
+                          for attr in self.attrs}
+        self.__numbers = [(attr, column) for attr, column
+                          in self.__columns.items() if attr in self.numeric]
+        self.__others = [(attr, column) for attr, column
+                         in self.__columns.items()
+                         if attr not in self.numeric]
+        self.__missing = {attr: 0 for attr in self.numeric}
+        self.__rows = {}
+        self.__keys = []
+
+    def value(self, attr, obj):
+        '''Returns the value an object holds in a column.
+
+        Args:
+            attr (str): The name of the column.
+            obj: The object to read.
+
+        Returns:
+            The attribute value; a float, or NaN if it is not a number, for
+                a numeric column.
+        '''
+        value = getattr(obj, attr, None)
+        if attr not in self.numeric:
+            return value
+        if SortedIndex.is_number(value):
+            try:
+                return float(value)
+            except OverflowError:
+                pass
+        return math.nan
+
+    def add(self, key, obj):
+        '''Adds a row for an object, or refreshes the row held for its key.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to add.
+        '''
+        if key in self.__rows:
+            self.update(key, obj)
+            return
+        self.__rows[key] = len(self.__keys)
+        self.__keys.append(key)
+        for attr, column in self.__columns.items():
+            value = self.value(attr, obj)
+            column.append(value)
+            if value != value:
+                self.__missing[attr] += 1
+
+    def update(self, key, obj):
+        '''Refreshes the row of an object whose attributes may have
+            changed.
+
+        Args:
+            key (str): The storage key of the object.
+            obj: The object to read.
+        '''
+        row = self.__rows.get(key)
+        if row is None:
+            self.add(key, obj)
+            return
+        # Runs on every attribute change of a stored object, so the usual
+        # int and float values skip the general conversion of value().
+        for attr, column in self.__others:
+            column[row] = getattr(obj, attr, None)
+        for attr, column in self.__numbers:
+            value = getattr(obj, attr, None)
+            if value.__class__ is float or value.__class__ is int and \
+                    -1 << 53 <= value <= 1 << 53:
+                value = float(value)
+            else:
+                value = self.value(attr, obj)
+            old = column[row]
+            if old != old or value != value:
+                self.__missing[attr] += (value != value) - (old != old)
+            column[row] = value
+
+    def remove(self, key):
+        '''Drops the row held for a key, if any.
+
+        Args:
+            key (str): The storage key of the object.
+        '''
+        row = self.__rows.pop(key, None)
+        if row is None:
+            return
+        last = self.__keys.pop()
+        for attr, column in self.__columns.items():
+            if attr in self.__missing and column[row] != column[row]:
+                self.__missing[attr] -= 1
+            column[row] = column[-1]
+            del column[-1]
+        if row < len(self.__keys):
+            self.__keys[row] = last
+            self.__rows[last] = row
+
+    def row(self, key):
+        '''Returns the values held for an object.
+
+        Args:
+            key (str): The storage key of the object.
+
+        Returns:
+            dict: The value of each column, or None if no row is held for
+                `key`.
+        '''
+        row = self.__rows.get(key)
+        if row is None:
+            return None
+        return {attr: column[row] for attr, column in self.__columns.items()}
+
+    def column(self, attr):
+        '''Returns a column, one value per row. It is the table's own
+            storage and must not be modified.
+
+        Args:
+            attr (str): The name of the column.
+
+        Returns:
+            The array or list of values.
+        '''
+        return self.__columns[attr]
+
+    def search(self, op, value):
+        '''Answers no query conditions; tables only serve aggregates.
+
+        Returns:
+            None
+        '''
+        return None
+
+    def aggregate(self, func, attr=None, by=None):
+        '''Computes an aggregate over a column, optionally per group.
+
+        None values, held for objects without the attribute, and numeric
+        values that are not numbers are left out of every aggregate.
+
+        Args:
+            func (str): One of "count", "sum", "mean", "min" and "max".
+            attr (str): The column to aggregate; only "count" may omit it,
+                to count rows.
+            by (str): The column whose values group the rows, or None to
+                aggregate every row.
+
+        Returns:
+            The aggregate (None for the "mean", "min" and "max" of no
+                values) or, with `by`, a dict mapping each group value to
+                the aggregate of its rows.
+
+        Raises:
+            ValueError: If `func` is unknown, or needs a numeric column
+                and `attr` is not one.
+        '''
+        if func not in self.functions:
+            raise ValueError("unknown aggregate: {}".format(func))
+        if func != "count" and attr not in self.numeric:
+            raise ValueError("{} is not a numeric column".format(attr))
+        if by is not None:
+            return self.__grouped(func, attr, self.__columns[by])
+        if attr is None:
+            return len(self.__keys)
+        values = self.__columns[attr]
+        if attr not in self.numeric:
+            return len(values) - values.count(None)
+        if self.__missing[attr]:
+            values = [value for value in values if value == value]
+        if func == "count":
+            return len(values)
+        if func == "sum":
+            return sum(values)
+        if not values:
+            return None
+        if func == "mean":
+            return sum(values) / len(values)
+        return min(values) if func == "min" else max(values)
+
+    def __grouped(self, func, attr, groups):
+        '''Computes an aggregate over a column per group of rows.
+
+        Args:
+            func (str): The aggregate function.
+            attr (str): The column to aggregate, or None.
+            groups: The column whose values group the rows.
+
+        Returns:
+            dict: The aggregate of each group.
+        '''
+        if attr is None:
+            return dict(Counter(groups))
+        pairs = zip(groups, self.__columns[attr])
+        if attr not in self.numeric:
+            return dict(Counter(group for group, value in pairs
+                                if value is not None))
+        if self.__missing[attr]:
+            pairs = [(group, value) for group, value in pairs
+                     if value == value]
+        if func == "count":
+            return dict(Counter(group for group, _ in pairs))
+        totals = {}
+        if func in ("sum", "mean"):
+            counts = Counter()
+            for group, value in pairs:
+                totals[group] = totals.get(group, 0.0) + value
+                counts[group] += 1
+            if func == "mean":
+                return {group: total / counts[group]
+                        for group, total in totals.items()}
+            return totals
+        better = min if func == "min" else max
+        for group, value in pairs:
+            totals[group] = better(totals[group], value) \
+                if group in totals else value
+        return totals
+
+    def __len__(self):
+        '''Returns the number of rows.'''
+        return len(self.__keys)
@@ -0,0 +1,229 @@
+'''This module provides the JournalStorage class, a FileStorage variant that
+    appends one compact record per mutation to a journal file instead of
+    rewriting the whole JSON file on every save.
+'''
+import json
+import os
+import threading
+from models.engine.base_storage import synchronized
+from models.engine.file_storage import append_write, atomic_write, \
+    classes
+from models.engine.incremental_storage import IncrementalStorage
+
+
+class JournalStorage(IncrementalStorage):
+    '''A storage engine that persists changes as an append-only journal.
+
+        The JSON file at `__file_path` holds a base snapshot in the same
+        format `FileStorage` writes. Every call to `save()` appends one line
+        per changed object to `__journal_path`, then a commit record:
+
+            ["put", "<class>", "<id>", {<changed fields>}]
+            ["del", "<class>", "<id>"]
+            ["commit"]
+
+        `reload()` loads the snapshot and replays the journal on top of it,
+        so the cost of a save depends on what changed rather than on the
+        total number of stored objects. Records not followed by a commit
+        record, left by a crash mid-append, are dropped: a save, and so a
+        transaction, is replayed whole or not at all.
+
+        Once the journal is both larger than `__compact_min_bytes` and holds
+        more than `__compact_ratio` records per live object, `save()` starts
+        a background compaction that rewrites the snapshot and truncates the
+        journal to the records appended while the snapshot was being written.
+
+        Appends and both rewrites follow the `fsync` policy; with "file" or
+        "dir", a save returns once its records are on disk.
+
+        Attributes:
+            __file_path (str): The path to the JSON snapshot file.
+            __journal_path (str): The path to the append-only journal file.
+            __compact_min_bytes (int): Journal size below which compaction is
+                never triggered.
+            __compact_ratio (float): Journal records per live object above
+                which compaction is triggered.
+    '''
+    __file_path = "file.json"
+    __journal_path = "file.json.journal"
+    __compact_min_bytes = 1 << 20
+    __compact_ratio = 2.0
+
+    def __init__(self):
+        '''Initializes the engine with an empty persisted state.'''
+        super().__init__()
+        self.__persisted = {}
+        self.__journal_bytes = 0
+        self.__journal_records = 0
+        self.__lock = threading.Lock()
+        self.__compactor = None
+
+    def write_changes(self, changed, deleted):
+        '''Appends a put record for every object added or changed, holding
+            only the fields that differ from the persisted ones, and a del
+            record for every persisted object removed.
+
+            Args:
+                changed (list): The stored objects added or changed.
+                deleted (set): The (class name, id) pairs removed.
+        '''
+        records = []
+        updates = {}
+        for cls, obj_id in deleted:
+            if (cls, obj_id) in self.__persisted:
+                records.append(["del", cls, obj_id])
+                updates[(cls, obj_id)] = None
+        for obj in changed:
+            fields = obj.to_dict()
+            del fields["__class__"]
+            cls, obj_id = obj.__class__.__name__, obj.id
+            old = None
+            if (cls, obj_id) not in updates:
+                old = self.__persisted.get((cls, obj_id))
+            if old is None:
+                records.append(["put", cls, obj_id, fields])
+            elif old.keys() - fields.keys():
+                records.append(["del", cls, obj_id])
+                records.append(["put", cls, obj_id, fields])
+            else:
+                diff = {key: value for key, value in fields.items()
+                        if key not in old or old[key] != value}
+                if diff:
+                    records.append(["put", cls, obj_id, diff])
+            updates[(cls, obj_id)] = fields
+        with self.__lock:
+            if records:
+                self.__append(records)
+            for key, fields in updates.items():
+                if fields is None:
+                    self.__persisted.pop(key, None)
+                else:
+                    self.__persisted[key] = fields
+        if self.__needs_compaction() and (self.__compactor is None or
+                                          not self.__compactor.is_alive()):
+            self.__compactor = threading.Thread(target=self.compact,
+                                                daemon=True)
+            self.__compactor.start()
+
+    def compact(self):
+        '''Writes a point-in-time snapshot of the persisted objects and drops
+            the journal records it covers.
+
+            Only the snapshot copy and the final journal swap hold the lock;
+            the snapshot itself is written while saves keep appending.
+            Replaying journal records over a newer snapshot yields the same
+            state, so a crash between the two renames loses nothing.
+        '''
+        with self.__lock:
+            snapshot = dict(self.__persisted)
+            offset = self.__journal_bytes
+            records = self.__journal_records
+        atomic_write(self.__file_path, json.dumps(
+            {"{}.{}".format(cls, obj_id): dict(fields, __class__=cls)
+             for (cls, obj_id), fields in snapshot.items()}), self.fsync)
+        with self.__lock:
+            tail = b""
+            if os.path.exists(self.__journal_path):
+                with open(self.__journal_path, 'rb') as journal:
+                    journal.seek(offset)
+                    tail = journal.read()
+            atomic_write(self.__journal_path, tail, self.fsync)
+            self.__journal_bytes = len(tail)
+            self.__journal_records -= records
+
+    def __needs_compaction(self):
+        '''Checks the journal against the compaction thresholds.
+
+            Returns:
+                bool: True if the journal should be compacted.
+        '''
+        return (self.__journal_bytes >= self.__compact_min_bytes and
+                self.__journal_records >
+                self.__compact_ratio * max(len(self.__persisted), 1))
+
+    @synchronized
+    def reload(self):
+        '''Loads the snapshot file (if it exists) and replays the journal
+            on top of it.
+
+            A batch of records left without its commit record by a crash
+            mid-append is cut off the journal, so that later batches do not
+            commit it.
+        '''
+        state = {}
+        if os.path.exists(self.__file_path):
+            with open(self.__file_path, 'r') as json_file:
+                for value in json.load(json_file).values():
+                    fields = dict(value)
+                    cls = fields.pop("__class__")
+                    state[(cls, fields["id"])] = fields
+        self.__journal_bytes = 0
+        self.__journal_records = 0
+        if os.path.exists(self.__journal_path):
+            with open(self.__journal_path, 'rb+') as journal:
+                data = journal.read()
+                end, records = self.__replay(state, data)
+                if end < len(data):
+                    journal.truncate(end)
+            self.__journal_bytes = end
+            self.__journal_records = records
+        for (cls, obj_id), fields in state.items():
+            if cls in classes:
+                self.new(classes[cls](**fields))
+        self.__persisted = state
+        self.clear_changes()
+
+    @staticmethod
+    def __replay(state, data):
+        '''Applies the committed batches of journal records to `state`.
+
+            Records after the last commit record are ignored, and so is a
+            line that does not decode.
+
+            Args:
+                state (dict): Maps (class name, id) to serialized fields.
+                data (bytes): The contents of the journal.
+
+            Returns:
+                tuple: The length of the committed part of the journal, and
+                    the number of records in it.
+        '''
+        batch = []
+        end = 0
+        records = 0
+        offset = 0
+        while True:
+            newline = data.find(b"\n", offset)
+            if newline == -1:
+                break
+            try:
+                record = json.loads(data[offset:newline])
+            except ValueError:
+                record = None
+            offset = newline + 1
+            if record == ["commit"]:
+                for record in batch:
+                    key = (record[1], record[2])
+                    if record[0] == "put":
+                        state.setdefault(key, {}).update(record[3])
+                    elif record[0] == "del":
+                        state.pop(key, None)
+                records += len(batch)
+                batch = []
+                end = offset
+            elif record is not None:
+                batch.append(record)
+        return end, records
+
+    def __append(self, records):
+        '''Writes `records` and a commit record to the end of the journal
+            file, in one write.
+
+            Args:
+                records (list): The journal records to append.
+        '''
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n"
+                       for record in records + [["commit"]]).encode()
+        append_write(self.__journal_path, data, self.fsync)
+        self.__journal_bytes += len(data)
+        self.__journal_records += len(records)
@@ -0,0 +1,88 @@
+'''This module provides the MemoryStorage class, a FileStorage variant that
+    never touches the filesystem, for tests and benchmarks.
+'''
+import os
+from copy import deepcopy
+from models.engine.base_storage import synchronized
+from models.engine.file_storage import classes
+from models.engine.incremental_storage import IncrementalStorage
+
+
+class MemoryStorage(IncrementalStorage):
+    '''A storage engine that saves to an in-memory volume.
+
+        A volume is a dictionary of saved records (the `to_dict()` of each
+        object) shared by every engine of the process using the same
+        `__name`, resolved against the working directory the way a file
+        path would be. `save()` copies the records of the objects added,
+        changed or removed since the last save or reload; `reload()`
+        builds objects from copies of the records, so neither side sees
+        the other's in-place changes.
+
+        `snapshot()` captures the saved state in time proportional to the
+        number of objects only, since records are replaced on save and
+        never modified; `restore()` brings the volume and the stored objects
+        back to it.
+
+        Attributes:
+            __name (str): The name of the volume.
+            __volumes (dict): Maps each absolute volume name to its records,
+                keyed by "<class name>.<id>".
+    '''
+    __name = "file.json"
+    __volumes = {}
+
+    def write_changes(self, changed, deleted):
+        '''Copies the records of the objects added or changed to the volume
+            and drops those of the objects removed.
+
+            Args:
+                changed (list): The stored objects added or changed.
+                deleted (set): The (class name, id) pairs removed.
+        '''
+        volume = self.__volume()
+        for cls, obj_id in deleted:
+            volume.pop("{}.{}".format(cls, obj_id), None)
+        for obj in changed:
+            key = "{}.{}".format(obj.__class__.__name__, obj.id)
+            volume[key] = deepcopy(obj.to_dict())
+
+    @synchronized
+    def reload(self):
+        '''Builds an object from a copy of every record of the volume.'''
+        for record in self.__volume().values():
+            if record["__class__"] in classes:
+                obj = classes[record["__class__"]](**deepcopy(record))
+                self.new(obj)
+                self.mark_clean(obj, None)
+        self.clear_changes()
+
+    def snapshot(self):
+        '''Captures the saved state of the volume.
+
+            Returns:
+                dict: The snapshot, to pass to `restore()`.
+        '''
+        return dict(self.__volume())
+
+    def restore(self, snapshot):
+        '''Brings the volume back to a snapshot and replaces the stored
+            objects with the ones it holds. Unsaved changes are discarded.
+
+            Args:
+                snapshot (dict): A result of `snapshot()`.
+        '''
+        volume = self.__volume()
+        volume.clear()
+        volume.update(snapshot)
+        for obj in list(self.all().values()):
+            super().delete(obj)
+        self.reload()
+
+    def __volume(self):
+        '''Returns the records of the volume named by `__name`.
+
+            Returns:
+                dict: The records, keyed by "<class name>.<id>".
+        '''
+        return self.__volumes.setdefault(os.path.abspath(self.__name), {})
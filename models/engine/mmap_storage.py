@@ -0,0 +1,257 @@
+'''This module provides the MmapStorage class, a FileStorage variant that
+    keeps its records in a memory-mapped data file with a persistent offset
+    index, and decodes each object only when it is first accessed.
+'''
+import json
+import mmap
+import os
+from models.engine.base_storage import synchronized
+from models.engine.file_storage import append_write, atomic_write, \
+    classes
+from models.engine.incremental_storage import IncrementalStorage
+
+
+class MmapStorage(IncrementalStorage):
+    '''A storage engine that reads objects on demand from a memory-mapped,
+        append-only record file.
+
+        Every record of the file at `__file_path` is one line of JSON: the
+        `to_dict()` of an object, a tombstone for a deleted one, or the
+        commit record that ends the records of each save:
+
+            {"__class__": "<class>", "id": "<id>", ...}
+            {"__class__": "<class>", "id": "<id>", "__deleted__": true}
+            {"__commit__": true}
+
+        The file at `__index_path` maps each live "<class>.<id>" key to the
+        offset and length of its latest record, along with the size of the
+        data file it describes. `reload()` maps the data file read-only and
+        loads the index without decoding any record; objects are built from
+        the map the first time they are accessed, so the store can be larger
+        than memory and processes reading it share the page cache. An index
+        that does not match the data file (a crash between the two writes)
+        is rebuilt by scanning the records, which drops any records not
+        followed by a commit record: a save, and so a transaction, is
+        replayed whole or not at all.
+
+        `save()` appends the records of the objects added, changed or
+        removed since the last save or reload, then rewrites the index.
+        Once dead records take up more than `__compact_ratio` times the
+        size of the live ones, and the file is larger than
+        `__compact_min_bytes`, the file is rewritten with live records only.
+
+        Attributes:
+            __file_path (str): The path to the record file.
+            __index_path (str): The path to the offset index file.
+            __compact_min_bytes (int): Data file size below which compaction
+                is never triggered.
+            __compact_ratio (float): Dead to live bytes ratio above which
+                compaction is triggered.
+    '''
+    __file_path = "file.db"
+    __index_path = "file.db.idx"
+    __compact_min_bytes = 1 << 20
+    __compact_ratio = 1.0
+    __commit = json.dumps({"__commit__": True}).encode() + b"\n"
+
+    def __init__(self):
+        '''Initializes the engine with an empty offset index.'''
+        super().__init__()
+        self.__offsets = {}
+        self.__size = 0
+        self.__map = None
+
+    def write_changes(self, changed, deleted):
+        '''Appends a record for every object added or changed, a
+            tombstone for every persisted object removed and a commit
+            record, then rewrites the offset index.
+
+            Args:
+                changed (list): The stored objects added or changed.
+                deleted (set): The (class name, id) pairs removed.
+        '''
+        lines = []
+        keys = []
+        for cls, obj_id in deleted:
+            key = "{}.{}".format(cls, obj_id)
+            if key not in self.__offsets:
+                continue
+            lines.append(json.dumps({"__class__": cls, "id": obj_id,
+                                     "__deleted__": True}).encode())
+            keys.append((key, False))
+        for obj in changed:
+            lines.append(json.dumps(obj.to_dict()).encode())
+            keys.append(("{}.{}".format(obj.__class__.__name__, obj.id),
+                         True))
+        if lines:
+            offset = self.__size
+            append_write(self.__file_path,
+                         b"".join(line + b"\n" for line in lines) +
+                         self.__commit, self.fsync)
+            for line, (key, live) in zip(lines, keys):
+                if live:
+                    self.__offsets[key] = (offset, len(line))
+                else:
+                    self.__offsets.pop(key, None)
+                offset += len(line) + 1
+            self.__size = offset + len(self.__commit)
+        if self.__needs_compaction():
+            self.compact()
+        elif lines or not os.path.exists(self.__index_path):
+            self.__write_index()
+
+    @synchronized
+    def compact(self):
+        '''Rewrites the data file with the latest record of each live object
+            only, and the offset index to match.
+
+            Objects not built yet keep reading from the previous map, which
+            stays valid after the old file is replaced.
+        '''
+        offsets = {}
+        with open(self.__file_path, 'rb') as old:
+            atomic_write(self.__file_path, self.__live_records(old, offsets),
+                         self.fsync)
+        self.__offsets = offsets
+        self.__size = sum(length + 1 for _, length in offsets.values()) + \
+            len(self.__commit)
+        self.__write_index()
+
+    def __live_records(self, data, offsets):
+        '''Reads the latest record of each live object, one at a time,
+            then yields a commit record.
+
+            Args:
+                data: The data file, open for reading.
+                offsets (dict): Filled with the (offset, length) of each
+                    record in the file the records are written to.
+
+            Yields:
+                bytes: Each record, with its newline.
+        '''
+        size = 0
+        for key, (offset, length) in self.__offsets.items():
+            data.seek(offset)
+            yield data.read(length) + b"\n"
+            offsets[key] = (size, length)
+            size += length + 1
+        yield self.__commit
+
+    def __needs_compaction(self):
+        '''Checks the data file against the compaction thresholds.
+
+            Returns:
+                bool: True if the data file should be compacted.
+        '''
+        live = sum(length + 1 for _, length in self.__offsets.values()) + \
+            len(self.__commit)
+        return (self.__size >= self.__compact_min_bytes and
+                self.__size - live > self.__compact_ratio * live)
+
+    def __write_index(self):
+        '''Writes the offset index and the data file size it describes.
+
+            The index is not synced whatever the `fsync` policy: one that
+            does not match the data file is rebuilt by `reload()`.
+        '''
+        atomic_write(self.__index_path, json.dumps(
+            {"size": self.__size, "offsets": self.__offsets}))
+
+    @synchronized
+    def reload(self):
+        '''Maps the data file and loads the offset index, leaving every
+            object to be built on first access.
+
+            Records left without their commit record by a crash
+            mid-append are cut off the data file, so that later saves do
+            not commit them.
+        '''
+        self.clear_changes()
+        self.__offsets = {}
+        self.__size = 0
+        if not os.path.exists(self.__file_path) or \
+                os.path.getsize(self.__file_path) == 0:
+            return
+        with open(self.__file_path, 'rb+') as data:
+            self.__map = mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ)
+            self.__size = len(self.__map)
+            self.__offsets = self.__read_index()
+            if self.__offsets is None:
+                self.__offsets, self.__size = self.__scan(self.__map)
+                if self.__size < len(self.__map):
+                    self.__map.close()
+                    data.truncate(self.__size)
+                    self.__map = None
+                    if self.__size > 0:
+                        self.__map = mmap.mmap(data.fileno(), 0,
+                                               access=mmap.ACCESS_READ)
+                self.__write_index()
+        if self.__map is None:
+            return
+        pending = {}
+        for key, (offset, length) in self.__offsets.items():
+            cls = key.partition(".")[0]
+            if cls in classes:
+                pending.setdefault(cls, {})[key] = (offset, offset + length)
+        self.defer(self.__map, pending)
+        self.clear_changes()
+
+    def __read_index(self):
+        '''Loads the offset index if it describes the current data file.
+
+            Returns:
+                dict: Maps each key to its record's (offset, length), or
+                    None if the index is missing, unreadable or stale.
+        '''
+        try:
+            with open(self.__index_path, 'r') as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return None
+        if index.get("size") != self.__size:
+            return None
+        return {key: tuple(entry) for key, entry in index["offsets"].items()}
+
+    @staticmethod
+    def __scan(data):
+        '''Rebuilds the offset index from the records.
+
+            Records after the last commit record are ignored.
+
+            Args:
+                data: The contents of the data file.
+
+            Returns:
+                tuple: A dictionary mapping each live key to its latest
+                    record's (offset, length), and the length of the
+                    committed part of the data file.
+        '''
+        offsets = {}
+        batch = {}
+        committed = 0
+        offset = 0
+        while offset < len(data):
+            end = data.find(b"\n", offset)
+            if end == -1:
+                break
+            try:
+                record = json.loads(data[offset:end])
+                commit = bool(record.get("__commit__"))
+                key = None if commit else "{}.{}".format(
+                    record["__class__"], record["id"])
+            except (ValueError, KeyError, TypeError, AttributeError):
+                record, commit, key = None, False, None
+            if commit:
+                for live_key, entry in batch.items():
+                    if entry is None:
+                        offsets.pop(live_key, None)
+                    else:
+                        offsets[live_key] = entry
+                batch = {}
+                committed = end + 1
+            elif key is not None and record.get("__deleted__"):
+                batch[key] = None
+            elif key is not None:
+                batch[key] = (offset, end - offset)
+            offset = end + 1
+        return offsets, committed
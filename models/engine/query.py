@@ -0,0 +1,275 @@
+'''This module provides the Query class, which filters, orders, pages and
+    projects the objects of one model class held by a storage engine.
+
+    Example:
+        storage.query(Place).where("price_by_night", "<", 100).limit(20)
+'''
+import heapq
+import operator
+from itertools import islice
+
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda attr_value, value: attr_value in value,
+    "contains": lambda attr_value, value: value in attr_value
+}
+
+
+class Descending:
+    '''A sort key wrapper that orders values from highest to lowest.'''
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        '''Wraps a value.
+
+        Args:
+            value: The value to order in reverse.
+        '''
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+class Query:
+    '''A lazily evaluated query over the objects of one class.
+
+        Conditions are combined with AND. When a condition's attribute has an
+        index that can answer its operator, only the objects of the smallest
+        such index result are checked; otherwise the objects of the class
+        are streamed one at a time. Without an ordering, iteration stops as
+        soon as `limit` objects have matched.
+
+        Ordering on an attribute with a sorted index walks the index range
+        left by the conditions on that attribute, so a top-k query costs
+        O(log N + k) instead of a sort.
+    '''
+
+    def __init__(self, storage, cls):
+        '''Initializes a query matching every object of a class.
+
+        Args:
+            storage: The storage engine holding the objects.
+            cls: The class of the objects, or its name.
+        '''
+        self.__storage = storage
+        self.__cls = cls if isinstance(cls, str) else cls.__name__
+        self.__conditions = []
+        self.__order = None
+        self.__reverse = False
+        self.__limit = None
+        self.__offset = 0
+        self.__fields = None
+
+    def where(self, attr, op, value):
+        '''Adds a condition objects must meet.
+
+        Args:
+            attr (str): The attribute to test.
+            op (str): One of "==", "!=", "<", "<=", ">", ">=", "in" (the
+                attribute is one of `value`) or "contains" (the attribute,
+                a string or list, contains `value`).
+            value: The value to compare against.
+
+        Returns:
+            Query: This query.
+
+        Raises:
+            ValueError: If `op` is not a known operator.
+        '''
+        if op not in OPERATORS:
+            raise ValueError("unknown operator: {}".format(op))
+        self.__conditions.append((attr, op, value))
+        return self
+
+    def order_by(self, attr, reverse=False):
+        '''Sorts the results by an attribute. Objects without it come last.
+
+        Args:
+            attr (str): The attribute to sort by; a leading "-" sorts in
+                descending order.
+            reverse (bool): Sort in descending order.
+
+        Returns:
+            Query: This query.
+        '''
+        if attr.startswith("-"):
+            attr, reverse = attr[1:], True
+        self.__order = attr
+        self.__reverse = reverse
+        return self
+
+    def limit(self, count):
+        '''Caps the number of results.
+
+        Args:
+            count (int): The maximum number of results.
+
+        Returns:
+            Query: This query.
+        '''
+        self.__limit = count
+        return self
+
+    def offset(self, count):
+        '''Skips the first results.
+
+        Args:
+            count (int): The number of results to skip.
+
+        Returns:
+            Query: This query.
+        '''
+        self.__offset = count
+        return self
+
+    def only(self, *attrs):
+        '''Makes the query return dictionaries of some attributes instead of
+            the objects themselves.
+
+        Args:
+            *attrs (str): The attributes to return.
+
+        Returns:
+            Query: This query.
+        '''
+        self.__fields = attrs
+        return self
+
+    def all(self):
+        '''Returns the results as a list.'''
+        return list(self)
+
+    def first(self):
+        '''Returns the first result, or None if nothing matches.'''
+        return next(iter(self), None)
+
+    def count(self):
+        '''Returns the number of results.'''
+        return sum(1 for _ in self)
+
+    def __iter__(self):
+        '''Yields the matching objects, or their projected attributes.'''
+        stop = None
+        if self.__limit is not None:
+            stop = self.__offset + self.__limit
+        best = self.__narrowest()
+        ordered = None
+        if self.__order is not None:
+            ordered = self.__ordered(best)
+        if ordered is not None:
+            results = (obj for obj in ordered if self.__matches(obj))
+        else:
+            if best is None:
+                best = self.__storage.all(self.__cls)
+            results = (obj for obj in best.values() if self.__matches(obj))
+            if self.__order is not None and stop is None:
+                results = sorted(results, key=self.__sort_key)
+            elif self.__order is not None:
+                results = heapq.nsmallest(stop, results, key=self.__sort_key)
+        for obj in islice(results, self.__offset, stop):
+            if self.__fields is None:
+                yield obj
+            else:
+                yield {attr: getattr(obj, attr, None)
+                       for attr in self.__fields}
+
+    def __narrowest(self):
+        '''Returns the smallest set of candidates the storage indexes can
+            give for the conditions.
+
+        Returns:
+            dict: The candidate objects keyed by storage key, or None if no
+                condition can be answered by an index.
+        '''
+        best = None
+        for attr, op, value in self.__conditions:
+            index = self.__storage.index(self.__cls, attr)
+            if index is None:
+                continue
+            matches = index.search(op, value)
+            if matches is not None and (best is None or
+                                        len(matches) < len(best)):
+                best = matches
+        return best
+
+    def __ordered(self, best):
+        '''Returns the candidates in result order straight from a sorted
+            index on the ordering attribute, when that index holds fewer
+            candidates than `best`.
+
+        Args:
+            best (dict): The narrowest candidates from `__narrowest()`.
+
+        Returns:
+            An iterator over the candidates in order, or None if the objects
+            have to be sorted instead.
+        '''
+        index = self.__storage.index(self.__cls, self.__order)
+        if index is None or not hasattr(index, "range"):
+            return None
+        low, high, low_inclusive, high_inclusive = None, None, True, True
+        for attr, op, value in self.__conditions:
+            if attr != self.__order or not index.is_number(value):
+                continue
+            inclusive = op in ("==", ">=", "<=")
+            if op in ("==", ">", ">=") and (
+                    low is None or value > low or
+                    (value == low and not inclusive)):
+                low, low_inclusive = value, inclusive
+            if op in ("==", "<", "<=") and (
+                    high is None or value < high or
+                    (value == high and not inclusive)):
+                high, high_inclusive = value, inclusive
+        if best is not None and len(best) < index.count_range(
+                low, high, low_inclusive, high_inclusive):
+            return None
+        return index.range(low, high, low_inclusive, high_inclusive,
+                           self.__reverse)
+
+    def __matches(self, obj):
+        '''Checks an object against every condition.
+
+        Args:
+            obj: The object to check.
+
+        Returns:
+            bool: True if the object meets all conditions. A comparison
+                between incompatible types counts as not met.
+        '''
+        for attr, op, value in self.__conditions:
+            try:
+                if not OPERATORS[op](getattr(obj, attr, None), value):
+                    return False
+            except TypeError:
+                return False
+        return True
+
+    def __sort_key(self, obj):
+        '''Returns the sort key of an object, placing missing values last.
+
+        Values of different types are grouped by type, numbers first and
+        then by type name, so a string set on a numeric attribute does not
+        make the ordering fail. A descending order only reverses the values
+        within each group, so the groups come in the order a sorted index
+        yields them.
+
+        Args:
+            obj: The object to sort.
+        '''
+        value = getattr(obj, self.__order, None)
+        if isinstance(value, (int, float)) and value == value:
+            kind = ""
+        else:
+            kind = type(value).__name__
+        if self.__reverse:
+            return (value is None, kind, Descending(value))
+        return (value is None, kind, value)
@@ -26,6 +26,17 @@ class Place(BaseModel):
       longitude (float): The geographical longitude of the place.
       amenity_ids (list[str]): A list of amenity IDs referencing the Amenity
                                model (if applicable).
+      __indexed__ (tuple): Attributes the storage engine keeps an index on.
+      __sorted__ (tuple): Numeric attributes the storage engine keeps in
+                          sorted order for range queries.
+      __inverted__ (tuple): List attributes the storage engine keeps an
+                            element-to-places index on.
+      __spatial__ (tuple): The latitude and longitude attributes the storage
+                           engine keeps a grid index on for map lookups.
+      __searchable__ (tuple): String attributes the storage engine keeps a
+                              full-text index on for keyword search.
+      __columnar__ (tuple): Attributes the storage engine keeps in columns
+                            for aggregates, e.g. the mean price by city.
     """
     city_id = ""
     user_id = ""
@@ -38,3 +49,10 @@ class Place(BaseModel):
     latitude = 0.0
     longitude = 0.0
     amenity_ids = []
+    __indexed__ = ("city_id", "user_id")
+    __sorted__ = ("price_by_night", "max_guest", "number_rooms")
+    __inverted__ = ("amenity_ids",)
+    __spatial__ = ("latitude", "longitude")
+    __searchable__ = ("name", "description")
+    __columnar__ = ("city_id", "user_id", "number_rooms", "number_bathrooms",
+                    "max_guest", "price_by_night", "latitude", "longitude")
@@ -17,7 +17,15 @@ class Review(BaseModel):
         user_id (str): The unique identifier of the user who wrote the review.
         text (str): The text content of the review itself.Validation rules
         might apply, e.g., minimum length
+        __indexed__ (tuple): Attributes the storage engine keeps an index on.
+        __searchable__ (tuple): String attributes the storage engine keeps a
+        full-text index on for keyword search.
+        __columnar__ (tuple): Attributes the storage engine keeps in columns
+        for aggregates, e.g. the review count per place.
     '''
     place_id = ""
     user_id = ""
     text = ""
+    __indexed__ = ("place_id", "user_id")
+    __searchable__ = ("text",)
+    __columnar__ = ("place_id", "user_id")
@@ -10,10 +10,22 @@ Unittest classes:
     TestHBNBCommand_destroy
     TestHBNBCommand_update
     TestHBNBCommand_exit
+    TestHBNBCommand_count
+    TestHBNBCommand_where
+    TestHBNBCommand_spatial
+    TestHBNBCommand_having
+    TestHBNBCommand_search
+    TestHBNBCommand_flush
+    TestHBNBCommand_transaction
 '''
 import sys
+import json
+import time
 import unittest
 import os
+import shutil
+import tempfile
+from datetime import datetime
 from models import storage
 from models.engine.file_storage import FileStorage
 from io import StringIO
@@ -22,6 +34,42 @@ from console import HBNBCommand
 
 
 
+class ConsoleStorageMixin:
+    """Runs each test in a temporary directory on an empty storage, and
+    creates places through the console. Subclasses set 'places' to the
+    update arguments of each place.
+    """
+    places = ()
+
+    def setUp(self):
+        """Moves to a temporary directory and clears objects."""
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """Removes the temporary directory and clears objects."""
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+        FileStorage._FileStorage__objects = {}
+
+    def create_places(self):
+        """Creates the places of 'places' through the console and returns
+        their ids.
+        """
+        ids = []
+        for arguments in self.places:
+            with patch("sys.stdout", new=StringIO()) as output:
+                HBNBCommand().onecmd("create Place")
+                place_id = output.getvalue().strip()
+            for argument in arguments:
+                HBNBCommand().onecmd("update Place {} {}".format(
+                    place_id, argument))
+            ids.append(place_id)
+        return ids
+
+
 class TestHBNBCommand_prompting(unittest.TestCase):
     '''Unittests for the prompting behavior of the HBNB command interpreter.'''
 
@@ -132,7 +180,10 @@ class TestHBNBCommand_help(unittest.TestCase):
         """    
         hlp_msg = ("Documented commands (type help <topic>):\n"
              "========================================\n"
-             "EOF  all  count  create  destroy  help  quit  show  update")
+             "EOF  begin   count   destroy  having  near  rollback  show    "
+             "where \n"
+             "all  commit  create  flush    help    quit  search    update  "
+             "within")
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("help"))
             self.assertEqual(hlp_msg, output.getvalue().strip())
@@ -184,6 +235,10 @@ class TestHBNBCommand_create(unittest.TestCase):
             os.remove("file.json")
         except IOError:
             pass
+        try:
+            os.remove("file.json.text")
+        except IOError:
+            pass
         try:
             os.rename("tmp", "file.json")
         except IOError:
@@ -290,6 +345,10 @@ class TestHBNBCommand_show(unittest.TestCase):
             os.remove("file.json")
         except IOError:
             pass
+        try:
+            os.remove("file.json.text")
+        except IOError:
+            pass
         try:
             os.rename("tmp", "file.json")
         except IOError:
@@ -573,6 +632,10 @@ class TestHBNBCommand_destroy(unittest.TestCase):
             os.remove("file.json")
         except IOError:
             pass
+        try:
+            os.remove("file.json.text")
+        except IOError:
+            pass
         try:
             os.rename("tmp", "file.json")
         except IOError:
@@ -835,6 +898,10 @@ class TestHBNBCommand_all(unittest.TestCase):
             os.remove("file.json")
         except IOError:
             pass
+        try:
+            os.remove("file.json.text")
+        except IOError:
+            pass
         try:
             os.rename("tmp", "file.json")
         except IOError:
@@ -990,6 +1057,10 @@ class TestHBNBCommand_update(unittest.TestCase):
             os.remove("file.json")
         except IOError:
             pass
+        try:
+            os.remove("file.json.text")
+        except IOError:
+            pass
         try:
             os.rename("tmp", "file.json")
         except IOError:
@@ -1423,7 +1494,7 @@ class TestHBNBCommand_update(unittest.TestCase):
             testId = output.getvalue().strip()
         testCmd = "update Place {} max_guest 98".format(testId)
         self.assertFalse(HBNBCommand().onecmd(testCmd))
-        test_dict = storage.all()["Place.{}".format(testId)].__dict__
+        test_dict = storage.all()["Place.{}".format(testId)].attributes()
         self.assertEqual(98, test_dict["max_guest"])
 
     def test_update_valid_int_attr_dot_notation(self):
@@ -1432,7 +1503,7 @@ class TestHBNBCommand_update(unittest.TestCase):
             tId = output.getvalue().strip()
         testCmd = "Place.update({}, max_guest, 98)".format(tId)
         self.assertFalse(HBNBCommand().onecmd(testCmd))
-        test_dict = storage.all()["Place.{}".format(tId)].__dict__
+        test_dict = storage.all()["Place.{}".format(tId)].attributes()
         self.assertEqual(98, test_dict["max_guest"])
 
     def test_update_valid_float_attr_space_notation(self):
@@ -1441,7 +1512,7 @@ class TestHBNBCommand_update(unittest.TestCase):
             testId = output.getvalue().strip()
         testCmd = "update Place {} latitude 7.2".format(testId)
         self.assertFalse(HBNBCommand().onecmd(testCmd))
-        test_dict = storage.all()["Place.{}".format(testId)].__dict__
+        test_dict = storage.all()["Place.{}".format(testId)].attributes()
         self.assertEqual(7.2, test_dict["latitude"])
 
     def test_update_valid_float_attr_dot_notation(self):
@@ -1450,7 +1521,7 @@ class TestHBNBCommand_update(unittest.TestCase):
             tId = output.getvalue().strip()
         testCmd = "Place.update({}, latitude, 7.2)".format(tId)
         self.assertFalse(HBNBCommand().onecmd(testCmd))
-        test_dict = storage.all()["Place.{}".format(tId)].__dict__
+        test_dict = storage.all()["Place.{}".format(tId)].attributes()
         self.assertEqual(7.2, test_dict["latitude"])
 
     def test_update_valid_dictionary_space_notation(self):
@@ -1588,7 +1659,7 @@ class TestHBNBCommand_update(unittest.TestCase):
         testCmd = "update Place {} ".format(testId)
         testCmd += "{'max_guest': 98})"
         HBNBCommand().onecmd(testCmd)
-        test_dict = storage.all()["Place.{}".format(testId)].__dict__
+        test_dict = storage.all()["Place.{}".format(testId)].attributes()
         self.assertEqual(98, test_dict["max_guest"])
 
     def test_update_valid_dictionary_with_int_dot_notation(self):
@@ -1598,7 +1669,7 @@ class TestHBNBCommand_update(unittest.TestCase):
         testCmd = "Place.update({}, ".format(testId)
         testCmd += "{'max_guest': 98})"
         HBNBCommand().onecmd(testCmd)
-        test_dict = storage.all()["Place.{}".format(testId)].__dict__
+        test_dict = storage.all()["Place.{}".format(testId)].attributes()
         self.assertEqual(98, test_dict["max_guest"])
 
     def test_update_valid_dictionary_with_float_space_notation(self):
@@ -1608,7 +1679,7 @@ class TestHBNBCommand_update(unittest.TestCase):
         testCmd = "update Place {} ".format(testId)
         testCmd += "{'latitude': 9.8})"
         HBNBCommand().onecmd(testCmd)
-        test_dict = storage.all()["Place.{}".format(testId)].__dict__
+        test_dict = storage.all()["Place.{}".format(testId)].attributes()
         self.assertEqual(9.8, test_dict["latitude"])
 
     def test_update_valid_dictionary_with_float_dot_notation(self):
@@ -1618,9 +1689,46 @@ class TestHBNBCommand_update(unittest.TestCase):
         testCmd = "Place.update({}, ".format(testId)
         testCmd += "{'latitude': 9.8})"
         HBNBCommand().onecmd(testCmd)
-        test_dict = storage.all()["Place.{}".format(testId)].__dict__
+        test_dict = storage.all()["Place.{}".format(testId)].attributes()
         self.assertEqual(9.8, test_dict["latitude"])
 
+    def test_update_slot_attribute(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create BaseModel")
+            testId = output.getvalue().strip()
+        testCmd = "update BaseModel {} created_at ".format(testId)
+        self.assertFalse(HBNBCommand().onecmd(
+            testCmd + "2017-09-28T21:03:54.052298"))
+        obj = storage.all()["BaseModel.{}".format(testId)]
+        self.assertEqual(datetime(2017, 9, 28, 21, 3, 54, 52298),
+                         obj.created_at)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(testCmd + "yesterday"))
+            self.assertEqual("** invalid value **", output.getvalue().strip())
+        self.assertEqual(datetime(2017, 9, 28, 21, 3, 54, 52298),
+                         obj.created_at)
+
+    def test_update_slot_attribute_dictionary(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create Place")
+            testId = output.getvalue().strip()
+        testCmd = "update Place {} ".format(testId)
+        testCmd += "{'updated_at': '2017-09-28T21:03:54', 'number_rooms': '3'}"
+        HBNBCommand().onecmd(testCmd)
+        obj = storage.all()["Place.{}".format(testId)]
+        self.assertEqual(datetime(2017, 9, 28, 21, 3, 54), obj.updated_at)
+        self.assertEqual(3, obj.number_rooms)
+
+    def test_update_invalid_value(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create Place")
+            testId = output.getvalue().strip()
+        testCmd = "update Place {} number_rooms many".format(testId)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(testCmd))
+            self.assertEqual("** invalid value **", output.getvalue().strip())
+        self.assertEqual(0, storage.get("Place", testId).number_rooms)
+
 
 class TestHBNBCommand_count(unittest.TestCase):
     """Unittests for testing 'count method` from HBNB comand interpreter."""
@@ -1639,6 +1747,10 @@ class TestHBNBCommand_count(unittest.TestCase):
             os.remove("file.json")
         except IOError:
             pass
+        try:
+            os.remove("file.json.text")
+        except IOError:
+            pass
         try:
             os.rename("tmp", "file.json")
         except IOError:
@@ -1687,5 +1799,403 @@ class TestHBNBCommand_count(unittest.TestCase):
             self.assertEqual("1", output.getvalue().strip())
 
 
+class TestHBNBCommand_where(ConsoleStorageMixin, unittest.TestCase):
+    """Unittests for testing 'where' from the HBNB command interpreter."""
+
+    places = (('name "Loft"', "price_by_night 80"),
+              ('name "Villa"', "price_by_night 300"),
+              ('name "Cabin"', "price_by_night 120"))
+
+    def test_where_missing_class(self):
+        correct_msg = "** class name missing **"
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("where"))
+            self.assertEqual(correct_msg, output.getvalue().strip())
+
+    def test_where_invalid_class(self):
+        correct_msg = "** class doesn't exist **"
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("where MyModel"))
+            self.assertEqual(correct_msg, output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("MyModel.where()"))
+            self.assertEqual(correct_msg, output.getvalue().strip())
+
+    def test_where_invalid_query(self):
+        correct_msg = "** invalid query **"
+        for command in ("Place.where(price_by_night<)",
+                        "Place.where().limit(x)",
+                        "Place.where().sort(name)",
+                        "where Place name"):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(command))
+                self.assertEqual(correct_msg, output.getvalue().strip())
+
+    def test_where_order_by_mixed_types(self):
+        ids = self.create_places()
+        HBNBCommand().onecmd("update Place {} rating 4".format(ids[0]))
+        HBNBCommand().onecmd('update Place {} {{"rating": 3}}'.format(ids[1]))
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.where().order_by(rating).only(rating)"))
+            self.assertEqual("[{'rating': 3}, {'rating': '4'}, "
+                             "{'rating': None}]", output.getvalue().strip())
+
+    def test_where_order_by_unorderable(self):
+        ids = self.create_places()
+        storage.get("Place", ids[0]).rating = {"stars": 4}
+        storage.get("Place", ids[1]).rating = {"stars": 3}
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.where().order_by(rating)"))
+            self.assertEqual("** invalid query **",
+                             output.getvalue().strip())
+
+    def test_where_space_notation(self):
+        ids = self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "where Place price_by_night<100"))
+            self.assertIn(ids[0], output.getvalue())
+            self.assertNotIn(ids[1], output.getvalue())
+            self.assertNotIn(ids[2], output.getvalue())
+
+    def test_where_dot_notation(self):
+        ids = self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                'Place.where(price_by_night>=100, name!="Villa")'))
+            self.assertNotIn(ids[0], output.getvalue())
+            self.assertNotIn(ids[1], output.getvalue())
+            self.assertIn(ids[2], output.getvalue())
+
+    def test_where_order_limit_only(self):
+        self.create_places()
+        command = ("Place.where(price_by_night>50).order_by(-price_by_night)"
+                   ".offset(1).limit(1).only(name, price_by_night)")
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(command))
+            self.assertEqual("[{'name': 'Cabin', 'price_by_night': 120}]",
+                             output.getvalue().strip())
+
+    def test_where_contains_and_in(self):
+        self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                'Place.where(name contains "ill").only(name)'))
+            self.assertEqual("[{'name': 'Villa'}]",
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                'Place.where(name in ["Loft"]).only(name)'))
+            self.assertEqual("[{'name': 'Loft'}]",
+                             output.getvalue().strip())
+
+
+class TestHBNBCommand_spatial(ConsoleStorageMixin, unittest.TestCase):
+    """Unittests for testing 'near' and 'within' from the HBNB command
+    interpreter."""
+
+    places = (("latitude 37.8044", "longitude -122.2712"),
+              ("latitude 37.78", "longitude -122.41"),
+              ("latitude 40.7128", "longitude -74.006"))
+
+    def test_missing_class(self):
+        correct_msg = "** class name missing **"
+        for command in ("near", "within"):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(command))
+                self.assertEqual(correct_msg, output.getvalue().strip())
+
+    def test_invalid_class(self):
+        correct_msg = "** class doesn't exist **"
+        for command in ("near MyModel 1 1 1", "MyModel.within(1, 1, 2, 2)"):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(command))
+                self.assertEqual(correct_msg, output.getvalue().strip())
+
+    def test_missing_coordinates(self):
+        correct_msg = "** coordinates missing **"
+        for command in ("near Place 1 1", "Place.within(1, 1, 2)"):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(command))
+                self.assertEqual(correct_msg, output.getvalue().strip())
+
+    def test_invalid_coordinates(self):
+        correct_msg = "** invalid coordinates **"
+        for command in ("near Place north 1 1", "within Place 1 1 2 east"):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(command))
+                self.assertEqual(correct_msg, output.getvalue().strip())
+
+    def test_near_space_notation(self):
+        ids = self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "near Place 37.7749 -122.4194 20"))
+            result = output.getvalue()
+            self.assertLess(result.index(ids[1]), result.index(ids[0]))
+            self.assertNotIn(ids[2], result)
+
+    def test_near_dot_notation(self):
+        ids = self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.near(37.7749, -122.4194, 5)"))
+            self.assertIn(ids[1], output.getvalue())
+            self.assertNotIn(ids[0], output.getvalue())
+
+    def test_within(self):
+        ids = self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.within(40, -75, 41, -73)"))
+            self.assertIn(ids[2], output.getvalue())
+            self.assertNotIn(ids[0], output.getvalue())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "within Place 37 -123 38 -122"))
+            self.assertIn(ids[0], output.getvalue())
+            self.assertIn(ids[1], output.getvalue())
+            self.assertNotIn(ids[2], output.getvalue())
+
+
+class TestHBNBCommand_having(ConsoleStorageMixin, unittest.TestCase):
+    """Unittests for testing 'having' from the HBNB command interpreter."""
+
+    places = (('{"amenity_ids": [\'wifi\', \'pool\']}',),
+              ('{"amenity_ids": [\'wifi\']}',),
+              ('{"amenity_ids": [\'parking\']}',))
+
+    def test_having_missing_arguments(self):
+        for command, correct_msg in (
+                ("having", "** class name missing **"),
+                ("having MyModel amenity_ids wifi",
+                 "** class doesn't exist **"),
+                ("having Place", "** attribute name missing **"),
+                ("having Place amenity_ids", "** value missing **"),
+                ("Place.having(amenity_ids, any)", "** value missing **")):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(command))
+                self.assertEqual(correct_msg, output.getvalue().strip())
+
+    def test_having_all(self):
+        ids = self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "having Place amenity_ids wifi pool"))
+            self.assertIn(ids[0], output.getvalue())
+            self.assertNotIn(ids[1], output.getvalue())
+            self.assertNotIn(ids[2], output.getvalue())
+
+    def test_having_any(self):
+        ids = self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "Place.having(amenity_ids, any, pool, parking)"))
+            self.assertIn(ids[0], output.getvalue())
+            self.assertNotIn(ids[1], output.getvalue())
+            self.assertIn(ids[2], output.getvalue())
+
+
+class TestHBNBCommand_search(ConsoleStorageMixin, unittest.TestCase):
+    """Unittests for testing 'search' from the HBNB command interpreter."""
+
+    places = (('description "Cozy loft near the park"',),
+              ('description "Seaside villa with a pool"',),
+              ('description "Cozy cabin, cozy fireplace"',))
+
+    def test_search_missing_arguments(self):
+        for command, correct_msg in (
+                ("search", "** class name missing **"),
+                ("search MyModel cozy", "** class doesn't exist **"),
+                ("search Place", "** keywords missing **"),
+                ("Place.search()", "** keywords missing **")):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(command))
+                self.assertEqual(correct_msg, output.getvalue().strip())
+
+    def test_search_space_notation(self):
+        ids = self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search Place cozy"))
+            result = output.getvalue()
+            self.assertLess(result.index(ids[2]), result.index(ids[0]))
+            self.assertNotIn(ids[1], result)
+
+    def test_search_dot_notation(self):
+        ids = self.create_places()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("Place.search(Pool)"))
+            self.assertEqual("[{!r}]".format(
+                storage.get("Place", ids[1]).__str__()),
+                output.getvalue().strip())
+
+
+
+class TestHBNBCommand_flush(ConsoleStorageMixin, unittest.TestCase):
+    """Unittests for group commit in the HBNB command interpreter."""
+
+    def tearDown(self):
+        storage.flush()
+        super().tearDown()
+
+    def create_users(self, count):
+        """Creates users through the console and returns their ids."""
+        ids = []
+        for _ in range(count):
+            with patch("sys.stdout", new=StringIO()) as output:
+                HBNBCommand().onecmd("create User")
+            ids.append(output.getvalue().strip())
+        return ids
+
+    def saved_ids(self):
+        """Returns the ids of the objects saved in 'file.json'."""
+        try:
+            with open("file.json", "r") as f:
+                return [key.partition(".")[2] for key in json.load(f)]
+        except IOError:
+            return []
+
+    def test_group_ops(self):
+        with patch.object(storage, "group_ops", 3):
+            ids = self.create_users(2)
+            self.assertEqual([], self.saved_ids())
+            self.assertEqual(2, storage.pending_saves())
+            ids += self.create_users(1)
+            self.assertCountEqual(ids, self.saved_ids())
+            self.assertEqual(0, storage.pending_saves())
+
+    def test_group_window(self):
+        with patch.object(storage, "group_window", 60.0):
+            ids = self.create_users(2)
+            self.assertEqual([], self.saved_ids())
+            with patch("models.engine.base_storage.monotonic",
+                       return_value=float("inf")):
+                ids += self.create_users(1)
+            self.assertCountEqual(ids, self.saved_ids())
+
+    def test_group_window_timer(self):
+        with patch.object(storage, "group_window", 0.05):
+            ids = self.create_users(1)
+            deadline = time.monotonic() + 5.0
+            while storage.pending_saves() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(ids, self.saved_ids())
+
+    def test_update_and_destroy_are_grouped(self):
+        ids = self.create_users(2)
+        with patch.object(storage, "group_ops", 10):
+            HBNBCommand().onecmd("update User {} first_name Betty".format(
+                ids[0]))
+            HBNBCommand().onecmd("destroy User {}".format(ids[1]))
+            self.assertCountEqual(ids, self.saved_ids())
+            self.assertEqual(2, storage.pending_saves())
+
+    def test_flush(self):
+        with patch.object(storage, "group_ops", 10):
+            ids = self.create_users(2)
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd("flush"))
+            self.assertEqual("", output.getvalue())
+            self.assertCountEqual(ids, self.saved_ids())
+            self.assertEqual(0, storage.pending_saves())
+
+    def test_flush_nothing_pending(self):
+        with patch.object(storage, "save") as save:
+            HBNBCommand().onecmd("flush")
+        save.assert_not_called()
+
+    def test_quit_flushes(self):
+        with patch.object(storage, "group_ops", 10):
+            ids = self.create_users(1)
+            self.assertTrue(HBNBCommand().onecmd("quit"))
+            self.assertEqual(ids, self.saved_ids())
+
+    def test_EOF_flushes(self):
+        with patch.object(storage, "group_ops", 10):
+            ids = self.create_users(1)
+            with patch("sys.stdout", new=StringIO()):
+                self.assertTrue(HBNBCommand().onecmd("EOF"))
+            self.assertEqual(ids, self.saved_ids())
+
+    def test_help_flush(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("help flush")
+        self.assertIn("usage: flush", output.getvalue())
+
+
+class TestHBNBCommand_transaction(ConsoleStorageMixin, unittest.TestCase):
+    """Unittests for transactions in the HBNB command interpreter."""
+
+    def tearDown(self):
+        if storage.in_transaction():
+            storage.rollback()
+        super().tearDown()
+
+    def run_commands(self, *commands):
+        """Runs console commands and returns what they printed."""
+        with patch("sys.stdout", new=StringIO()) as output:
+            for command in commands:
+                HBNBCommand().onecmd(command)
+        return output.getvalue().strip()
+
+    def saved_ids(self):
+        """Returns the ids of the objects saved in 'file.json'."""
+        try:
+            with open("file.json", "r") as f:
+                return [key.partition(".")[2] for key in json.load(f)]
+        except IOError:
+            return []
+
+    def test_commit_saves_once(self):
+        self.run_commands("begin")
+        with patch.object(storage, "save", wraps=storage.save) as save:
+            ids = self.run_commands("create User", "create Place").split()
+            self.assertEqual([], self.saved_ids())
+            self.assertEqual("", self.run_commands("commit"))
+        self.assertEqual(1, save.call_count)
+        self.assertCountEqual(ids, self.saved_ids())
+        self.assertFalse(storage.in_transaction())
+
+    def test_rollback(self):
+        user_id = self.run_commands("create User", "create State").split()
+        self.run_commands("begin")
+        place_id = self.run_commands("create Place")
+        self.run_commands(
+            "update User {} first_name Betty".format(user_id[0]),
+            "destroy State {}".format(user_id[1]))
+        self.assertEqual("", self.run_commands("rollback"))
+        self.assertCountEqual(user_id, self.saved_ids())
+        self.assertIsNone(storage.get("Place", place_id))
+        self.assertIsNotNone(storage.get("State", user_id[1]))
+        self.assertNotIn("first_name",
+                         storage.get("User", user_id[0]).attributes())
+        self.assertFalse(storage.in_transaction())
+
+    def test_begin_twice(self):
+        self.run_commands("begin")
+        self.assertEqual("** transaction already open **",
+                         self.run_commands("begin"))
+
+    def test_no_transaction(self):
+        self.assertEqual("** no transaction open **",
+                         self.run_commands("commit"))
+        self.assertEqual("** no transaction open **",
+                         self.run_commands("rollback"))
+
+    def test_quit_rolls_back(self):
+        self.run_commands("begin", "create User")
+        self.assertTrue(HBNBCommand().onecmd("quit"))
+        self.assertFalse(storage.in_transaction())
+        self.assertEqual([], self.saved_ids())
+        self.assertEqual(0, storage.count())
+
+    def test_help_transaction(self):
+        for command in ("begin", "commit", "rollback"):
+            self.assertIn("usage: " + command,
+                          self.run_commands("help " + command))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -5,13 +5,19 @@ Unittest classes:
     **TestBaseModel_instantiation
     **TestBaseModel_save
     **TestBaseModel_to_dict
+    **TestBaseModel_parse_timestamp
+    **TestBaseModel_slots
+    **TestBaseModel_intern_ids
 """
+import gc
 import os
 import models
 import unittest
 from datetime import datetime
 from time import sleep
-from models.base_model import BaseModel
+from models.base_model import BaseModel, Field, intern_ids, \
+    parse_timestamp
+from models.place import Place
 
 
 class TestBaseModel_instantiation(unittest.TestCase):
@@ -77,6 +83,16 @@ class TestBaseModel_instantiation(unittest.TestCase):
         with self.assertRaises(TypeError):
             BaseModel(id=None, created_at=None, updated_at=None)
 
+    def test_instantiation_with_datetime_kwargs(self):
+        dt = datetime.today()
+        base_mdl = BaseModel(id="345", created_at=dt, updated_at=dt)
+        self.assertEqual(base_mdl.created_at, dt)
+        self.assertEqual(base_mdl.updated_at, dt)
+
+    def test_instantiation_with_invalid_timestamp_kwargs(self):
+        with self.assertRaises(ValueError):
+            BaseModel(id="345", created_at="yesterday")
+
     def test_instantiation_with_args_and_kwargs(self):
         dt = datetime.today()
         dt_isofmt = dt.isoformat()
@@ -102,6 +118,10 @@ class TestBaseModel_save(unittest.TestCase):
             os.remove("file.json")
         except IOError:
             pass
+        try:
+            os.remove("file.json.text")
+        except IOError:
+            pass
         try:
             os.rename("tmp", "file.json")
         except IOError:
@@ -188,5 +208,130 @@ class TestBaseModel_to_dict(unittest.TestCase):
             base_mdl.to_dict(None)
 
 
+class TestBaseModel_parse_timestamp(unittest.TestCase):
+    """Unittests for the timestamp parser of the kwargs constructor."""
+
+    def test_isoformat(self):
+        dt = datetime(2017, 9, 28, 21, 3, 54, 52298)
+        self.assertEqual(dt, parse_timestamp(dt.isoformat()))
+
+    def test_isoformat_without_microseconds(self):
+        dt = datetime(2017, 9, 28, 21, 3, 54)
+        self.assertEqual(dt, parse_timestamp(dt.isoformat()))
+
+    def test_same_as_strptime(self):
+        value = "2017-09-28T21:03:54.052298"
+        self.assertEqual(datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f"),
+                         parse_timestamp(value))
+
+    def test_invalid(self):
+        for value in ["", "2017-09-28", "2017-09-28 21:03:54.052298",
+                      "2017-13-28T21:03:54.052298", "2017-09-28T21:03:54.",
+                      "2017-09-28T21:03:54.05229Z",
+                      "2017-09-28T21:03:54+00:00",
+                      "2017-09-28T21:03:54.052298+00:00"]:
+            with self.assertRaises(ValueError):
+                parse_timestamp(value)
+
+    def test_not_str(self):
+        with self.assertRaises(TypeError):
+            parse_timestamp(None)
+
+
+class TestBaseModel_slots(unittest.TestCase):
+    """Unittests for the slot-backed schema attributes of the models."""
+
+    def test_schema_attributes_are_fields(self):
+        self.assertIsInstance(Place.__dict__["city_id"], Field)
+        self.assertIn("__city_id", Place.__slots__)
+        self.assertEqual(("city_id", "user_id"), Place.__indexed__)
+
+    def test_class_defaults(self):
+        self.assertEqual("", Place.city_id)
+        self.assertEqual(0, Place.max_guest)
+        self.assertEqual([], Place.amenity_ids)
+
+    def test_unset_attribute_is_default(self):
+        plc = Place()
+        self.assertEqual("", plc.city_id)
+        self.assertNotIn("city_id", plc.attributes())
+
+    def test_schema_attribute_in_slot(self):
+        plc = Place()
+        plc.city_id = "123"
+        self.assertEqual("123", plc.city_id)
+        self.assertEqual("", Place.city_id)
+        self.assertNotIn("city_id", plc.__dict__)
+        self.assertEqual("123", plc.attributes()["city_id"])
+
+    def test_delete_schema_attribute(self):
+        plc = Place()
+        plc.max_guest = 4
+        del plc.max_guest
+        self.assertEqual(0, plc.max_guest)
+        with self.assertRaises(AttributeError):
+            del plc.max_guest
+
+    def test_extra_attribute_in_dict(self):
+        plc = Place()
+        plc.pets = True
+        self.assertEqual({"pets": True}, plc.__dict__)
+        self.assertTrue(plc.to_dict()["pets"])
+        self.assertIn("'pets': True", str(plc))
+
+    def test_no_dict_without_extra_attributes(self):
+        plc = Place(id="1", created_at="2017-09-28T21:03:54.052298",
+                    updated_at="2017-09-28T21:03:54.052298", name="Loft")
+        plc.to_dict()
+        str(plc)
+        self.assertFalse(any(type(ref) is dict
+                             for ref in gc.get_referents(plc)))
+
+    def test_kwargs_round_trip(self):
+        plc = Place()
+        plc.name = "Loft"
+        plc.pets = True
+        self.assertEqual(plc.to_dict(), Place(**plc.to_dict()).to_dict())
+
+
+class TestBaseModel_intern_ids(unittest.TestCase):
+    """Unittests for the sharing of id strings between objects."""
+
+    def id_copy(self):
+        """Returns a new string object holding the same id each time."""
+        return "".join(["5a2f3b9c-", "0d1e-4f5a-8b6c-7d8e9f0a1b2c"])
+
+    def test_id_copies_are_distinct(self):
+        self.assertIsNot(self.id_copy(), self.id_copy())
+
+    def test_kwargs_share_ids(self):
+        place1 = Place(id=self.id_copy(), city_id=self.id_copy())
+        place2 = Place(id="2", city_id=self.id_copy())
+        self.assertIs(place1.city_id, place2.city_id)
+        self.assertIs(place1.id, place2.city_id)
+
+    def test_setattr_shares_ids(self):
+        place1 = Place()
+        place2 = Place()
+        place1.user_id = self.id_copy()
+        place2.user_id = self.id_copy()
+        self.assertIs(place1.user_id, place2.user_id)
+
+    def test_id_lists_are_shared(self):
+        place1 = Place(id="1", amenity_ids=[self.id_copy(), 3])
+        place2 = Place()
+        amenity_ids = [self.id_copy()]
+        place2.amenity_ids = amenity_ids
+        self.assertIs(amenity_ids, place2.amenity_ids)
+        self.assertIs(place1.amenity_ids[0], place2.amenity_ids[0])
+        self.assertEqual(3, place1.amenity_ids[1])
+
+    def test_other_values_unchanged(self):
+        name = self.id_copy()
+        self.assertIs(name, intern_ids("name", name))
+        self.assertEqual(5, intern_ids("city_id", 5))
+        self.assertEqual("a", intern_ids("amenity_ids", "a"))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -105,6 +105,10 @@ class TestCity_save(unittest.TestCase):
             os.remove("file.json")
         except IOError:
             pass
+        try:
+            os.remove("file.json.text")
+        except IOError:
+            pass
         try:
             os.rename("tmp", "file.json")
         except IOError:
@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""Defines the fixture shared by the storage engine tests.
+
+Classes:
+    **StorageFixture
+"""
+import os
+import shutil
+import tempfile
+import models
+from models import engine
+from models.engine.file_storage import FileStorage
+
+
+class StorageFixture:
+    """Runs each test in a temporary directory with a fresh engine installed
+    as 'models.storage', so model changes are reported to it. Subclasses
+    set 'engine' to a registry name.
+
+    Engines keep their default file paths, which all lie in the temporary
+    directory.
+    """
+    engine = None
+
+    def setUp(self):
+        """Moves to a temporary directory and installs a fresh engine as
+        'models.storage'.
+        """
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        self.saved_storage = models.storage
+        self.storages = []
+        self.storage = self.reopen()
+
+    def tearDown(self):
+        """Closes the engines and removes the temporary directory."""
+        for storage in self.storages:
+            if hasattr(storage, "close"):
+                storage.close()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+        FileStorage._FileStorage__objects = {}
+        models.storage = self.saved_storage
+
+    def reopen(self):
+        """Returns a new engine, reloaded from what the previous one saved,
+        as 'models.storage'.
+        """
+        FileStorage._FileStorage__objects = {}
+        storage = engine.create(self.engine)
+        storage.reload()
+        models.storage = storage
+        self.storages.append(storage)
+        return storage
@@ -0,0 +1,168 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/binary_format.py.
+
+Unittest classes:
+    **TestBinaryFormat_codec
+    **TestBinaryFormat_converter
+"""
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from uuid import uuid4
+from models.engine import binary_format
+from models.engine.binary_format import dumps, loads
+
+
+class TestBinaryFormat_codec(unittest.TestCase):
+    """Unittests for encoding and decoding values."""
+
+    def test_round_trip(self):
+        values = [None, True, False, 0, -1, 2 ** 63 - 1, -2 ** 63, 2 ** 80,
+                  -2 ** 70, 0.5, float("inf"), "", "héllo", str(uuid4()),
+                  datetime(2017, 9, 28, 21, 3, 54, 52298),
+                  datetime(1969, 12, 31, 23, 59, 59, 999999),
+                  [], [1, "a", [None]], {}, {"a": {"b": [1.5, "c"]}}]
+        for value in values:
+            self.assertEqual(value, loads(dumps(value)))
+            self.assertEqual(type(value), type(loads(dumps(value))))
+
+    def test_tuple_decodes_as_list(self):
+        self.assertEqual([1, 2], loads(dumps((1, 2))))
+
+    def test_uuid_is_16_bytes(self):
+        self.assertEqual(17, len(dumps(str(uuid4()))))
+
+    def test_uppercase_uuid_is_str(self):
+        text = str(uuid4()).upper()
+        self.assertEqual(binary_format.STR, dumps(text)[:1])
+        self.assertEqual(text, loads(dumps(text)))
+
+    def test_datetime_is_8_bytes(self):
+        self.assertEqual(9, len(dumps(datetime(2024, 1, 1))))
+
+    def test_unsupported_types(self):
+        for value in [object(), {1: "a"}, b"bytes", {"a": {1, 2}}]:
+            with self.assertRaises(TypeError):
+                dumps(value)
+
+    def test_aware_datetime(self):
+        with self.assertRaises(TypeError):
+            dumps(datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+    def test_unknown_tag(self):
+        with self.assertRaises(ValueError):
+            loads(b"\xff")
+
+    def test_read_records(self):
+        records = [dumps({"__class__": "User", "id": "1"}), dumps({})]
+        data = binary_format.MAGIC + b"".join(
+            binary_format.size.pack(len(record)) + record
+            for record in records)
+        self.assertEqual([({"__class__": "User", "id": "1"}, records[0]),
+                          ({}, records[1])],
+                         list(binary_format.read_records(data)))
+
+    def test_read_records_bad_magic(self):
+        with self.assertRaises(ValueError):
+            list(binary_format.read_records(b'{"User.1": {}}'))
+
+    def test_read_records_bad_length(self):
+        record = dumps({})
+        data = binary_format.MAGIC + binary_format.size.pack(9) + record
+        with self.assertRaises(ValueError):
+            list(binary_format.read_records(data))
+
+    def test_read_records_truncated(self):
+        data = binary_format.pack_records(
+            [dumps({"__class__": "User", "id": str(uuid4()), "n": 1,
+                    "created_at": datetime(2017, 9, 28)})])
+        for end in range(len(binary_format.MAGIC) + 1, len(data)):
+            with self.assertRaises(ValueError):
+                list(binary_format.read_records(data[:end]))
+
+    def test_read_records_bad_record(self):
+        record = binary_format.MAP + binary_format.size.pack(1)
+        data = binary_format.pack_records([record])
+        with self.assertRaises(ValueError):
+            list(binary_format.read_records(data))
+
+
+class TestBinaryFormat_converter(unittest.TestCase):
+    """Unittests for converting files between JSON and binary."""
+
+    def setUp(self):
+        """Creates a temporary directory holding a FileStorage JSON file."""
+        self.tmp = tempfile.mkdtemp()
+        self.json_path = os.path.join(self.tmp, "file.json")
+        self.bin_path = os.path.join(self.tmp, "file.bin")
+        self.objects = {}
+        for i in range(20):
+            obj_id = str(uuid4())
+            self.objects["Place." + obj_id] = {
+                "__class__": "Place", "id": obj_id,
+                "created_at": "2017-09-28T21:03:54.052298",
+                "updated_at": "2017-09-28T21:03:54.052302",
+                "city_id": str(uuid4()), "number_rooms": i,
+                "latitude": 37.77, "amenity_ids": [str(uuid4())]}
+        with open(self.json_path, "w") as f:
+            json.dump(self.objects, f)
+
+    def tearDown(self):
+        """Removes the temporary directory."""
+        shutil.rmtree(self.tmp)
+
+    def test_round_trip(self):
+        binary_format.json_to_binary(self.json_path, self.bin_path)
+        os.remove(self.json_path)
+        binary_format.binary_to_json(self.bin_path, self.json_path)
+        with open(self.json_path, "r") as f:
+            self.assertEqual(self.objects, json.load(f))
+
+    def test_timestamps_are_typed(self):
+        binary_format.json_to_binary(self.json_path, self.bin_path)
+        with open(self.bin_path, "rb") as f:
+            fields, _ = next(binary_format.read_records(f.read()))
+        self.assertEqual(datetime(2017, 9, 28, 21, 3, 54, 52298),
+                         fields["created_at"])
+
+    def test_truncated_binary_file(self):
+        binary_format.json_to_binary(self.json_path, self.bin_path)
+        with open(self.bin_path, "rb+") as f:
+            f.truncate(os.path.getsize(self.bin_path) - 3)
+        with self.assertRaises(ValueError):
+            binary_format.binary_to_json(self.bin_path, self.json_path)
+        with open(self.json_path, "r") as f:
+            self.assertEqual(self.objects, json.load(f))
+
+    def test_writes_are_atomic(self):
+        with patch.object(binary_format, "atomic_write",
+                          wraps=binary_format.atomic_write) as write:
+            binary_format.json_to_binary(self.json_path, self.bin_path)
+            binary_format.binary_to_json(self.bin_path, self.json_path)
+        self.assertEqual([self.bin_path, self.json_path],
+                         [call[0][0] for call in write.call_args_list])
+
+    def test_smaller_than_json(self):
+        binary_format.json_to_binary(self.json_path, self.bin_path)
+        self.assertLess(os.path.getsize(self.bin_path),
+                        os.path.getsize(self.json_path) * 0.7)
+
+    def test_main(self):
+        with patch("sys.stdout", new=io.StringIO()):
+            self.assertEqual(0, binary_format.main(
+                ["to-binary", self.json_path, self.bin_path]))
+        self.assertTrue(os.path.isfile(self.bin_path))
+
+    def test_main_usage(self):
+        with patch("sys.stdout", new=io.StringIO()) as output:
+            self.assertEqual(2, binary_format.main(["to-xml", "a", "b"]))
+        self.assertIn("usage", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
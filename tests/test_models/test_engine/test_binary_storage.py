@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/binary_storage.py.
+
+Unittest classes:
+    **TestBinaryStorage_instantiation
+    **TestBinaryStorage_methods
+"""
+import os
+import unittest
+from unittest.mock import patch
+from models.engine import binary_format
+from models.engine.binary_storage import BinaryStorage
+from models.user import User
+from models.place import Place
+from tests.test_models.test_engine.storage_fixture import StorageFixture
+
+
+class TestBinaryStorage_instantiation(unittest.TestCase):
+    """Unittests for BinaryStorage class instantiation."""
+
+    def test_BinaryStorage_instantiation_no_args(self):
+        """Tests creating BinaryStorage instance with no arguments."""
+        self.assertEqual(type(BinaryStorage()), BinaryStorage)
+
+    def test_BinaryStorage_instantiation_with_arg(self):
+        """Tests creating BinaryStorage instance with argument (raises
+        TypeError).
+        """
+        with self.assertRaises(TypeError):
+            BinaryStorage(None)
+
+    def test_BinaryStorage_file_path(self):
+        self.assertEqual("file.bin", BinaryStorage._BinaryStorage__file_path)
+
+
+class TestBinaryStorage_methods(StorageFixture, unittest.TestCase):
+    """Unittests for BinaryStorage class methods."""
+    engine = "binary"
+
+    def test_save_reload(self):
+        place = Place()
+        place.name = "Loft"
+        place.number_rooms = 3
+        place.latitude = 37.77
+        place.amenity_ids = ["a", "b"]
+        self.storage.save()
+        loaded = self.reopen().get(Place, place.id)
+        self.assertEqual(place.to_dict(), loaded.to_dict())
+        self.assertEqual(place.created_at, loaded.created_at)
+
+    def test_reload_no_file(self):
+        self.storage.reload()
+        self.assertEqual(0, self.storage.count())
+
+    def test_reload_bad_file(self):
+        with open("file.bin", "wb") as f:
+            f.write(b"{}")
+        with self.assertRaises(ValueError):
+            self.reopen()
+
+    def test_reload_truncated_file(self):
+        User()
+        self.storage.save()
+        with open("file.bin", "rb+") as f:
+            f.truncate(os.path.getsize("file.bin") - 3)
+        with self.assertRaisesRegex(ValueError, "cannot reload file.bin"):
+            self.reopen()
+
+    def test_save_encodes_changed_objects_only(self):
+        user = User()
+        other = User()
+        self.storage.save()
+        storage = self.reopen()
+        storage.get(User, user.id).first_name = "Betty"
+        with patch.object(binary_format, "dumps",
+                          wraps=binary_format.dumps) as dumps:
+            storage.save()
+        self.assertEqual(1, dumps.call_count)
+        storage = self.reopen()
+        self.assertEqual("Betty", storage.get(User, user.id).first_name)
+        self.assertIsNotNone(storage.get(User, other.id))
+
+    def test_delete(self):
+        user = User()
+        self.storage.save()
+        storage = self.reopen()
+        storage.delete(storage.get(User, user.id))
+        storage.save()
+        self.assertEqual(0, self.reopen().count())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,331 @@
+#!/usr/bin/python3
+"""Defines the storage engine conformance suite, run against every engine
+of the registry in models/engine/__init__.py.
+
+Unittest classes:
+    **TestEngineRegistry
+    **TestFileStorage_conformance
+    **TestJournalStorage_conformance
+    **TestMmapStorage_conformance
+    **TestDBStorage_conformance
+    **TestMemoryStorage_conformance
+    **TestBinaryStorage_conformance
+"""
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from models import engine
+from models.engine.base_storage import BaseStorage
+from models.engine.file_storage import FileStorage
+from models.user import User
+from models.state import State
+from models.place import Place
+from tests.test_models.test_engine.storage_fixture import StorageFixture
+
+
+class StorageConformance(StorageFixture):
+    """The tests every storage engine must pass. Subclasses set 'engine' to
+    a registry name.
+    """
+
+    def test_is_BaseStorage(self):
+        self.assertIsInstance(self.storage, BaseStorage)
+
+    def test_reload_empty(self):
+        self.assertEqual({}, self.storage.all())
+        self.assertEqual(0, self.storage.count())
+
+    def test_new_get_all_count(self):
+        user = User()
+        state = State()
+        self.assertIs(user, self.storage.get(User, user.id))
+        self.assertIs(state, self.storage.get("State", state.id))
+        self.assertIsNone(self.storage.get(User, state.id))
+        self.assertEqual({"User." + user.id: user}, self.storage.all(User))
+        self.assertEqual(2, len(self.storage.all()))
+        self.assertEqual(1, self.storage.count("State"))
+        self.assertEqual(2, self.storage.count())
+
+    def test_delete(self):
+        user = User()
+        self.storage.delete(user)
+        self.storage.delete(user)
+        self.storage.delete(None)
+        self.assertIsNone(self.storage.get(User, user.id))
+        self.assertEqual(0, self.storage.count())
+
+    def test_save_reload(self):
+        user = User()
+        user.first_name = "Betty"
+        place = Place()
+        place.amenity_ids = ["wifi"]
+        self.storage.save()
+        storage = self.reopen()
+        self.assertEqual(user.to_dict(),
+                         storage.get(User, user.id).to_dict())
+        self.assertEqual(place.to_dict(),
+                         storage.get(Place, place.id).to_dict())
+        self.assertEqual(2, storage.count())
+
+    def test_save_changes(self):
+        user = User()
+        state = State()
+        self.storage.save()
+        user.first_name = "Betty"
+        self.storage.delete(state)
+        State()
+        self.storage.save()
+        storage = self.reopen()
+        self.assertEqual("Betty", storage.get(User, user.id).first_name)
+        self.assertIsNone(storage.get(State, state.id))
+        self.assertEqual(2, storage.count())
+
+    def test_save_after_reload(self):
+        user = User()
+        self.storage.save()
+        storage = self.reopen()
+        storage.get(User, user.id).last_name = "Holberton"
+        storage.save()
+        self.assertEqual("Holberton",
+                         self.reopen().get(User, user.id).last_name)
+
+    def test_model_save(self):
+        user = User()
+        user.save()
+        self.assertEqual(user.updated_at,
+                         self.reopen().get(User, user.id).updated_at)
+
+    def test_group_commit(self):
+        self.storage.group_ops = 2
+        User()
+        self.storage.request_save()
+        self.assertEqual(1, self.storage.pending_saves())
+        storage = self.reopen()
+        self.assertEqual(0, storage.count())
+        storage.group_ops = 2
+        User()
+        storage.request_save()
+        storage.request_save()
+        self.assertEqual(0, storage.pending_saves())
+        self.assertEqual(1, self.reopen().count())
+
+    def test_flush(self):
+        self.storage.group_window = 60.0
+        User()
+        self.storage.request_save()
+        self.storage.flush()
+        self.assertEqual(1, self.reopen().count())
+
+    def test_group_window_timer(self):
+        self.storage.group_window = 0.05
+        User()
+        self.storage.request_save()
+        self.assertEqual(1, self.storage.pending_saves())
+        deadline = time.monotonic() + 5.0
+        while self.storage.pending_saves() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(0, self.storage.pending_saves())
+        self.assertEqual(1, self.reopen().count())
+
+    def test_group_window_timer_with_changes(self):
+        saving = threading.Event()
+        events = []
+        save = self.storage.save
+
+        def slow_save():
+            saving.set()
+            time.sleep(0.05)
+            save()
+            events.append("saved")
+
+        with patch.object(self.storage, "save", side_effect=slow_save):
+            self.storage.group_window = 0.01
+            User()
+            self.storage.request_save()
+            self.assertTrue(saving.wait(5.0))
+            place = Place()
+            place.name = "Nice place"
+            events.append("changed")
+        self.assertEqual(["saved", "changed"], events)
+        self.assertEqual(0, self.storage.pending_saves())
+        self.storage.save()
+        self.assertEqual(2, self.reopen().count())
+
+    def test_failed_flush_keeps_requests(self):
+        self.storage.group_ops = 10
+        User()
+        self.storage.request_save()
+        with patch.object(self.storage, "save", side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.storage.flush()
+        self.assertEqual(1, self.storage.pending_saves())
+        self.storage.flush()
+        self.assertEqual(1, self.reopen().count())
+
+    def test_commit(self):
+        user = User()
+        self.storage.save()
+        self.storage.begin()
+        self.assertTrue(self.storage.in_transaction())
+        with patch.object(self.storage, "save") as save:
+            user.first_name = "Betty"
+            user.save()
+            place = Place()
+            place.save()
+            self.storage.flush()
+        save.assert_not_called()
+        self.assertEqual(2, self.storage.pending_saves())
+        self.storage.commit()
+        self.assertFalse(self.storage.in_transaction())
+        self.assertEqual(0, self.storage.pending_saves())
+        storage = self.reopen()
+        self.assertEqual("Betty", storage.get(User, user.id).first_name)
+        self.assertIsNotNone(storage.get(Place, place.id))
+
+    def test_failed_commit(self):
+        user = User()
+        user.first_name = "Betty"
+        self.storage.save()
+        self.storage.begin()
+        user.first_name = "Holberton"
+        place = Place()
+        with patch.object(self.storage, "save", side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.storage.commit()
+        self.assertTrue(self.storage.in_transaction())
+        self.storage.rollback()
+        self.assertEqual("Betty", user.first_name)
+        self.assertIsNone(self.storage.get(Place, place.id))
+        self.storage.begin()
+        user.first_name = "Holberton"
+        self.storage.commit()
+        self.assertEqual("Holberton",
+                         self.reopen().get(User, user.id).first_name)
+
+    def test_rollback(self):
+        user = User()
+        user.first_name = "Betty"
+        state = State()
+        self.storage.save()
+        self.storage.begin()
+        user.first_name = "Holberton"
+        user.last_name = "School"
+        del user.first_name
+        self.storage.delete(state)
+        place = Place()
+        place.city_id = "1"
+        self.storage.request_save()
+        self.storage.rollback()
+        self.assertFalse(self.storage.in_transaction())
+        self.assertEqual(0, self.storage.pending_saves())
+        self.assertEqual("Betty", user.first_name)
+        self.assertNotIn("last_name", user.attributes())
+        self.assertIs(state, self.storage.get(State, state.id))
+        self.assertIsNone(self.storage.get(Place, place.id))
+        self.assertEqual([], self.storage.find(Place, city_id="1"))
+        self.storage.save()
+        storage = self.reopen()
+        self.assertEqual(user.to_dict(),
+                         storage.get(User, user.id).to_dict())
+        self.assertIsNotNone(storage.get(State, state.id))
+        self.assertEqual(2, storage.count())
+
+    def test_rollback_new_from_dictionary(self):
+        user = User()
+        user.first_name = "Betty"
+        self.storage.save()
+        self.storage.begin()
+        kwargs = dict(user.to_dict(), id="1234")
+        added = User(**kwargs)
+        self.storage.new(added)
+        replacement = User(**user.to_dict())
+        replacement.first_name = "Holberton"
+        self.storage.new(replacement)
+        self.storage.rollback()
+        self.assertIsNone(self.storage.get(User, added.id))
+        self.assertIs(user, self.storage.get(User, user.id))
+        self.assertEqual("Betty", user.first_name)
+        self.storage.save()
+        storage = self.reopen()
+        self.assertEqual(1, storage.count())
+        self.assertEqual("Betty", storage.get(User, user.id).first_name)
+
+    def test_transaction_errors(self):
+        with self.assertRaises(ValueError):
+            self.storage.commit()
+        with self.assertRaises(ValueError):
+            self.storage.rollback()
+        self.storage.begin()
+        with self.assertRaises(ValueError):
+            self.storage.begin()
+        self.storage.rollback()
+
+    def test_indexes_after_reload(self):
+        place = Place()
+        place.city_id = "1"
+        place.price_by_night = 80
+        self.storage.save()
+        storage = self.reopen()
+        self.assertEqual([place.id],
+                         [obj.id for obj in storage.find(Place, city_id="1")])
+        self.assertEqual([place.id], [obj.id for obj in storage.query(
+            Place).where("price_by_night", "<", 100).all()])
+
+
+class TestEngineRegistry(unittest.TestCase):
+    """Unittests for the storage engine registry."""
+
+    def test_every_engine_is_tested(self):
+        tested = {cls.engine for cls in StorageConformance.__subclasses__()}
+        self.assertEqual(set(engine.engines), tested)
+
+    def test_get_engine(self):
+        self.assertIs(FileStorage, engine.get_engine("file"))
+        for name in engine.engines:
+            self.assertTrue(issubclass(engine.get_engine(name), BaseStorage))
+
+    def test_get_engine_unknown(self):
+        with self.assertRaises(ValueError):
+            engine.get_engine("tape")
+
+    def test_register(self):
+        engine.register("test", "models.engine.file_storage.FileStorage")
+        try:
+            self.assertEqual(FileStorage, type(engine.create("test")))
+        finally:
+            del engine.engines["test"]
+
+
+class TestFileStorage_conformance(StorageConformance, unittest.TestCase):
+    """Runs the conformance suite against FileStorage."""
+    engine = "file"
+
+
+class TestJournalStorage_conformance(StorageConformance, unittest.TestCase):
+    """Runs the conformance suite against JournalStorage."""
+    engine = "journal"
+
+
+class TestMmapStorage_conformance(StorageConformance, unittest.TestCase):
+    """Runs the conformance suite against MmapStorage."""
+    engine = "mmap"
+
+
+class TestDBStorage_conformance(StorageConformance, unittest.TestCase):
+    """Runs the conformance suite against DBStorage."""
+    engine = "db"
+
+
+class TestMemoryStorage_conformance(StorageConformance, unittest.TestCase):
+    """Runs the conformance suite against MemoryStorage."""
+    engine = "memory"
+
+
+class TestBinaryStorage_conformance(StorageConformance, unittest.TestCase):
+    """Runs the conformance suite against BinaryStorage."""
+    engine = "binary"
+
+
+if __name__ == "__main__":
+    unittest.main()
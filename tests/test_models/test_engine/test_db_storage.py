@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/db_storage.py.
+
+Unittest classes:
+    **TestDBStorage_instantiation
+    **TestDBStorage_methods
+"""
+import json
+import sqlite3
+import unittest
+from unittest.mock import patch
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.user import User
+from models.state import State
+from models.place import Place
+from tests.test_models.test_engine.storage_fixture import StorageFixture
+
+
+class TestDBStorage_instantiation(unittest.TestCase):
+    """Unittests for DBStorage class instantiation."""
+
+    def test_DBStorage_instantiation_no_args(self):
+        """Tests creating DBStorage instance with no arguments."""
+        self.assertEqual(type(DBStorage()), DBStorage)
+
+    def test_DBStorage_instantiation_with_arg(self):
+        """Tests creating DBStorage instance with argument (raises
+        TypeError).
+        """
+        with self.assertRaises(TypeError):
+            DBStorage(None)
+
+    def test_DBStorage_is_FileStorage(self):
+        """Verifies DBStorage keeps the FileStorage interface."""
+        self.assertTrue(issubclass(DBStorage, FileStorage))
+
+    def test_db_path_is_private_str(self):
+        """Verifies '__db_path' attribute is a private string."""
+        self.assertEqual(str, type(DBStorage._DBStorage__db_path))
+
+
+class TestDBStorage_methods(StorageFixture, unittest.TestCase):
+    """Unittests for DBStorage class methods."""
+    engine = "db"
+
+    def read_rows(self, table):
+        """Returns the rows of a table."""
+        connection = sqlite3.connect("file.sqlite")
+        try:
+            return connection.execute(
+                'SELECT * FROM "{}"'.format(table)).fetchall()
+        finally:
+            connection.close()
+
+    def test_save_writes_rows(self):
+        """Tests that 'save' writes one row per object to its class table."""
+        user = User()
+        user.first_name = "Betty"
+        State()
+        self.storage.save()
+        rows = self.read_rows("User")
+        self.assertEqual(1, len(rows))
+        self.assertEqual((user.id, user.created_at.isoformat(),
+                          user.updated_at.isoformat()), rows[0][:3])
+        self.assertEqual({"first_name": "Betty"}, json.loads(rows[0][3]))
+        self.assertEqual(1, len(self.read_rows("State")))
+
+    def test_save_only_changed_objects(self):
+        """Tests that unchanged objects are not written again."""
+        user = User()
+        State()
+        self.storage.save()
+        user.first_name = "Betty"
+        with patch.object(State, "to_dict", side_effect=AssertionError):
+            self.storage.save()
+        self.assertEqual("Betty", self.reopen().get(User, user.id).first_name)
+
+    def test_reload(self):
+        """Tests that 'reload' rebuilds objects and their indexes."""
+        user = User()
+        place = Place()
+        place.city_id = "1"
+        place.amenity_ids = ["wifi"]
+        self.storage.save()
+        storage = self.reopen()
+        self.assertEqual(user.to_dict(), storage.get(User, user.id).to_dict())
+        self.assertEqual(place.to_dict(),
+                         storage.find(Place, city_id="1")[0].to_dict())
+        self.assertEqual(2, storage.count())
+
+    def test_reload_then_save_writes_nothing(self):
+        """Tests that a reloaded store is considered already saved."""
+        User()
+        self.storage.save()
+        storage = self.reopen()
+        with patch.object(User, "to_dict", side_effect=AssertionError):
+            storage.save()
+
+    def test_delete(self):
+        """Tests that a removed object's row is deleted on save."""
+        state = State()
+        self.storage.save()
+        self.storage.delete(state)
+        self.storage.save()
+        self.assertEqual([], self.read_rows("State"))
+        self.assertIsNone(self.reopen().get(State, state.id))
+
+    def test_delete_none(self):
+        """Tests that deleting None does nothing."""
+        self.storage.new(User())
+        self.storage.delete(None)
+        self.assertEqual(1, len(self.storage.all()))
+
+    def test_close(self):
+        """Tests that the engine reopens the database after 'close'."""
+        User()
+        self.storage.save()
+        self.storage.close()
+        State()
+        self.storage.save()
+        self.assertEqual(1, len(self.read_rows("State")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,8 +10,11 @@ import json
 import models
 import unittest
 from datetime import datetime
+from unittest.mock import patch
 from models.base_model import BaseModel
-from models.engine.file_storage import FileStorage
+from models.engine.file_storage import (FileStorage, append_write,
+                                        atomic_write)
+from models.engine.index import TextIndex
 from models.user import User
 from models.place import Place
 from models.city import City
@@ -64,6 +67,10 @@ class TestFileStorage_methods(unittest.TestCase):
             os.remove("file.json")
         except IOError:
             pass
+        try:
+            os.remove("file.json.text")
+        except IOError:
+            pass
         try:
             os.rename("tmp", "file.json")
         except IOError:
@@ -74,10 +81,42 @@ class TestFileStorage_methods(unittest.TestCase):
         """Tests 'all' method to return all objects as a dictionary."""
         self.assertEqual(dict, type(models.storage.all()))
 
-    def test_all_with_arg(self):
-        """Tests 'all' method with argument (raises TypeError)."""
-        with self.assertRaises(TypeError):
-            models.storage.all(None)
+    def test_all_with_None(self):
+        """Tests 'all' method with None (returns all objects)."""
+        self.assertIs(models.storage.all(), models.storage.all(None))
+
+    def test_all_with_cls(self):
+        """Tests 'all' method restricted to one class."""
+        user = User()
+        state = State()
+        self.assertEqual({"User." + user.id: user}, models.storage.all(User))
+        self.assertEqual({"State." + state.id: state},
+                         models.storage.all("State"))
+        self.assertEqual({}, models.storage.all(City))
+
+    def test_all_with_cls_after_delete(self):
+        """Tests that deleted objects leave their class partition."""
+        user = User()
+        models.storage.delete(user)
+        self.assertEqual({}, models.storage.all(User))
+
+    def test_all_with_cls_after_objects_reset(self):
+        """Tests that partitions follow a replaced '__objects' dictionary."""
+        User()
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual({}, models.storage.all(User))
+        user = User()
+        self.assertEqual({"User." + user.id: user}, models.storage.all(User))
+
+    def test_count(self):
+        """Tests 'count' method for all objects and for one class."""
+        User()
+        User()
+        State()
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual(2, models.storage.count(User))
+        self.assertEqual(1, models.storage.count("State"))
+        self.assertEqual(0, models.storage.count("MyModel"))
 
     def test_new(self):
         """Tests 'new' method to add objects to storage."""
@@ -111,6 +150,307 @@ class TestFileStorage_methods(unittest.TestCase):
         self.assertIn("Review." + review.id, models.storage.all().keys())
         self.assertIn(review, models.storage.all().values())
 
+    def test_new_key_is_class_and_id(self):
+        """Tests that 'new' keys objects by "<class name>.<id>" only."""
+        user = User()
+        user.first_name = "Betty"
+        models.storage.new(user)
+        self.assertEqual(["User." + user.id],
+                         list(models.storage.all().keys()))
+
+    def test_get(self):
+        """Tests 'get' method to fetch an object by class and id."""
+        user = User()
+        state = State()
+        self.assertIs(user, models.storage.get(User, user.id))
+        self.assertIs(state, models.storage.get("State", state.id))
+
+    def test_get_missing(self):
+        """Tests 'get' method with an unknown id or wrong class."""
+        user = User()
+        self.assertIsNone(models.storage.get(User, "1234"))
+        self.assertIsNone(models.storage.get(State, user.id))
+
+    def test_find(self):
+        """Tests 'find' method on an indexed attribute."""
+        city1 = City()
+        city1.state_id = "CA"
+        city2 = City()
+        city2.state_id = "CA"
+        city3 = City()
+        city3.state_id = "NY"
+        self.assertCountEqual([city1, city2],
+                              models.storage.find(City, state_id="CA"))
+        self.assertEqual([city3], models.storage.find("City", state_id="NY"))
+        self.assertEqual([], models.storage.find(City, state_id="TX"))
+
+    def test_find_uses_index(self):
+        """Tests that 'new' and attribute changes fill the index."""
+        city = City()
+        city.state_id = "CA"
+        other = City()
+        other.state_id = "NY"
+        index = FileStorage._FileStorage__indexes["City"]["state_id"]
+        self.assertEqual({"City." + city.id: city}, index.lookup("CA"))
+
+    def test_find_after_update(self):
+        """Tests that indexes follow attribute changes and deletes."""
+        review = Review()
+        review.place_id = "1"
+        review.place_id = "2"
+        self.assertEqual([], models.storage.find(Review, place_id="1"))
+        self.assertEqual([review], models.storage.find(Review, place_id="2"))
+        models.storage.delete(review)
+        self.assertEqual([], models.storage.find(Review, place_id="2"))
+
+    def test_find_after_reload(self):
+        """Tests that reloaded objects are indexed."""
+        place = Place()
+        place.city_id = "1"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual([place.id], [obj.id for obj in
+                                      models.storage.find(Place,
+                                                          city_id="1")])
+
+    def test_find_several_attributes(self):
+        """Tests 'find' with indexed and unindexed attributes."""
+        place1 = Place()
+        place1.city_id = "1"
+        place1.name = "Loft"
+        place2 = Place()
+        place2.city_id = "1"
+        self.assertEqual([place1],
+                         models.storage.find(Place, city_id="1", name="Loft"))
+
+    def test_find_unindexed_attribute(self):
+        """Tests 'find' on an attribute without an index."""
+        state = State()
+        state.name = "California"
+        State()
+        self.assertEqual([state],
+                         models.storage.find(State, name="California"))
+
+    def test_having(self):
+        """Tests 'having' on the amenity index, following updates."""
+        place1 = Place()
+        place1.amenity_ids = ["wifi", "pool"]
+        place2 = Place()
+        place2.amenity_ids = ["wifi"]
+        Place()
+        self.assertEqual([place1], models.storage.having(
+            Place, "amenity_ids", ["pool", "wifi"]))
+        self.assertCountEqual([place1, place2], models.storage.having(
+            "Place", "amenity_ids", ["pool", "wifi"], match_any=True))
+        place2.amenity_ids = ["wifi", "pool"]
+        models.storage.delete(place1)
+        self.assertEqual([place2], models.storage.having(
+            Place, "amenity_ids", ["pool", "wifi"]))
+
+    def test_having_answers_contains_queries(self):
+        """Tests that 'contains' conditions are answered by the index."""
+        place = Place()
+        place.amenity_ids = ["wifi"]
+        Place()
+        index = models.storage.index(Place, "amenity_ids")
+        self.assertEqual({"Place." + place.id: place},
+                         index.search("contains", "wifi"))
+        self.assertEqual([place], models.storage.query(Place).where(
+            "amenity_ids", "contains", "wifi").all())
+
+    def test_aggregate(self):
+        """Tests aggregates on the Place column table, following updates."""
+        for city_id, price in [("1", 100), ("1", 50), ("2", 80)]:
+            place = Place()
+            place.city_id = city_id
+            place.price_by_night = price
+        self.assertEqual({"1": 75.0, "2": 80.0}, models.storage.aggregate(
+            Place, "mean", "price_by_night", by="city_id"))
+        place.city_id = "1"
+        self.assertEqual({"1": 3}, models.storage.aggregate(
+            "Place", "count", by="city_id"))
+        models.storage.delete(place)
+        self.assertEqual(150.0, models.storage.aggregate(
+            Place, "sum", "price_by_night"))
+
+    def test_aggregate_without_table(self):
+        """Tests aggregates on attributes outside any column table."""
+        for name in ["Betty", "Betty", "John"]:
+            user = User()
+            user.first_name = name
+        user.age = 30
+        self.assertEqual({"Betty": 2, "John": 1}, models.storage.aggregate(
+            User, "count", by="first_name"))
+        self.assertEqual(1, models.storage.aggregate(User, "count", "age"))
+        self.assertEqual(3, models.storage.aggregate(User, "count"))
+
+    def test_table(self):
+        """Tests the column table declared by Place is kept up to date."""
+        place = Place()
+        place.price_by_night = 80
+        table = models.storage.table(Place, ["price_by_night"])
+        self.assertIs(table, models.storage.index(Place, Place.__columnar__))
+        self.assertEqual(80.0, table.row("Place." + place.id)[
+            "price_by_night"])
+        self.assertIsNot(table, models.storage.table(Place, ["name"]))
+
+    def test_having_without_index(self):
+        """Tests 'having' on a list attribute without an index."""
+        user = User()
+        user.tags = ["a", "b"]
+        User()
+        self.assertEqual([user],
+                         models.storage.having(User, "tags", ["b"]))
+
+    def test_search(self):
+        """Tests 'search' ranks objects by their searchable text."""
+        place1 = Place()
+        place1.name = "Loft"
+        place1.description = "Cozy loft downtown"
+        place2 = Place()
+        place2.description = "Cozy, cozy cabin"
+        review = Review()
+        review.text = "Cozy and clean"
+        self.assertEqual([place2, place1], [obj for _, obj in
+                                            models.storage.search(Place,
+                                                                  "cozy")])
+        self.assertEqual([review], [obj for _, obj in
+                                    models.storage.search("Review", "clean")])
+        place2.description = "Rustic cabin"
+        models.storage.delete(place1)
+        self.assertEqual([], models.storage.search(Place, "cozy"))
+        self.assertEqual([], models.storage.search(User, "cozy"))
+
+    def test_search_after_reload(self):
+        """Tests that saved term counts are reused by 'reload'."""
+        place1 = Place()
+        place1.description = "Cozy loft"
+        place2 = Place()
+        place2.description = "Seaside villa"
+        models.storage.save()
+        self.assertTrue(os.path.exists("file.json.text"))
+        with open("file.json", "r") as f:
+            text = f.read()
+        with open("file.json", "w") as f:
+            f.write(text.replace("Seaside villa", "Cozy villa"))
+        FileStorage._FileStorage__objects = {}
+        with patch.object(TextIndex, "tokenize",
+                          wraps=TextIndex.tokenize) as tokenize:
+            models.storage.reload()
+        self.assertEqual(2, tokenize.call_count)
+        self.assertCountEqual([place1.id, place2.id], [
+            obj.id for _, obj in models.storage.search(Place, "cozy")])
+
+    def test_search_after_reload_without_text_file(self):
+        """Tests that 'reload' rebuilds the text index when needed."""
+        place = Place()
+        place.description = "Cozy loft"
+        models.storage.save()
+        os.remove("file.json.text")
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual([place.id], [
+            obj.id for _, obj in models.storage.search(Place, "loft")])
+
+    def test_search_log_appends_changes(self):
+        """Tests that 'save' only appends changed term counts to the text
+        log, and that 'reload' replays them.
+        """
+        place1 = Place()
+        place1.description = "Cozy loft"
+        place2 = Place()
+        place2.description = "Seaside villa"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        with open("file.json.text", "r") as f:
+            saved = f.read()
+        models.storage.save()
+        with open("file.json.text", "r") as f:
+            self.assertEqual(saved, f.read())
+        models.storage.get(Place, place1.id).description = "Bright studio"
+        models.storage.delete(models.storage.get(Place, place2.id))
+        models.storage.save()
+        with open("file.json.text", "r") as f:
+            lines = f.read()[len(saved):].splitlines()
+        self.assertCountEqual(
+            [("Place." + place1.id, False), ("Place." + place2.id, True)],
+            [(key, entry is None) for name, key, entry
+             in map(json.loads, lines)])
+        FileStorage._FileStorage__objects = {}
+        with patch.object(TextIndex, "tokenize", side_effect=AssertionError):
+            models.storage.reload()
+        self.assertEqual([place1.id], [
+            obj.id for _, obj in models.storage.search(Place, "studio")])
+
+    def test_search_log_torn_line(self):
+        """Tests that 'reload' skips a damaged line of the text log."""
+        place = Place()
+        place.description = "Cozy loft"
+        models.storage.save()
+        with open("file.json.text", "a") as f:
+            f.write('["Place", "Place.1", [12')
+        FileStorage._FileStorage__objects = {}
+        with patch.object(TextIndex, "tokenize", side_effect=AssertionError):
+            models.storage.reload()
+        self.assertEqual([place.id], [
+            obj.id for _, obj in models.storage.search(Place, "loft")])
+
+    def test_search_log_compaction(self):
+        """Tests that the text log is rewritten once it outgrows its live
+        entries.
+        """
+        place = Place()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        place = models.storage.get(Place, place.id)
+        for i in range(100):
+            place.description = "Loft {}".format(i)
+            models.storage.save()
+        with open("file.json.text", "r") as f:
+            self.assertLess(len(f.readlines()), 70)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual([place.id], [
+            obj.id for _, obj in models.storage.search(Place, "99")])
+
+    def test_within(self):
+        """Tests 'within' on the spatial index, following updates."""
+        place1 = Place()
+        place1.latitude, place1.longitude = 37.7749, -122.4194
+        place2 = Place()
+        place2.latitude, place2.longitude = 40.7128, -74.0060
+        self.assertEqual([place1], models.storage.within(Place, 37, -123,
+                                                         38, -122))
+        place2.latitude, place2.longitude = 37.8044, -122.2712
+        self.assertCountEqual([place1, place2],
+                              models.storage.within("Place", 37, -123,
+                                                    38, -122))
+        models.storage.delete(place1)
+        self.assertEqual([place2], models.storage.within(Place, 37, -123,
+                                                         38, -122))
+
+    def test_near(self):
+        """Tests 'near' returns objects in range, nearest first."""
+        far = Place()
+        far.latitude, far.longitude = 37.8044, -122.2712
+        close = Place()
+        close.latitude, close.longitude = 37.7800, -122.4100
+        Place().latitude = 40.7128
+        found = models.storage.near(Place, 37.7749, -122.4194, 20)
+        self.assertEqual([close, far], [obj for _, obj in found])
+        self.assertLess(found[0][0], 2)
+
+    def test_near_without_spatial_index(self):
+        """Tests 'near' on a class that declares no spatial index."""
+        user = User()
+        user.latitude, user.longitude = 10.0, 10.0
+        User()
+        self.assertEqual([user], [obj for _, obj in
+                                  models.storage.near(User, 10, 10, 1)])
+
     def test_new_with_args(self):
         """Tests 'new' method with unexpected arguments (raises TypeError)."""
         with self.assertRaises(TypeError):
@@ -176,6 +516,273 @@ class TestFileStorage_methods(unittest.TestCase):
         self.assertIn("Amenity." + amenity.id, objs)
         self.assertIn("Review." + review.id, objs)
 
+    def test_lazy_reload_defers_building(self):
+        """Tests that a lazy 'reload' builds objects on first access."""
+        user = User()
+        place = Place()
+        place.city_id = "1"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        with patch.object(models.storage, "lazy", True):
+            models.storage.reload()
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual(2, models.storage.count())
+        self.assertEqual(1, models.storage.count(Place))
+        self.assertEqual(user.id, models.storage.get(User, user.id).id)
+        self.assertEqual(["User." + user.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertEqual([place.id], [obj.id for obj in
+                                      models.storage.find(Place,
+                                                          city_id="1")])
+        self.assertEqual(2, len(models.storage.all()))
+
+    def test_lazy_reload_save(self):
+        """Tests that objects not built yet are saved as they were read."""
+        user = User()
+        state = State()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        with patch.object(models.storage, "lazy", True):
+            models.storage.reload()
+        models.storage.get(State, state.id).name = "Nevada"
+        with patch.object(User, "to_dict", side_effect=AssertionError):
+            models.storage.save()
+        self.assertNotIn("User." + user.id, FileStorage._FileStorage__objects)
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        self.assertEqual(user.to_dict(), saved["User." + user.id])
+        self.assertEqual("Nevada", saved["State." + state.id]["name"])
+
+    def test_lazy_reload_search(self):
+        """Tests that saved term counts survive a lazy reload and save."""
+        place = Place()
+        place.description = "Cozy loft"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        with patch.object(models.storage, "lazy", True):
+            models.storage.reload()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        with patch.object(models.storage, "lazy", True):
+            models.storage.reload()
+        with patch.object(TextIndex, "tokenize", side_effect=AssertionError):
+            models.storage.all(Place)
+        self.assertEqual([place.id], [
+            obj.id for _, obj in models.storage.search(Place, "cozy")])
+
+    def test_lazy_reload_replaces_stored_objects(self):
+        """Tests that a lazy 'reload' replaces objects already stored."""
+        user = User()
+        models.storage.save()
+        user.first_name = "Betty"
+        with patch.object(models.storage, "lazy", True):
+            models.storage.reload()
+        self.assertEqual(1, models.storage.count())
+        self.assertEqual("", models.storage.get(User, user.id).first_name)
+
+    def test_lazy_reload_legacy_keys(self):
+        """Tests that a lazy 'reload' keys objects by class and id, like an
+        eager one, whatever key the file holds them under.
+        """
+        user = User()
+        with open("file.json", "w") as f:
+            json.dump({"User.[User] ({}) {{}}".format(user.id):
+                       user.to_dict()}, f)
+        FileStorage._FileStorage__objects = {}
+        with patch.object(models.storage, "lazy", True):
+            models.storage.reload()
+        self.assertEqual(1, models.storage.count(User))
+        self.assertEqual(user.id, models.storage.get(User, user.id).id)
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual(["User." + user.id], list(json.load(f)))
+
+    def test_lazy_rollback_new(self):
+        """Tests that a rollback restores a pending object replaced by
+        'new' in the transaction.
+        """
+        user = User()
+        user.first_name = "Betty"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        with patch.object(models.storage, "lazy", True):
+            models.storage.reload()
+        models.storage.begin()
+        models.storage.new(User(**dict(user.to_dict(), first_name="Bob")))
+        models.storage.rollback()
+        self.assertEqual("Betty",
+                         models.storage.get(User, user.id).first_name)
+
+    def test_lazy_reload_unknown_class(self):
+        """Tests that a lazy 'reload' rejects unknown classes like an eager
+        one, rather than dropping them on the next save.
+        """
+        with open("file.json", "w") as f:
+            f.write('{"Ship.1": {"__class__": "Ship", "id": "1"}}')
+        with patch.object(models.storage, "lazy", True):
+            with self.assertRaises(ValueError):
+                models.storage.reload()
+
+    def test_save_skips_clean_objects(self):
+        """Tests that 'save' only calls 'to_dict' on changed objects."""
+        user = User()
+        state = State()
+        models.storage.save()
+        user.first_name = "Betty"
+        with patch.object(State, "to_dict", side_effect=AssertionError):
+            models.storage.save()
+        with open("file.json", "r") as f:
+            save_text = f.read()
+            self.assertIn('"first_name": "Betty"', save_text)
+            self.assertIn(state.id, save_text)
+
+    def test_save_after_reload_skips_clean_objects(self):
+        """Tests that reloaded objects are not serialized again."""
+        State()
+        models.storage.save()
+        models.storage.reload()
+        with patch.object(State, "to_dict", side_effect=AssertionError):
+            models.storage.save()
+
+    def test_cache_stats(self):
+        """Tests that 'save' counts cache hits and misses."""
+        stats = models.storage.cache_stats()
+        user = User()
+        State()
+        models.storage.save()
+        models.storage.save()
+        user.first_name = "Betty"
+        models.storage.save()
+        new_stats = models.storage.cache_stats()
+        self.assertEqual(stats["misses"] + 3, new_stats["misses"])
+        self.assertEqual(stats["hits"] + 3, new_stats["hits"])
+        self.assertEqual(2, new_stats["size"])
+
+    def test_save_output_is_json(self):
+        """Tests that cached entries still form a valid JSON file."""
+        user = User()
+        models.storage.save()
+        user.first_name = "Betty"
+        models.storage.save()
+        with open("file.json", "r") as f:
+            objs = json.load(f)
+        self.assertEqual(1, len(objs))
+        self.assertEqual("Betty", list(objs.values())[0]["first_name"])
+
+    def test_reload_fills_cache(self):
+        """Tests that 'reload' caches the JSON text of loaded objects."""
+        User()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        stats = models.storage.cache_stats()
+        models.storage.save()
+        self.assertEqual(stats["hits"] + 1,
+                         models.storage.cache_stats()["hits"])
+
+    def test_cache_stats_with_arg(self):
+        """Tests 'cache_stats' method with argument (raises TypeError)."""
+        with self.assertRaises(TypeError):
+            models.storage.cache_stats(None)
+
+    def test_delete(self):
+        """Tests 'delete' method to remove an object from storage."""
+        user = User()
+        models.storage.delete(user)
+        self.assertNotIn(user, models.storage.all().values())
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertNotIn(user.id, f.read())
+
+    def test_delete_unstored(self):
+        """Tests 'delete' leaves a different object with the same key."""
+        user = User()
+        copy = User(**user.to_dict())
+        models.storage.delete(copy)
+        self.assertIs(user, models.storage.get(User, user.id))
+
+    def test_delete_none(self):
+        """Tests 'delete' method with None (does nothing)."""
+        user = User()
+        models.storage.delete(None)
+        self.assertIn(user, models.storage.all().values())
+
+    def test_save_is_atomic(self):
+        """Tests that a failed save leaves 'file.json' as it was."""
+        user = User()
+        models.storage.save()
+        with open("file.json", "r") as f:
+            saved = f.read()
+        user.first_name = "Betty"
+        with patch("os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual(saved, f.read())
+        self.assertFalse(os.path.exists("file.json.tmp"))
+
+    def test_save_fsync_policies(self):
+        """Tests the number of fsync calls a save makes per policy."""
+        User()
+        for policy, calls in [("none", 0), ("file", 1), ("dir", 2)]:
+            with patch.object(models.storage, "fsync", policy), \
+                    patch("os.fsync") as fsync:
+                models.storage.save()
+            self.assertEqual(calls, fsync.call_count)
+
+    def test_atomic_write_unknown_policy(self):
+        """Tests 'atomic_write' with an unknown fsync policy."""
+        with self.assertRaises(ValueError):
+            atomic_write("file.json", "{}", "always")
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_atomic_write_bytes(self):
+        """Tests 'atomic_write' with bytes and the 'dir' policy."""
+        atomic_write("file.json", b"{}", "dir")
+        with open("file.json", "rb") as f:
+            self.assertEqual(b"{}", f.read())
+
+    def test_fsync_policy_validation(self):
+        """Tests that an unknown fsync policy is rejected on assignment."""
+        storage = FileStorage()
+        storage.fsync = "dir"
+        self.assertEqual("dir", storage.fsync)
+        with self.assertRaises(ValueError):
+            storage.fsync = "always"
+        self.assertEqual("dir", storage.fsync)
+        del storage.fsync
+        self.assertEqual("none", storage.fsync)
+
+    def test_append_write_fsync_policies(self):
+        """Tests 'append_write' and the fsync calls it makes per policy."""
+        for policy, calls in [("none", 0), ("file", 1), ("dir", 1)]:
+            with patch("os.fsync") as fsync:
+                append_write("file.json", b"{}", policy)
+            self.assertEqual(calls, fsync.call_count)
+        os.remove("file.json")
+        with patch("os.fsync") as fsync:
+            append_write("file.json", "{}", "dir")
+        self.assertEqual(2, fsync.call_count)
+        with open("file.json", "r") as f:
+            self.assertEqual("{}", f.read())
+        with self.assertRaises(ValueError):
+            append_write("file.json", "{}", "always")
+
+    def test_reload_missing_file(self):
+        """Tests that 'reload' without 'file.json' loads nothing."""
+        models.storage.reload()
+        self.assertEqual({}, models.storage.all())
+
+    def test_reload_corrupt_file(self):
+        """Tests that 'reload' reports a damaged 'file.json'."""
+        for text in ["", '{"User.1": {"__class__": "User", "id": "1"',
+                     '{"Ship.1": {"__class__": "Ship", "id": "1"}}',
+                     '{"User.1": {"__class__": "User", "created_at": 1}}']:
+            with open("file.json", "w") as f:
+                f.write(text)
+            with self.assertRaises(ValueError):
+                models.storage.reload()
+
     def test_reload_with_arg(self):
         """Tests 'reload' method with argument (raises TypeError)."""
         with self.assertRaises(TypeError):
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/incremental_storage.py.
+
+Unittest classes:
+    **TestIncrementalStorage
+"""
+import unittest
+import models
+from models.engine.file_storage import FileStorage
+from models.engine.incremental_storage import IncrementalStorage
+from models.user import User
+
+
+class RecordingStorage(IncrementalStorage):
+    """An engine recording the changes it is asked to write."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+        self.failures = 0
+
+    def write_changes(self, changed, deleted):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("write failed")
+        self.writes.append((set(changed), set(deleted)))
+
+    def reload(self):
+        pass
+
+
+class TestIncrementalStorage(unittest.TestCase):
+    """Unittests for the change tracking of IncrementalStorage."""
+
+    def setUp(self):
+        """Installs a fresh engine as 'models.storage'."""
+        self.saved_storage = models.storage
+        FileStorage._FileStorage__objects = {}
+        self.storage = RecordingStorage()
+        models.storage = self.storage
+
+    def tearDown(self):
+        """Restores the previous engine and clears objects."""
+        FileStorage._FileStorage__objects = {}
+        models.storage = self.saved_storage
+
+    def test_is_abstract(self):
+        with self.assertRaises(TypeError):
+            IncrementalStorage()
+
+    def test_new_and_change(self):
+        user = User()
+        self.storage.save()
+        user.first_name = "Betty"
+        self.storage.save()
+        self.storage.save()
+        self.assertEqual([({user}, set()), ({user}, set()), (set(), set())],
+                         self.storage.writes)
+
+    def test_delete(self):
+        user = User()
+        other = User()
+        self.storage.save()
+        self.storage.delete(user)
+        self.storage.delete(user)
+        self.storage.delete(None)
+        self.storage.save()
+        self.assertEqual((set(), {("User", user.id)}),
+                         self.storage.writes[-1])
+        self.storage.delete(other)
+        other.first_name = "Betty"
+        self.storage.save()
+        self.assertEqual((set(), {("User", other.id)}),
+                         self.storage.writes[-1])
+
+    def test_delete_and_add_again(self):
+        user = User()
+        self.storage.save()
+        self.storage.delete(user)
+        self.storage.new(user)
+        self.storage.save()
+        self.assertEqual(({user}, {("User", user.id)}),
+                         self.storage.writes[-1])
+
+    def test_mark_clean_and_clear_changes(self):
+        user = User()
+        self.storage.mark_clean(user, None)
+        other = User()
+        self.storage.delete(other)
+        self.storage.save()
+        self.assertEqual((set(), {("User", other.id)}),
+                         self.storage.writes[-1])
+        User()
+        self.storage.delete(User())
+        self.storage.clear_changes()
+        self.storage.save()
+        self.assertEqual((set(), set()), self.storage.writes[-1])
+
+    def test_failed_write_keeps_changes(self):
+        user = User()
+        other = User()
+        self.storage.save()
+        user.first_name = "Betty"
+        self.storage.delete(other)
+        self.storage.failures = 1
+        with self.assertRaises(OSError):
+            self.storage.save()
+        self.storage.save()
+        self.assertEqual(({user}, {("User", other.id)}),
+                         self.storage.writes[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
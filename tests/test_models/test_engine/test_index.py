@@ -0,0 +1,548 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/index.py.
+
+Unittest classes:
+    **TestHashIndex
+    **TestSortedIndex
+    **TestGridIndex
+    **TestInvertedIndex
+    **TestTextIndex
+    **TestColumnTable
+"""
+import unittest
+import unittest.mock
+from models.engine.index import ColumnTable, GridIndex, HashIndex, \
+    InvertedIndex, SortedIndex, TextIndex, distance
+
+
+class Record:
+    """A plain object with attributes to index."""
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class TestHashIndex(unittest.TestCase):
+    """Unittests for the HashIndex class."""
+
+    def setUp(self):
+        self.index = HashIndex("state_id")
+        self.ca = Record(state_id="CA")
+        self.ny = Record(state_id="NY")
+        self.index.add("City.1", self.ca)
+        self.index.add("City.2", self.ny)
+
+    def test_attr(self):
+        self.assertEqual("state_id", self.index.attr)
+
+    def test_lookup(self):
+        self.assertEqual({"City.1": self.ca}, self.index.lookup("CA"))
+
+    def test_lookup_missing_value(self):
+        self.assertEqual({}, self.index.lookup("TX"))
+
+    def test_lookup_unhashable_value(self):
+        self.assertEqual({}, self.index.lookup(["CA"]))
+
+    def test_lookup_returns_copy(self):
+        self.index.lookup("CA").clear()
+        self.assertEqual({"City.1": self.ca}, self.index.lookup("CA"))
+
+    def test_add_missing_attribute(self):
+        other = Record()
+        self.index.add("City.3", other)
+        self.assertEqual({"City.3": other}, self.index.lookup(None))
+
+    def test_add_replaces_key(self):
+        self.index.add("City.1", self.ny)
+        self.assertEqual({}, self.index.lookup("CA"))
+        self.assertEqual(2, len(self.index.lookup("NY")))
+        self.assertEqual(2, len(self.index))
+
+    def test_update(self):
+        self.ca.state_id = "NV"
+        self.index.update("City.1", self.ca)
+        self.assertEqual({}, self.index.lookup("CA"))
+        self.assertEqual({"City.1": self.ca}, self.index.lookup("NV"))
+
+    def test_remove(self):
+        self.index.remove("City.1")
+        self.assertEqual({}, self.index.lookup("CA"))
+        self.assertEqual(1, len(self.index))
+
+    def test_remove_missing_key(self):
+        self.index.remove("City.3")
+        self.assertEqual(2, len(self.index))
+
+    def test_unhashable_value(self):
+        other = Record(state_id=["CA"])
+        self.index.add("City.3", other)
+        self.assertEqual({"City.3": other}, self.index.lookup(["CA"]))
+        self.assertEqual(3, len(self.index))
+        self.index.remove("City.3")
+        self.assertEqual({}, self.index.lookup(["CA"]))
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Unittests for the SortedIndex class."""
+
+    def setUp(self):
+        self.index = SortedIndex("price_by_night")
+        self.records = {}
+        for key, price in (("Place.1", 120), ("Place.2", 80),
+                           ("Place.3", 300), ("Place.4", 80),
+                           ("Place.5", 50)):
+            self.records[key] = Record(price_by_night=price)
+            self.index.add(key, self.records[key])
+
+    def prices(self, objs):
+        return [obj.price_by_night for obj in objs]
+
+    def test_attr(self):
+        self.assertEqual("price_by_night", self.index.attr)
+
+    def test_is_number(self):
+        self.assertTrue(SortedIndex.is_number(1))
+        self.assertTrue(SortedIndex.is_number(1.5))
+        self.assertFalse(SortedIndex.is_number("1"))
+        self.assertFalse(SortedIndex.is_number(None))
+        self.assertFalse(SortedIndex.is_number(float("nan")))
+
+    def test_range_all(self):
+        self.assertEqual([50, 80, 80, 120, 300],
+                         self.prices(self.index.range()))
+
+    def test_range_reverse(self):
+        self.assertEqual([300, 120, 80, 80, 50],
+                         self.prices(self.index.range(reverse=True)))
+
+    def test_range_bounds(self):
+        self.assertEqual([80, 80, 120],
+                         self.prices(self.index.range(80, 120)))
+        self.assertEqual([120],
+                         self.prices(self.index.range(80, 120, False)))
+        self.assertEqual([80, 80],
+                         self.prices(self.index.range(80, 120, True, False)))
+        self.assertEqual([120, 300], self.prices(self.index.range(100)))
+        self.assertEqual([50], self.prices(self.index.range(high=60)))
+        self.assertEqual([], self.prices(self.index.range(130, 100)))
+
+    def test_count_range(self):
+        self.assertEqual(5, self.index.count_range())
+        self.assertEqual(3, self.index.count_range(80, 120))
+        self.assertEqual(0, self.index.count_range(130, 100))
+
+    def test_search(self):
+        self.assertEqual(["Place.2", "Place.4"],
+                         sorted(self.index.search("==", 80)))
+        self.assertEqual(["Place.5"], list(self.index.search("<", 80)))
+        self.assertEqual(3, len(self.index.search("<=", 80)))
+        self.assertEqual(["Place.3"], list(self.index.search(">", 120)))
+        self.assertEqual(2, len(self.index.search(">=", 120)))
+        self.assertEqual(3, len(self.index.search("in", [50, 80, 7])))
+
+    def test_search_unanswerable(self):
+        self.assertIsNone(self.index.search("!=", 80))
+        self.assertIsNone(self.index.search("<", "80"))
+        self.assertIsNone(self.index.search("in", ["80"]))
+
+    def test_update(self):
+        self.records["Place.5"].price_by_night = 500
+        self.index.update("Place.5", self.records["Place.5"])
+        self.assertEqual([80, 80, 120, 300, 500],
+                         self.prices(self.index.range()))
+        self.assertEqual(5, len(self.index))
+
+    def test_remove(self):
+        self.index.remove("Place.2")
+        self.assertEqual([50, 80, 120, 300],
+                         self.prices(self.index.range()))
+        self.index.remove("Place.2")
+        self.assertEqual(4, len(self.index))
+
+    def test_not_a_number(self):
+        other = Record(price_by_night="cheap")
+        self.index.add("Place.6", other)
+        self.assertEqual(6, len(self.index))
+        self.assertIs(other, list(self.index.range())[-1])
+        self.assertIs(other, list(self.index.range(reverse=True))[-1])
+        self.assertNotIn(other, list(self.index.range(0)))
+        self.assertEqual(6, self.index.count_range())
+        self.index.remove("Place.6")
+        self.assertEqual(5, len(self.index))
+
+
+class TestGridIndex(unittest.TestCase):
+    """Unittests for the GridIndex class."""
+
+    def setUp(self):
+        self.index = GridIndex()
+        self.records = {}
+        for key, lat, lon in (("Place.sf", 37.7749, -122.4194),
+                              ("Place.oak", 37.8044, -122.2712),
+                              ("Place.sj", 37.3382, -121.8863),
+                              ("Place.nyc", 40.7128, -74.0060),
+                              ("Place.fiji", -17.7134, 179.9),
+                              ("Place.samoa", -13.7590, -172.1046)):
+            self.records[key] = Record(latitude=lat, longitude=lon)
+            self.index.add(key, self.records[key])
+
+    def keys(self, objs):
+        return sorted(key for key, obj in self.records.items()
+                      if obj in objs)
+
+    def test_attrs(self):
+        self.assertEqual(("latitude", "longitude"), self.index.attrs)
+
+    def test_distance(self):
+        self.assertAlmostEqual(0, distance(10, 20, 10, 20))
+        self.assertAlmostEqual(111.2, distance(0, 0, 1, 0), places=1)
+        self.assertAlmostEqual(4129, distance(37.7749, -122.4194,
+                                              40.7128, -74.0060), delta=5)
+
+    def test_within(self):
+        found = self.index.within(37.5, -122.6, 38.0, -122.0)
+        self.assertEqual(["Place.oak", "Place.sf"],
+                         sorted(found.keys()))
+
+    def test_within_across_antimeridian(self):
+        found = self.index.within(-20, 170, -10, -170)
+        self.assertEqual(["Place.fiji", "Place.samoa"],
+                         sorted(found.keys()))
+
+    def test_near(self):
+        found = self.index.near(37.7749, -122.4194, 20)
+        self.assertEqual(["Place.sf", "Place.oak"],
+                         [key for key, obj in self.records.items()
+                          if obj in [obj for _, obj in found]])
+        self.assertIs(self.records["Place.sf"], found[0][1])
+        self.assertAlmostEqual(0, found[0][0])
+        self.assertLess(found[0][0], found[1][0])
+
+    def test_near_whole_world(self):
+        self.assertEqual(6, len(self.index.near(0, 0, 25000)))
+
+    def test_near_across_antimeridian(self):
+        found = self.index.near(-17.7134, -179.9, 50)
+        self.assertEqual(["Place.fiji"], self.keys([obj for _, obj in found]))
+
+    def test_update(self):
+        sf = self.records["Place.sf"]
+        sf.latitude, sf.longitude = 40.7306, -73.9352
+        self.index.update("Place.sf", sf)
+        self.assertEqual(["Place.nyc", "Place.sf"],
+                         self.keys(self.index.within(40, -75, 41, -73)
+                                   .values()))
+        self.assertEqual([], self.index.near(37.7749, -122.4194, 5))
+        self.assertEqual(6, len(self.index))
+
+    def test_remove(self):
+        self.index.remove("Place.sf")
+        self.assertEqual(["Place.oak"],
+                         self.keys(self.index.within(37.5, -122.6, 38.0,
+                                                     -122.0).values()))
+        self.index.remove("Place.sf")
+        self.assertEqual(5, len(self.index))
+
+    def test_unplaced(self):
+        other = Record(latitude="north", longitude=None)
+        self.index.add("Place.x", other)
+        self.assertEqual(7, len(self.index))
+        self.assertEqual(6, len(self.index.within(-90, -180, 90, 180)))
+        other.latitude, other.longitude = 0.0, 0.0
+        self.index.update("Place.x", other)
+        self.assertIn("Place.x", self.index.within(-1, -1, 1, 1))
+        self.index.remove("Place.x")
+        self.assertEqual(6, len(self.index))
+
+    def test_search(self):
+        self.assertIsNone(self.index.search("==", 37.7749))
+
+
+class TestInvertedIndex(unittest.TestCase):
+    """Unittests for the InvertedIndex class."""
+
+    def setUp(self):
+        self.index = InvertedIndex("amenity_ids")
+        self.records = {}
+        for key, amenities in (("Place.1", ["wifi", "pool", "parking"]),
+                               ("Place.2", ["wifi", "pool"]),
+                               ("Place.3", ["wifi"]),
+                               ("Place.4", [])):
+            self.records[key] = Record(amenity_ids=amenities)
+            self.index.add(key, self.records[key])
+
+    def test_attr(self):
+        self.assertEqual("amenity_ids", self.index.attr)
+
+    def test_lookup(self):
+        self.assertEqual(["Place.1", "Place.2"],
+                         sorted(self.index.lookup("pool")))
+        self.assertEqual({}, self.index.lookup("spa"))
+        self.assertEqual({}, self.index.lookup(["pool"]))
+
+    def test_all_of(self):
+        self.assertEqual(["Place.1"], sorted(self.index.all_of(
+            ["wifi", "pool", "parking"])))
+        self.assertEqual(["Place.1", "Place.2"], sorted(self.index.all_of(
+            ["pool", "wifi"])))
+        self.assertEqual({}, self.index.all_of(["wifi", "spa"]))
+        self.assertEqual(4, len(self.index.all_of([])))
+
+    def test_any_of(self):
+        self.assertEqual(["Place.1", "Place.2"], sorted(self.index.any_of(
+            ["parking", "pool", "spa"])))
+        self.assertEqual({}, self.index.any_of([]))
+
+    def test_search(self):
+        self.assertEqual(["Place.1"],
+                         sorted(self.index.search("contains", "parking")))
+        self.assertIsNone(self.index.search("==", ["wifi"]))
+
+    def test_update(self):
+        record = self.records["Place.3"]
+        record.amenity_ids = ["pool", "spa"]
+        self.index.update("Place.3", record)
+        self.assertNotIn("Place.3", self.index.lookup("wifi"))
+        self.assertIn("Place.3", self.index.lookup("spa"))
+        self.assertEqual(4, len(self.index))
+
+    def test_remove(self):
+        self.index.remove("Place.1")
+        self.assertEqual({}, self.index.lookup("parking"))
+        self.index.remove("Place.1")
+        self.assertEqual(3, len(self.index))
+
+    def test_not_a_list(self):
+        self.index.add("Place.5", Record(amenity_ids="wifi"))
+        self.index.add("Place.6", Record(amenity_ids=[["wifi"], "spa"]))
+        self.assertNotIn("Place.5", self.index.lookup("wifi"))
+        self.assertEqual(["Place.6"], sorted(self.index.lookup("spa")))
+        self.assertEqual(6, len(self.index))
+
+
+class TestTextIndex(unittest.TestCase):
+    """Unittests for the TextIndex class."""
+
+    def setUp(self):
+        self.index = TextIndex(("name", "description"))
+        self.records = {}
+        for key, name, description in (
+                ("Place.1", "Loft", "A cozy loft near the park"),
+                ("Place.2", "Villa", "Seaside villa with a private pool"),
+                ("Place.3", "Cabin", "Cozy cabin with a cozy fireplace, "
+                                     "far from the park and the noise"),
+                ("Place.4", "", None)):
+            self.records[key] = Record(name=name, description=description)
+            self.index.add(key, self.records[key])
+
+    def keys(self, ranked):
+        return [key for _, obj in ranked for key, record
+                in self.records.items() if record is obj]
+
+    def test_attrs(self):
+        self.assertEqual(("name", "description"), self.index.attrs)
+
+    def test_tokenize(self):
+        self.assertEqual(["cozy", "loft", "b_2"],
+                         TextIndex.tokenize("Cozy, LOFT! b_2"))
+
+    def test_rank(self):
+        ranked = self.index.rank("cozy")
+        self.assertEqual(["Place.3", "Place.1"], self.keys(ranked))
+        self.assertGreater(ranked[0][0], ranked[1][0])
+        self.assertEqual(["Place.2"], self.keys(self.index.rank("POOL")))
+        self.assertEqual([], self.index.rank("castle"))
+        self.assertEqual([], self.index.rank(""))
+
+    def test_rank_rare_terms_weigh_more(self):
+        ranked = self.index.rank("park loft")
+        self.assertEqual(["Place.1", "Place.3"], self.keys(ranked))
+
+    def test_rank_limit(self):
+        self.assertEqual(["Place.3"], self.keys(self.index.rank("cozy",
+                                                                limit=1)))
+
+    def test_update(self):
+        record = self.records["Place.2"]
+        record.description = "Cozy seaside villa"
+        self.index.update("Place.2", record)
+        self.assertEqual([], self.index.rank("pool"))
+        self.assertIn("Place.2", self.keys(self.index.rank("cozy")))
+        self.assertEqual(4, len(self.index))
+
+    def test_remove(self):
+        self.index.remove("Place.3")
+        self.assertEqual(["Place.1"], self.keys(self.index.rank("cozy")))
+        self.index.remove("Place.3")
+        self.assertEqual(3, len(self.index))
+
+    def test_search(self):
+        self.assertIsNone(self.index.search("==", "cozy"))
+
+    def test_dump_and_preload(self):
+        entries = self.index.dump()
+        self.assertEqual({"cozy": 1, "loft": 2, "a": 1, "near": 1,
+                          "the": 1, "park": 1}, entries["Place.1"][1])
+        index = TextIndex(("name", "description"))
+        index.preload(entries)
+        with unittest.mock.patch.object(TextIndex, "tokenize",
+                                        side_effect=AssertionError):
+            for key, record in self.records.items():
+                index.add(key, record)
+        self.assertEqual(self.keys(self.index.rank("cozy park")),
+                         self.keys(index.rank("cozy park")))
+
+    def test_changes(self):
+        self.assertCountEqual(self.records, self.index.changes())
+        self.assertEqual({}, self.index.changes())
+        self.records["Place.1"].description = "Bright studio"
+        self.index.update("Place.1", self.records["Place.1"])
+        self.index.remove("Place.2")
+        changes = self.index.changes()
+        self.assertEqual({"bright": 1, "studio": 1, "loft": 1},
+                         changes["Place.1"][1])
+        self.assertEqual({"Place.1", "Place.2"}, set(changes))
+        self.assertIsNone(changes["Place.2"])
+
+    def test_preloaded_counts_are_not_changes(self):
+        entries = self.index.dump()
+        index = TextIndex(("name", "description"))
+        index.preload(entries)
+        for key, record in self.records.items():
+            index.add(key, record)
+        self.assertEqual({}, index.changes())
+        self.assertEqual(len(self.records), index.dump_size())
+
+    def test_preload_changed_text(self):
+        entries = self.index.dump()
+        index = TextIndex(("name", "description"))
+        index.preload(entries)
+        self.records["Place.1"].description = "Bright studio"
+        index.add("Place.1", self.records["Place.1"])
+        self.assertEqual([], index.rank("cozy"))
+        self.assertEqual(1, len(index.rank("studio")))
+
+
+class TestColumnTable(unittest.TestCase):
+    """Unittests for the ColumnTable class."""
+
+    def setUp(self):
+        self.table = ColumnTable(("city_id", "price_by_night"),
+                                 numeric=("price_by_night", "other"))
+        self.places = [Record(city_id="SF", price_by_night=100),
+                       Record(city_id="SF", price_by_night=50),
+                       Record(city_id="NY", price_by_night=80)]
+        for i, place in enumerate(self.places):
+            self.table.add("Place.{}".format(i), place)
+
+    def test_attrs(self):
+        self.assertEqual(("city_id", "price_by_night"), self.table.attrs)
+        self.assertEqual(frozenset(["price_by_night"]), self.table.numeric)
+
+    def test_columns(self):
+        self.assertEqual(["SF", "SF", "NY"], self.table.column("city_id"))
+        self.assertEqual([100.0, 50.0, 80.0],
+                         list(self.table.column("price_by_night")))
+
+    def test_row(self):
+        self.assertEqual({"city_id": "NY", "price_by_night": 80.0},
+                         self.table.row("Place.2"))
+        self.assertIsNone(self.table.row("Place.9"))
+
+    def test_aggregates(self):
+        self.assertEqual(3, self.table.aggregate("count"))
+        self.assertEqual(3, self.table.aggregate("count", "city_id"))
+        self.assertEqual(230.0, self.table.aggregate("sum", "price_by_night"))
+        self.assertAlmostEqual(230 / 3,
+                               self.table.aggregate("mean", "price_by_night"))
+        self.assertEqual(50.0, self.table.aggregate("min", "price_by_night"))
+        self.assertEqual(100.0, self.table.aggregate("max", "price_by_night"))
+
+    def test_grouped_aggregates(self):
+        self.assertEqual({"SF": 2, "NY": 1},
+                         self.table.aggregate("count", by="city_id"))
+        self.assertEqual({"SF": 75.0, "NY": 80.0}, self.table.aggregate(
+            "mean", "price_by_night", by="city_id"))
+        self.assertEqual({"SF": 150.0, "NY": 80.0}, self.table.aggregate(
+            "sum", "price_by_night", by="city_id"))
+        self.assertEqual({"SF": 50.0, "NY": 80.0}, self.table.aggregate(
+            "min", "price_by_night", by="city_id"))
+        self.assertEqual({"SF": 100.0, "NY": 80.0}, self.table.aggregate(
+            "max", "price_by_night", by="city_id"))
+
+    def test_empty(self):
+        table = ColumnTable(("price_by_night",), numeric=("price_by_night",))
+        self.assertEqual(0, table.aggregate("count"))
+        self.assertEqual(0, table.aggregate("sum", "price_by_night"))
+        self.assertIsNone(table.aggregate("mean", "price_by_night"))
+        self.assertIsNone(table.aggregate("max", "price_by_night"))
+        self.assertEqual({}, table.aggregate("mean", "price_by_night",
+                                             by="price_by_night"))
+
+    def test_update(self):
+        self.places[0].city_id = "NY"
+        self.places[0].price_by_night = 120
+        self.table.update("Place.0", self.places[0])
+        self.assertEqual({"NY": 100.0, "SF": 50.0}, self.table.aggregate(
+            "mean", "price_by_night", by="city_id"))
+
+    def test_update_unknown_key_adds(self):
+        self.table.update("Place.3", Record(city_id="LA", price_by_night=1))
+        self.assertEqual(4, len(self.table))
+
+    def test_add_existing_key_updates(self):
+        self.table.add("Place.0", Record(city_id="LA", price_by_night=1))
+        self.assertEqual(3, len(self.table))
+        self.assertEqual(131.0, self.table.aggregate("sum", "price_by_night"))
+
+    def test_remove(self):
+        self.table.remove("Place.0")
+        self.table.remove("Place.0")
+        self.assertEqual(2, len(self.table))
+        self.assertEqual(["NY", "SF"], sorted(self.table.column("city_id")))
+        self.assertEqual({"city_id": "SF", "price_by_night": 50.0},
+                         self.table.row("Place.1"))
+        self.table.remove("Place.2")
+        self.table.remove("Place.1")
+        self.assertEqual(0, len(self.table))
+        self.assertEqual([], self.table.column("city_id"))
+
+    def test_not_numbers_are_left_out(self):
+        self.places[1].price_by_night = "free"
+        self.table.update("Place.1", self.places[1])
+        self.table.add("Place.3", Record(city_id="NY"))
+        self.assertEqual(4, self.table.aggregate("count"))
+        self.assertEqual(2, self.table.aggregate("count", "price_by_night"))
+        self.assertEqual(90.0, self.table.aggregate("mean", "price_by_night"))
+        self.assertEqual({"SF": 1, "NY": 1}, self.table.aggregate(
+            "count", "price_by_night", by="city_id"))
+        self.table.remove("Place.1")
+        self.table.remove("Place.3")
+        self.places[0].price_by_night = 10
+        self.table.update("Place.0", self.places[0])
+        self.assertEqual(45.0, self.table.aggregate("mean", "price_by_night"))
+
+    def test_none_values_are_left_out(self):
+        self.table.add("Place.3", Record(price_by_night=1))
+        self.assertEqual(4, self.table.aggregate("count"))
+        self.assertEqual(3, self.table.aggregate("count", "city_id"))
+        self.assertEqual({"SF": 2, "NY": 1, None: 1},
+                         self.table.aggregate("count", by="city_id"))
+        self.assertEqual({50.0: 1, 80.0: 1, 100.0: 1}, self.table.aggregate(
+            "count", "city_id", by="price_by_night"))
+
+    def test_search(self):
+        self.assertIsNone(self.table.search("==", "SF"))
+
+    def test_invalid_aggregates(self):
+        with self.assertRaises(ValueError):
+            self.table.aggregate("median", "price_by_night")
+        with self.assertRaises(ValueError):
+            self.table.aggregate("sum", "city_id")
+        with self.assertRaises(ValueError):
+            self.table.aggregate("sum")
+
+
+if __name__ == "__main__":
+    unittest.main()
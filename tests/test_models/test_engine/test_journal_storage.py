@@ -0,0 +1,285 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/journal_storage.py.
+
+Unittest classes:
+    **TestJournalStorage_instantiation
+    **TestJournalStorage_methods
+"""
+import os
+import json
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from models.base_model import BaseModel
+from models.engine.file_storage import FileStorage
+from models.engine.journal_storage import JournalStorage
+from models.user import User
+from models.state import State
+from tests.test_models.test_engine.storage_fixture import StorageFixture
+
+
+class TestJournalStorage_instantiation(unittest.TestCase):
+    """Unittests for JournalStorage class instantiation."""
+
+    def test_JournalStorage_instantiation_no_args(self):
+        """Tests creating JournalStorage instance with no arguments."""
+        self.assertEqual(type(JournalStorage()), JournalStorage)
+
+    def test_JournalStorage_instantiation_with_arg(self):
+        """Tests creating JournalStorage instance with argument (raises
+        TypeError).
+        """
+        with self.assertRaises(TypeError):
+            JournalStorage(None)
+
+    def test_JournalStorage_is_FileStorage(self):
+        """Verifies JournalStorage keeps the FileStorage interface."""
+        self.assertTrue(issubclass(JournalStorage, FileStorage))
+
+    def test_journal_path_is_private_str(self):
+        """Verifies '__journal_path' attribute is a private string."""
+        self.assertEqual(str,
+                         type(JournalStorage._JournalStorage__journal_path))
+
+
+class TestJournalStorage_methods(StorageFixture, unittest.TestCase):
+    """Unittests for JournalStorage class methods."""
+    engine = "journal"
+
+    def read_records(self):
+        """Returns the decoded journal records, without commit records."""
+        with open("file.json.journal", "r") as f:
+            return [json.loads(line) for line in f
+                    if json.loads(line) != ["commit"]]
+
+    def test_save_does_not_write_snapshot(self):
+        """Tests that 'save' only appends to the journal."""
+        self.storage.new(BaseModel())
+        self.storage.save()
+        self.assertFalse(os.path.exists("file.json"))
+        self.assertTrue(os.path.exists("file.json.journal"))
+
+    def test_save_appends_put(self):
+        """Tests that a new object is journaled as a put record."""
+        user = User()
+        self.storage.new(user)
+        self.storage.save()
+        records = self.read_records()
+        self.assertEqual(1, len(records))
+        self.assertEqual(["put", "User", user.id], records[0][:3])
+        self.assertEqual(user.created_at.isoformat(),
+                         records[0][3]["created_at"])
+
+    def test_save_only_changed_fields(self):
+        """Tests that an update journals only the changed attributes."""
+        user = User()
+        self.storage.new(user)
+        self.storage.save()
+        user.first_name = "Betty"
+        self.storage.save()
+        records = self.read_records()
+        self.assertEqual(["put", "User", user.id, {"first_name": "Betty"}],
+                         records[1])
+
+    def test_save_unchanged_appends_nothing(self):
+        """Tests that saving twice without changes adds no records."""
+        self.storage.new(State())
+        self.storage.save()
+        self.storage.save()
+        self.assertEqual(1, len(self.read_records()))
+
+    def test_save_appends_del(self):
+        """Tests that a removed object is journaled as a del record."""
+        state = State()
+        self.storage.new(state)
+        self.storage.save()
+        self.storage.delete(state)
+        self.storage.save()
+        self.assertEqual(["del", "State", state.id], self.read_records()[1])
+
+    def test_reload_replays_journal(self):
+        """Tests that 'reload' rebuilds objects from the journal."""
+        user = User()
+        state = State()
+        self.storage.new(user)
+        self.storage.new(state)
+        self.storage.save()
+        user.email = "betty@hbnb.io"
+        self.storage.delete(state)
+        self.storage.save()
+        storage = self.reopen()
+        self.assertEqual("betty@hbnb.io", storage.get(User, user.id).email)
+        self.assertIsNone(storage.get(State, state.id))
+
+    def test_reload_reads_snapshot(self):
+        """Tests that 'reload' starts from the JSON snapshot file."""
+        user = User()
+        with open("file.json", "w") as f:
+            json.dump({"User." + user.id: user.to_dict()}, f)
+        self.assertIsNotNone(self.reopen().get(User, user.id))
+
+    def test_reload_ignores_torn_record(self):
+        """Tests that a partially written last line is skipped."""
+        user = User()
+        self.storage.new(user)
+        self.storage.save()
+        with open("file.json.journal", "a") as f:
+            f.write('["put","User","')
+        self.assertIsNotNone(self.reopen().get(User, user.id))
+
+    def test_reload_drops_torn_transaction(self):
+        """Tests that a transaction whose commit record was not written is
+        dropped whole, and that later saves do not commit it.
+        """
+        user = User()
+        self.storage.new(user)
+        self.storage.save()
+        self.storage.begin()
+        user.first_name = "Betty"
+        state = State()
+        self.storage.commit()
+        with open("file.json.journal", "rb+") as f:
+            data = f.read()
+            f.truncate(data.rfind(b"\n", 0, -1) + 1)
+        storage = self.reopen()
+        self.assertNotIn("first_name", storage.get(User, user.id).to_dict())
+        self.assertIsNone(storage.get(State, state.id))
+        storage.new(State())
+        storage.save()
+        storage = self.reopen()
+        self.assertNotIn("first_name", storage.get(User, user.id).to_dict())
+        self.assertIsNone(storage.get(State, state.id))
+        self.assertEqual(2, storage.count())
+
+    def test_save_skips_clean_objects(self):
+        """Tests that unchanged objects are not serialized again."""
+        user = User()
+        State()
+        self.storage.save()
+        user.first_name = "Betty"
+        with patch.object(State, "to_dict", side_effect=AssertionError):
+            self.storage.save()
+        self.assertEqual(["put", "User", user.id, {"first_name": "Betty"}],
+                         self.read_records()[2])
+
+    def test_save_skips_unstored_objects(self):
+        """Tests that changes to objects never added are not journaled."""
+        User()
+        self.storage.save()
+        dt = datetime.today().isoformat()
+        copy = User(id="not-stored", created_at=dt, updated_at=dt)
+        copy.first_name = "Betty"
+        self.storage.save()
+        self.assertEqual(1, len(self.read_records()))
+
+    def test_delete_none(self):
+        """Tests that deleting None does nothing."""
+        self.storage.new(User())
+        self.storage.delete(None)
+        self.assertEqual(1, len(self.storage.all()))
+
+    def test_reload_then_save_appends_nothing(self):
+        """Tests that a reloaded store is considered already persisted."""
+        self.storage.new(User())
+        self.storage.save()
+        self.reopen().save()
+        self.assertEqual(1, len(self.read_records()))
+
+    def test_reload_truncates_torn_record(self):
+        """Tests that appends after a torn record stay readable."""
+        user = User()
+        self.storage.new(user)
+        self.storage.save()
+        with open("file.json.journal", "a") as f:
+            f.write('["put","User","')
+        storage = self.reopen()
+        state = State()
+        storage.new(state)
+        storage.save()
+        self.assertEqual(2, len(self.read_records()))
+        self.assertIsNotNone(self.reopen().get(State, state.id))
+
+    def test_compact_writes_snapshot(self):
+        """Tests that 'compact' moves the journal into the snapshot."""
+        user = User()
+        self.storage.new(user)
+        self.storage.save()
+        user.first_name = "Betty"
+        self.storage.save()
+        self.storage.compact()
+        self.assertEqual([], self.read_records())
+        with open("file.json", "r") as f:
+            snapshot = json.load(f)
+        self.assertEqual("Betty", snapshot["User." + user.id]["first_name"])
+        self.assertEqual("User", snapshot["User." + user.id]["__class__"])
+        self.assertEqual("Betty",
+                         self.reopen().get(User, user.id).first_name)
+
+    def test_fsync_policy(self):
+        """Tests that appends and compactions follow the fsync policy."""
+        user = User()
+        self.storage.save()
+        for policy, calls in [("none", 0), ("file", 1)]:
+            self.storage.fsync = policy
+            user.first_name = policy
+            with patch("os.fsync") as fsync:
+                self.storage.save()
+            self.assertEqual(calls, fsync.call_count)
+        with patch("os.fsync") as fsync:
+            self.storage.compact()
+        self.assertEqual(2, fsync.call_count)
+        self.assertEqual("file", self.reopen().get(User, user.id).first_name)
+
+    def test_save_after_compact(self):
+        """Tests that records appended after compaction are replayed."""
+        user = User()
+        self.storage.new(user)
+        self.storage.save()
+        self.storage.compact()
+        user.last_name = "Holberton"
+        self.storage.save()
+        self.assertEqual(1, len(self.read_records()))
+        self.assertEqual("Holberton",
+                         self.reopen().get(User, user.id).last_name)
+
+    def test_compact_replay_is_idempotent(self):
+        """Tests that an old journal replayed over a new snapshot (a crash
+        between the snapshot and journal renames) gives the same objects.
+        """
+        user = User()
+        state = State()
+        self.storage.new(user)
+        self.storage.new(state)
+        self.storage.save()
+        user.first_name = "Betty"
+        self.storage.delete(state)
+        self.storage.save()
+        os.rename("file.json.journal", "file.json.journal.bak")
+        self.storage.compact()
+        os.replace("file.json.journal.bak", "file.json.journal")
+        storage = self.reopen()
+        self.assertEqual("Betty", storage.get(User, user.id).first_name)
+        self.assertIsNone(storage.get(State, state.id))
+
+    def test_save_triggers_background_compaction(self):
+        """Tests that crossing the thresholds compacts in the background."""
+        self.storage._JournalStorage__compact_min_bytes = 0
+        self.storage._JournalStorage__compact_ratio = 0
+        user = User()
+        self.storage.new(user)
+        self.storage.save()
+        self.storage._JournalStorage__compactor.join()
+        self.assertTrue(os.path.exists("file.json"))
+        self.assertEqual([], self.read_records())
+        self.assertIsNotNone(self.reopen().get(User, user.id))
+
+    def test_save_below_thresholds_does_not_compact(self):
+        """Tests that a small journal is left alone."""
+        self.storage.new(User())
+        self.storage.save()
+        self.assertIsNone(self.storage._JournalStorage__compactor)
+        self.assertFalse(os.path.exists("file.json"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/memory_storage.py.
+
+Unittest classes:
+    **TestMemoryStorage_instantiation
+    **TestMemoryStorage_methods
+"""
+import os
+import unittest
+from unittest.mock import patch
+from models.engine.file_storage import FileStorage
+from models.engine.memory_storage import MemoryStorage
+from models.user import User
+from models.state import State
+from models.place import Place
+from tests.test_models.test_engine.storage_fixture import StorageFixture
+
+
+class TestMemoryStorage_instantiation(unittest.TestCase):
+    """Unittests for MemoryStorage class instantiation."""
+
+    def test_MemoryStorage_instantiation_no_args(self):
+        """Tests creating MemoryStorage instance with no arguments."""
+        self.assertEqual(type(MemoryStorage()), MemoryStorage)
+
+    def test_MemoryStorage_instantiation_with_arg(self):
+        """Tests creating MemoryStorage instance with argument (raises
+        TypeError).
+        """
+        with self.assertRaises(TypeError):
+            MemoryStorage(None)
+
+    def test_MemoryStorage_is_FileStorage(self):
+        """Verifies MemoryStorage keeps the FileStorage interface."""
+        self.assertTrue(issubclass(MemoryStorage, FileStorage))
+
+
+class TestMemoryStorage_methods(StorageFixture, unittest.TestCase):
+    """Unittests for MemoryStorage class methods."""
+    engine = "memory"
+
+    def tearDown(self):
+        """Drops the volumes and removes the temporary directory."""
+        for name in ("file.json", "test_memory_other"):
+            MemoryStorage._MemoryStorage__volumes.pop(
+                os.path.abspath(name), None)
+        super().tearDown()
+
+    def test_save_writes_no_file(self):
+        """Tests that 'save' never opens a file."""
+        User()
+        with patch("builtins.open", side_effect=AssertionError):
+            self.storage.save()
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_save_only_changed_objects(self):
+        """Tests that unchanged objects are not copied again."""
+        user = User()
+        State()
+        self.storage.save()
+        user.first_name = "Betty"
+        with patch.object(State, "to_dict", side_effect=AssertionError):
+            self.storage.save()
+        self.assertEqual("Betty", self.reopen().get(User, user.id).first_name)
+
+    def test_saved_records_are_copies(self):
+        """Tests that in-place changes to objects do not leak into the
+        volume, in either direction.
+        """
+        place = Place()
+        place.amenity_ids = ["wifi"]
+        self.storage.save()
+        place.amenity_ids.append("pool")
+        storage = self.reopen()
+        loaded = storage.get(Place, place.id)
+        self.assertEqual(["wifi"], loaded.amenity_ids)
+        loaded.amenity_ids.append("spa")
+        self.assertEqual(["wifi"],
+                         self.reopen().get(Place, place.id).amenity_ids)
+
+    def test_volumes_are_separate(self):
+        """Tests that engines on another volume see other records."""
+        User()
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        other = MemoryStorage()
+        other._MemoryStorage__name = "test_memory_other"
+        other.reload()
+        self.assertEqual(0, other.count())
+
+    def test_snapshot_restore(self):
+        """Tests that 'restore' brings back the saved and stored state."""
+        user = User()
+        state = State()
+        self.storage.save()
+        snapshot = self.storage.snapshot()
+        user.first_name = "Betty"
+        self.storage.delete(state)
+        other = State()
+        self.storage.save()
+        Place()
+        self.storage.restore(snapshot)
+        self.assertEqual(2, self.storage.count())
+        self.assertEqual("", self.storage.get(User, user.id).first_name)
+        self.assertIsNotNone(self.storage.get(State, state.id))
+        self.assertIsNone(self.storage.get(State, other.id))
+        self.assertEqual(2, self.reopen().count())
+
+    def test_snapshot_is_not_changed_by_save(self):
+        """Tests that later saves leave a snapshot untouched."""
+        user = User()
+        self.storage.save()
+        snapshot = self.storage.snapshot()
+        user.first_name = "Betty"
+        self.storage.save()
+        self.assertNotIn("first_name", snapshot["User." + user.id])
+
+
+if __name__ == "__main__":
+    unittest.main()
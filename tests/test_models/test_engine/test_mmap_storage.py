@@ -0,0 +1,241 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/mmap_storage.py.
+
+Unittest classes:
+    **TestMmapStorage_instantiation
+    **TestMmapStorage_methods
+"""
+import os
+import json
+import unittest
+from unittest.mock import patch
+from models.engine.file_storage import FileStorage
+from models.engine.mmap_storage import MmapStorage
+from models.user import User
+from models.state import State
+from models.place import Place
+from tests.test_models.test_engine.storage_fixture import StorageFixture
+
+
+class TestMmapStorage_instantiation(unittest.TestCase):
+    """Unittests for MmapStorage class instantiation."""
+
+    def test_MmapStorage_instantiation_no_args(self):
+        """Tests creating MmapStorage instance with no arguments."""
+        self.assertEqual(type(MmapStorage()), MmapStorage)
+
+    def test_MmapStorage_instantiation_with_arg(self):
+        """Tests creating MmapStorage instance with argument (raises
+        TypeError).
+        """
+        with self.assertRaises(TypeError):
+            MmapStorage(None)
+
+    def test_MmapStorage_is_FileStorage(self):
+        """Verifies MmapStorage keeps the FileStorage interface."""
+        self.assertTrue(issubclass(MmapStorage, FileStorage))
+
+    def test_index_path_is_private_str(self):
+        """Verifies '__index_path' attribute is a private string."""
+        self.assertEqual(str, type(MmapStorage._MmapStorage__index_path))
+
+
+class TestMmapStorage_methods(StorageFixture, unittest.TestCase):
+    """Unittests for MmapStorage class methods."""
+    engine = "mmap"
+
+    def read_records(self):
+        """Returns the decoded data file records, without commit records."""
+        with open("file.db", "r") as f:
+            return [json.loads(line) for line in f
+                    if "__commit__" not in json.loads(line)]
+
+    def test_save_appends_records(self):
+        """Tests that a save appends the records of changed objects only."""
+        user = User()
+        State()
+        self.storage.save()
+        user.first_name = "Betty"
+        with patch.object(State, "to_dict", side_effect=AssertionError):
+            self.storage.save()
+        records = self.read_records()
+        self.assertEqual(3, len(records))
+        self.assertEqual(user.to_dict(), records[2])
+
+    def test_save_unchanged_appends_nothing(self):
+        """Tests that saving twice without changes adds no records."""
+        self.storage.new(State())
+        self.storage.save()
+        self.storage.save()
+        self.assertEqual(1, len(self.read_records()))
+
+    def test_save_writes_index(self):
+        """Tests that the index points at the latest record of each key."""
+        user = User()
+        self.storage.save()
+        user.first_name = "Betty"
+        self.storage.save()
+        with open("file.db.idx", "r") as f:
+            index = json.load(f)
+        self.assertEqual(os.path.getsize("file.db"), index["size"])
+        offset, length = index["offsets"]["User." + user.id]
+        with open("file.db", "rb") as f:
+            f.seek(offset)
+            self.assertEqual("Betty", json.loads(f.read(length))["first_name"])
+
+    def test_reload_defers_building(self):
+        """Tests that 'reload' builds objects only on first access."""
+        user = User()
+        place = Place()
+        self.storage.save()
+        storage = self.reopen()
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual(2, storage.count())
+        self.assertEqual(user.to_dict(), storage.get(User, user.id).to_dict())
+        self.assertEqual(1, len(FileStorage._FileStorage__objects))
+        self.assertEqual([place.id],
+                         [obj.id for obj in storage.all(Place).values()])
+
+    def test_reload_then_save_appends_nothing(self):
+        """Tests that built objects are considered already saved."""
+        user = User()
+        self.storage.save()
+        storage = self.reopen()
+        storage.get(User, user.id)
+        storage.all()
+        storage.save()
+        self.assertEqual(1, len(self.read_records()))
+
+    def test_delete(self):
+        """Tests that a removed object is saved as a tombstone."""
+        state = State()
+        self.storage.save()
+        self.storage.delete(state)
+        self.storage.save()
+        self.assertTrue(self.read_records()[1]["__deleted__"])
+        self.assertIsNone(self.reopen().get(State, state.id))
+
+    def test_delete_none(self):
+        """Tests that deleting None does nothing."""
+        self.storage.new(User())
+        self.storage.delete(None)
+        self.assertEqual(1, len(self.storage.all()))
+
+    def test_reload_rebuilds_stale_index(self):
+        """Tests that records appended after the last index write (a crash
+        between the two writes) are found by scanning the data file.
+        """
+        user = User()
+        state = State()
+        self.storage.save()
+        with open("file.db.idx", "r") as f:
+            index = f.read()
+        user.email = "betty@hbnb.io"
+        self.storage.delete(state)
+        self.storage.save()
+        with open("file.db.idx", "w") as f:
+            f.write(index)
+        storage = self.reopen()
+        self.assertEqual("betty@hbnb.io", storage.get(User, user.id).email)
+        self.assertIsNone(storage.get(State, state.id))
+
+    def test_reload_truncates_torn_record(self):
+        """Tests that a partial last record is cut off the data file."""
+        user = User()
+        self.storage.save()
+        with open("file.db", "a") as f:
+            f.write('{"__class__": "User", "id": "')
+        storage = self.reopen()
+        state = State()
+        storage.save()
+        self.assertEqual(2, len(self.read_records()))
+        storage = self.reopen()
+        self.assertIsNotNone(storage.get(User, user.id))
+        self.assertIsNotNone(storage.get(State, state.id))
+
+    def test_reload_drops_torn_transaction(self):
+        """Tests that a transaction whose commit record was not written is
+        dropped whole, and that later saves do not commit it.
+        """
+        user = User()
+        self.storage.save()
+        self.storage.begin()
+        user.first_name = "Betty"
+        state = State()
+        self.storage.commit()
+        with open("file.db", "rb+") as f:
+            data = f.read()
+            f.truncate(data.rfind(b"\n", 0, -1) + 1)
+        storage = self.reopen()
+        self.assertNotIn("first_name", storage.get(User, user.id).to_dict())
+        self.assertIsNone(storage.get(State, state.id))
+        storage.new(State())
+        storage.save()
+        storage = self.reopen()
+        self.assertNotIn("first_name", storage.get(User, user.id).to_dict())
+        self.assertIsNone(storage.get(State, state.id))
+        self.assertEqual(2, storage.count())
+
+    def test_compact(self):
+        """Tests that 'compact' keeps only the latest live records."""
+        user = User()
+        state = State()
+        self.storage.save()
+        for name in ("Betty", "Bob"):
+            user.first_name = name
+            self.storage.save()
+        self.storage.delete(state)
+        self.storage.save()
+        self.storage.compact()
+        self.assertEqual([user.to_dict()], self.read_records())
+        self.assertEqual("Bob", self.reopen().get(User, user.id).first_name)
+
+    def test_fsync_policy(self):
+        """Tests that appends and compactions follow the fsync policy."""
+        user = User()
+        self.storage.save()
+        for policy, calls in [("none", 0), ("file", 1)]:
+            self.storage.fsync = policy
+            user.first_name = policy
+            with patch("os.fsync") as fsync:
+                self.storage.save()
+            self.assertEqual(calls, fsync.call_count)
+        with patch("os.fsync") as fsync:
+            self.storage.compact()
+        self.assertEqual(1, fsync.call_count)
+        self.assertEqual("file", self.reopen().get(User, user.id).first_name)
+
+    def test_compact_keeps_unbuilt_objects(self):
+        """Tests that objects not built before a compaction still load."""
+        user = User()
+        state = State()
+        self.storage.save()
+        storage = self.reopen()
+        storage.get(State, state.id).name = "Nevada"
+        storage.save()
+        storage.compact()
+        self.assertEqual(user.to_dict(), storage.get(User, user.id).to_dict())
+        self.assertEqual("Nevada",
+                         self.reopen().get(State, state.id).name)
+
+    def test_save_below_thresholds_does_not_compact(self):
+        """Tests that a small data file is left alone."""
+        user = User()
+        self.storage.save()
+        user.first_name = "Betty"
+        self.storage.save()
+        self.assertEqual(2, len(self.read_records()))
+
+    def test_save_triggers_compaction(self):
+        """Tests that crossing the thresholds compacts the data file."""
+        self.storage._MmapStorage__compact_min_bytes = 0
+        self.storage._MmapStorage__compact_ratio = 0
+        user = User()
+        self.storage.save()
+        user.first_name = "Betty"
+        self.storage.save()
+        self.assertEqual([user.to_dict()], self.read_records())
+
+
+if __name__ == "__main__":
+    unittest.main()
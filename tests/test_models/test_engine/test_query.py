@@ -0,0 +1,228 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/query.py.
+
+Unittest classes:
+    **TestQuery_conditions
+    **TestQuery_results
+"""
+import unittest
+import models
+from unittest.mock import patch
+from models.engine.file_storage import FileStorage
+from models.engine.query import Query
+from models.place import Place
+from models.review import Review
+
+
+class TestQuery_conditions(unittest.TestCase):
+    """Unittests for filtering with the Query class."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.places = []
+        for name, price, city_id in (("Loft", 80, "1"), ("Villa", 300, "1"),
+                                     ("Cabin", 120, "2")):
+            place = Place()
+            place.name = name
+            place.price_by_night = price
+            place.city_id = city_id
+            self.places.append(place)
+        self.loft, self.villa, self.cabin = self.places
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def test_storage_query(self):
+        self.assertEqual(Query, type(models.storage.query(Place)))
+
+    def test_no_conditions(self):
+        self.assertCountEqual(self.places, models.storage.query(Place).all())
+
+    def test_class_name(self):
+        self.assertCountEqual(self.places,
+                              models.storage.query("Place").all())
+
+    def test_other_class(self):
+        self.assertEqual([], models.storage.query(Review).all())
+
+    def test_equal(self):
+        query = models.storage.query(Place).where("city_id", "==", "2")
+        self.assertEqual([self.cabin], query.all())
+
+    def test_not_equal(self):
+        query = models.storage.query(Place).where("city_id", "!=", "2")
+        self.assertCountEqual([self.loft, self.villa], query.all())
+
+    def test_range(self):
+        query = models.storage.query(Place).where("price_by_night", ">=", 80)
+        query.where("price_by_night", "<", 300)
+        self.assertCountEqual([self.loft, self.cabin], query.all())
+
+    def test_in(self):
+        query = models.storage.query(Place)
+        query.where("name", "in", ["Loft", "Cabin"])
+        self.assertCountEqual([self.loft, self.cabin], query.all())
+
+    def test_contains(self):
+        self.loft.amenity_ids = ["wifi"]
+        query = models.storage.query(Place)
+        self.assertEqual([self.villa], query.where("name", "contains",
+                                                   "ill").all())
+        query = models.storage.query(Place)
+        self.assertEqual([self.loft], query.where("amenity_ids", "contains",
+                                                  "wifi").all())
+
+    def test_incompatible_types(self):
+        query = models.storage.query(Place).where("name", "<", 100)
+        self.assertEqual([], query.all())
+
+    def test_unknown_operator(self):
+        with self.assertRaises(ValueError):
+            models.storage.query(Place).where("name", "~", "Loft")
+
+    def test_uses_index(self):
+        query = models.storage.query(Place).where("city_id", "==", "2")
+        with patch.object(FileStorage, "all", side_effect=AssertionError):
+            self.assertEqual([self.cabin], query.all())
+
+    def test_unindexed_scans_class(self):
+        query = models.storage.query(Place).where("name", "==", "Loft")
+        with patch.object(FileStorage, "all",
+                          wraps=models.storage.all) as all_mock:
+            self.assertEqual([self.loft], query.all())
+            all_mock.assert_called_once_with("Place")
+
+
+class TestQuery_results(unittest.TestCase):
+    """Unittests for ordering, paging and projecting with Query."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.places = []
+        for price in (120, 80, 300, 50):
+            place = Place()
+            place.price_by_night = price
+            self.places.append(place)
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def prices(self, query):
+        return [place.price_by_night for place in query]
+
+    def test_order_by(self):
+        query = models.storage.query(Place).order_by("price_by_night")
+        self.assertEqual([50, 80, 120, 300], self.prices(query))
+
+    def test_order_by_descending(self):
+        query = models.storage.query(Place).order_by("-price_by_night")
+        self.assertEqual([300, 120, 80, 50], self.prices(query))
+        query = models.storage.query(Place).order_by("price_by_night", True)
+        self.assertEqual([300, 120, 80, 50], self.prices(query))
+
+    def test_order_by_missing_last(self):
+        self.places[0].rating = 4
+        self.places[2].rating = 2
+        for order in ("rating", "-rating"):
+            query = models.storage.query(Place).order_by(order)
+            ratings = [getattr(place, "rating", None) for place in query]
+            self.assertEqual([None, None], ratings[2:])
+
+    def test_order_by_mixed_types(self):
+        self.places[0].rating = 4
+        self.places[1].rating = "good"
+        self.places[2].rating = 2.5
+        query = models.storage.query(Place).order_by("rating")
+        self.assertEqual([2.5, 4, "good", None],
+                         [getattr(place, "rating", None) for place in query])
+        query = models.storage.query(Place).order_by("-rating")
+        self.assertEqual([4, 2.5, "good", None],
+                         [getattr(place, "rating", None) for place in query])
+        query = models.storage.query(Place).order_by("-rating").limit(2)
+        self.assertEqual([4, 2.5],
+                         [getattr(place, "rating", None) for place in query])
+
+    def test_order_by_mixed_types_with_and_without_index(self):
+        self.places[1].price_by_night = "cheap"
+        for place in self.places:
+            place.rating = place.price_by_night
+        for order, expected in (("", [50, 120, 300, "cheap"]),
+                                ("-", [300, 120, 50, "cheap"])):
+            query = models.storage.query(Place).order_by(
+                order + "price_by_night")
+            self.assertEqual(expected, self.prices(query))
+            query = models.storage.query(Place).order_by(order + "rating")
+            self.assertEqual(expected,
+                             [place.rating for place in query])
+            query = models.storage.query(Place).order_by(
+                order + "rating").limit(4)
+            self.assertEqual(expected,
+                             [place.rating for place in query])
+
+    def test_limit(self):
+        query = models.storage.query(Place).order_by("price_by_night")
+        self.assertEqual([50, 80], self.prices(query.limit(2)))
+
+    def test_limit_descending(self):
+        query = models.storage.query(Place).order_by("-price_by_night")
+        self.assertEqual([300], self.prices(query.limit(1)))
+
+    def test_offset(self):
+        query = models.storage.query(Place).order_by("price_by_night")
+        self.assertEqual([80, 120], self.prices(query.offset(1).limit(2)))
+        query = models.storage.query(Place).order_by("price_by_night")
+        self.assertEqual([120, 300], self.prices(query.offset(2)))
+
+    def test_limit_stops_early(self):
+        query = models.storage.query(Place).limit(1)
+        self.assertEqual(1, len(query.all()))
+
+    def test_order_by_sorted_index(self):
+        query = models.storage.query(Place).order_by("-price_by_night")
+        with patch.object(FileStorage, "all", side_effect=AssertionError):
+            self.assertEqual([300, 120], self.prices(query.limit(2)))
+
+    def test_order_by_sorted_index_with_range(self):
+        query = models.storage.query(Place).order_by("price_by_night")
+        query.where("price_by_night", ">", 50)
+        query.where("price_by_night", "<=", 300)
+        query.where("price_by_night", "<", 300)
+        with patch.object(FileStorage, "all", side_effect=AssertionError):
+            self.assertEqual([80, 120], self.prices(query))
+
+    def test_order_by_prefers_smaller_index(self):
+        self.places[2].city_id = "1"
+        query = models.storage.query(Place).where("city_id", "==", "1")
+        query.order_by("price_by_night").limit(5)
+        self.assertEqual([300], self.prices(query))
+
+    def test_order_follows_updates(self):
+        self.places[3].price_by_night = 1000
+        query = models.storage.query(Place).order_by("-price_by_night")
+        self.assertEqual([1000, 300], self.prices(query.limit(2)))
+
+    def test_range_uses_sorted_index(self):
+        query = models.storage.query(Place)
+        query.where("price_by_night", ">=", 100)
+        with patch.object(FileStorage, "all", side_effect=AssertionError):
+            self.assertCountEqual([120, 300], self.prices(query))
+
+    def test_only(self):
+        query = models.storage.query(Place).order_by("price_by_night")
+        query.only("id", "price_by_night").limit(1)
+        self.assertEqual([{"id": self.places[3].id, "price_by_night": 50}],
+                         query.all())
+
+    def test_first(self):
+        query = models.storage.query(Place).order_by("price_by_night")
+        self.assertIs(self.places[3], query.first())
+        query = models.storage.query(Place).where("name", "==", "Nope")
+        self.assertIsNone(query.first())
+
+    def test_count(self):
+        query = models.storage.query(Place).where("price_by_night", ">", 60)
+        self.assertEqual(3, query.count())
+
+
+if __name__ == "__main__":
+    unittest.main()